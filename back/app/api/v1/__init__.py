@@ -3,11 +3,15 @@ API v1 роуты
 """
 from fastapi import APIRouter
 
-from app.api.v1 import products, statuses, categories
+from app.api.v1 import products, product_events, product_import, statuses, categories, stats
 
 api_router = APIRouter()
 
+# Лента изменений и импорт раньше products: иначе /products/events попадёт в /products/{product_id}
+api_router.include_router(product_events.router, prefix="/products", tags=["products"])
+api_router.include_router(product_import.router, prefix="/products", tags=["products"])
 api_router.include_router(products.router, prefix="/products", tags=["products"])
 api_router.include_router(statuses.router, prefix="/statuses", tags=["statuses"])
 api_router.include_router(categories.router, prefix="/categories", tags=["categories"])
 
+api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
@@ -1,72 +1,47 @@
 """
 API endpoints для работы с категориями
 """
-from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
-from typing import Optional
 
-from app.database import get_db
-from app.models.category import Category
+from app.database import get_async_db
+from app.logging_config import sampled_logger
 from app.schemas.category import CategoryResponse
+from app.services.reference_cache import categories_cache, get_categories as load_categories
+from app.sql_accounting import query_budget
 
 router = APIRouter()
 
-# Простой кэш для категорий (так как они редко меняются)
-_categories_cache: Optional[list[CategoryResponse]] = None
-_cache_timestamp: Optional[datetime] = None
-_cache_ttl = timedelta(minutes=5)  # Кэш на 5 минут
-
 
 @router.get(
     "",
+    dependencies=[query_budget(1)],
     response_model=list[CategoryResponse],
     summary="Получить список категорий",
     description="Возвращает список всех доступных категорий.",
 )
 async def get_categories(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    """Получает список категорий (с кэшированием)"""
-    global _categories_cache, _cache_timestamp
-    
-    # Проверяем кэш
-    if _categories_cache is not None and _cache_timestamp is not None:
-        if datetime.now() - _cache_timestamp < _cache_ttl:
-            logger.info(f"Возвращаем категории из кэша ({len(_categories_cache)} шт.)")
-            return _categories_cache
-    
+    """
+    Получает список категорий. Категории хранятся в кэше справочников
+    (app/services/reference_cache.py) и сбрасываются по уведомлению из БД.
+    """
     try:
-        logger.info("Начало запроса категорий из БД")
-        categories = db.query(Category).order_by(Category.id).all()
-        logger.info(f"Найдено категорий в БД: {len(categories)}")
-        
-        result = []
-        for c in categories:
-            try:
-                result.append(CategoryResponse(id=c.id, name=c.name, code=c.code))
-            except Exception as conv_error:
-                logger.error(f"Ошибка преобразования категории {c.id}: {conv_error}, данные: id={c.id}, name={c.name}, code={c.code}")
-                # Пропускаем проблемную категорию
-                continue
-        
-        # Обновляем кэш
-        _categories_cache = result
-        _cache_timestamp = datetime.now()
-        
-        logger.info(f"Успешно возвращено категорий: {len(result)} (кэш обновлён)")
-        return result
+        categories = await load_categories(db)
+        sampled_logger.info("Возвращено категорий: {}", len(categories))
+        return categories
     except Exception as e:
         logger.error(f"Ошибка при получении категорий: {e}", exc_info=True)
         
         # Если есть кэш, возвращаем его даже если он устарел
-        if _categories_cache is not None:
+        stale = categories_cache.get_stale()
+        if stale is not None:
             logger.warning(f"Используем устаревший кэш из-за ошибки БД: {e}")
-            return _categories_cache
+            return stale
         
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Ошибка при получении категорий: {str(e)}",
         )
-
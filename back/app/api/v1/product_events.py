@@ -0,0 +1,121 @@
+"""
+API endpoints ленты изменений заявок (Server-Sent Events и WebSocket)
+"""
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from loguru import logger
+
+from app.database import AsyncSessionLocal
+from app.dependencies import get_supplier_by_token, resolve_supplier_user_id
+from app.serialization import dumps
+from app.services.product_events import Subscription, product_broadcaster
+
+router = APIRouter()
+
+HEARTBEAT_SECONDS = 15  # Комментарий-пинг, чтобы прокси не закрывали простаивающее соединение
+
+
+async def _subscribe(
+    token: Optional[str],
+    status_id: Optional[int],
+    category_id: Optional[int],
+) -> Subscription:
+    """
+    Подписка с фильтрами. Для поставщика - только его заявки.
+    Сессия БД нужна только на время авторизации и не держится всё время потока.
+    """
+    supplier_user_id = None
+    if token:
+        async with AsyncSessionLocal() as db:
+            supplier = await get_supplier_by_token(token, db)
+            if supplier:
+                supplier_user_id = await resolve_supplier_user_id(db, supplier, create_if_missing=False)
+                if supplier_user_id is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Заявки не найдены",
+                    )
+    return product_broadcaster.subscribe(
+        supplier_user_id=supplier_user_id,
+        status_id=status_id,
+        category_id=category_id,
+    )
+
+
+async def _sse_stream(request: Request, subscription: Subscription):
+    try:
+        yield "retry: 5000\n\n"
+        while not await request.is_disconnected():
+            try:
+                item = await asyncio.wait_for(subscription.queue.get(), HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield f"event: {item['type']}\ndata: {dumps(item).decode()}\n\n"
+    finally:
+        product_broadcaster.unsubscribe(subscription)
+
+
+@router.get(
+    "/events",
+    summary="Лента изменений заявок (SSE)",
+    description="Поток Server-Sent Events о созданных, изменённых и удалённых заявках. "
+                "Событие resync означает, что часть событий пропущена и список нужно перечитать. "
+                "Для поставщиков - только их заявки.",
+)
+async def product_events_sse(
+    request: Request,
+    token: Optional[str] = Query(None, description="Токен для доступа"),
+    status_id: Optional[int] = Query(None, description="Фильтр по ID статуса (текущего или прежнего)"),
+    category_id: Optional[int] = Query(None, description="Фильтр по ID категории"),
+):
+    """Подписка на изменения заявок через SSE"""
+    subscription = await _subscribe(token, status_id, category_id)
+    logger.info(f"SSE-подписчик подключён, всего подписчиков: {product_broadcaster.subscribers}")
+    return StreamingResponse(
+        _sse_stream(request, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _wait_disconnect(websocket: WebSocket) -> None:
+    """Входящие сообщения не используются, ждём только закрытия соединения"""
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+
+@router.websocket("/ws")
+async def product_events_ws(
+    websocket: WebSocket,
+    token: Optional[str] = Query(None),
+    status_id: Optional[int] = Query(None),
+    category_id: Optional[int] = Query(None),
+):
+    """Подписка на изменения заявок через WebSocket (JSON-сообщения, формат как в SSE)"""
+    try:
+        subscription = await _subscribe(token, status_id, category_id)
+    except HTTPException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(e.detail))
+        return
+
+    await websocket.accept()
+    disconnected = asyncio.create_task(_wait_disconnect(websocket))
+    try:
+        while True:
+            getter = asyncio.create_task(subscription.queue.get())
+            done, _ = await asyncio.wait({getter, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if getter not in done:
+                getter.cancel()
+                break
+            await websocket.send_text(dumps(getter.result()).decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
+        product_broadcaster.unsubscribe(subscription)
@@ -0,0 +1,160 @@
+"""
+API endpoints импорта заявок из CSV/XLSX
+"""
+import csv
+import io
+from typing import Optional
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from app.database import AsyncSessionLocal, get_async_db
+from app.dependencies import get_supplier_by_token, require_supplier_role, resolve_supplier_user_id
+from app.models.product_import import ProductImportJob
+from app.schemas.product_import import ProductImportJobResponse
+from app.services.auth_cache import SupplierPrincipal
+from app.services.product_import import (
+    ProductImportService,
+    detect_format,
+    product_import_runner,
+    remove_upload,
+    save_upload,
+)
+from app.services.reference_cache import get_categories
+from app.sql_accounting import query_budget
+
+router = APIRouter()
+
+
+async def _get_job_or_404(
+    db: AsyncSession,
+    job_id: int,
+    supplier: Optional[SupplierPrincipal],
+) -> ProductImportJob:
+    """Задача импорта; поставщику доступны только его задачи"""
+    supplier_user_id = None
+    if supplier:
+        supplier_user_id = await resolve_supplier_user_id(db, supplier, create_if_missing=False)
+    job = None
+    if not supplier or supplier_user_id:
+        job = await ProductImportService.get_job(db, job_id, supplier_user_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Задача импорта не найдена",
+        )
+    return job
+
+
+@router.post(
+    "/import",
+    dependencies=[query_budget(4)],
+    response_model=ProductImportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Импортировать заявки из файла",
+    description="Принимает CSV или XLSX (первая строка - имена полей ProductCreate; категорию можно "
+                "указать кодом в колонке category_code) и запускает фоновую задачу импорта. "
+                "Состояние - GET /products/import/{job_id}, ошибки строк - "
+                "GET /products/import/{job_id}/errors. Требуется роль 'supplier'.",
+)
+async def import_products(
+    file: UploadFile = File(..., description="Файл CSV или XLSX"),
+    supplier: SupplierPrincipal = Depends(require_supplier_role),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Создаёт задачу импорта заявок"""
+    try:
+        file_format = detect_format(file.filename)
+        supplier_user_id = await resolve_supplier_user_id(db, supplier, create_if_missing=True)
+        if not supplier_user_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Не удалось определить пользователя для поставщика",
+            )
+        
+        path = await run_in_threadpool(save_upload, file.file, file_format)
+        try:
+            categories = await get_categories(db)
+            job = await ProductImportService.create_job(db, supplier_user_id, file.filename, file_format, path)
+        except Exception:
+            await run_in_threadpool(remove_upload, path)
+            raise
+        
+        product_import_runner.submit(
+            job.id,
+            path,
+            file_format,
+            supplier_user_id,
+            {category["code"]: category["id"] for category in categories if category["code"]},
+            supplier,
+        )
+        return job
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Ошибка при создании задачи импорта: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка при создании задачи импорта",
+        )
+
+
+@router.get(
+    "/import/{job_id}",
+    dependencies=[query_budget(2)],
+    response_model=ProductImportJobResponse,
+    summary="Состояние задачи импорта",
+    description="Статус, прогресс и счётчики строк задачи импорта. Поставщикам - только их задачи.",
+)
+async def get_import_job(
+    job_id: int,
+    supplier: Optional[SupplierPrincipal] = Depends(get_supplier_by_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Получает задачу импорта"""
+    return await _get_job_or_404(db, job_id, supplier)
+
+
+async def _errors_stream(job_id: int):
+    """CSV с ошибками строк; сессия своя - зависимости закрываются до отправки ответа"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(["row", "errors"])
+    async with AsyncSessionLocal() as db:
+        async for rows in ProductImportService.stream_errors(db, job_id):
+            writer.writerows([row.row_number, "; ".join(row.errors)] for row in rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+@router.get(
+    "/import/{job_id}/errors",
+    dependencies=[query_budget(3)],
+    summary="Отчёт об ошибках импорта",
+    description="CSV со строками файла, которые не были импортированы: номер строки "
+                "(заголовок - строка 1) и ошибки. Доступен и во время выполнения задачи.",
+)
+async def get_import_errors(
+    job_id: int,
+    supplier: Optional[SupplierPrincipal] = Depends(get_supplier_by_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Выгружает ошибки строк задачи импорта"""
+    job = await _get_job_or_404(db, job_id, supplier)
+    return StreamingResponse(
+        _errors_stream(job.id),
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": f'attachment; filename="import_{job.id}_errors.csv"'},
+    )
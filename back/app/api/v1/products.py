@@ -2,159 +2,100 @@
 API endpoints для работы с заявками (products)
 """
 from datetime import datetime
-from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
-from app.database import get_db
-from app.dependencies import require_supplier_role, get_supplier_by_token
-from app.models.supplier import Supplier
-from app.models.user_account import UserAccount
+from app.database import AsyncSessionLocal, get_async_db
+from app.dependencies import require_supplier_role, get_supplier_by_token, resolve_supplier_user_id
 from app.schemas.product import (
     ProductCreate,
     ProductUpdate,
     ProductResponse,
     ProductListResponse,
-    StatusInfo,
-    CategoryInfo,
-    SupplierInfo,
+    ProductFacetsResponse,
+    ProductBulkCreate,
+    ProductBulkCreateResponse,
+    ProductStatusTransition,
+    ProductStatusTransitionResponse,
 )
-from app.services.product_service import ProductService
+from app.serialization import FastJSONResponse, csv_columns, dumps, product_to_dict, products_to_csv
+from app.services.async_product_service import AsyncProductService
+from app.services.attribute_filter import parse_attribute_filters
+from app.services.auth_cache import SupplierPrincipal
+from app.services.product_service import TRANSITION_UPDATED, parse_fields
+from app.services.reference_cache import get_categories, get_statuses
+from app.server_timing import timed
+from app.sql_accounting import query_budget
 
 router = APIRouter()
 
 
-def _product_to_response(product) -> ProductResponse:
-    """Преобразует модель Product в схему ответа"""
-    supplier_info = None
-    supplier_account = getattr(product, "supplier_account", None)
-    supplier_profile = None
-    if supplier_account:
-        supplier_profile = supplier_account.supplier_profile
-    
-    if supplier_profile:
-        supplier_info = SupplierInfo(
-            id=supplier_profile.id,
-            custom_name=supplier_profile.custom_name,
-            first_name=supplier_profile.first_name,
-            username=supplier_profile.username,
-            email=None,
-            role=supplier_profile.role,
-        )
-    elif supplier_account:
-        supplier_info = SupplierInfo(
-            id=supplier_account.id,
-            custom_name=supplier_account.first_name or supplier_account.username,
-            first_name=supplier_account.first_name,
-            username=supplier_account.username,
-            email=supplier_account.email,
-            role=supplier_account.role or "supplier",
-        )
-
-    return ProductResponse(
-        id=product.id,
-        source_url=product.source_url,
-        price_rub=product.price_rub,
-        category_id=product.category_id,
-        status_id=product.status_id,
-        supplier_user_id=product.supplier_user_id,
-        country_of_origin=product.country_of_origin,
-        composition=product.composition,
-        size_range=product.size_range,
-        color=product.color,
-        description=product.description,
-        attributes=product.attributes,
-        is_active=product.is_active,
-        approved_by=product.approved_by,
-        approved_at=product.approved_at.isoformat() if product.approved_at else None,
-        created_at=product.created_at.isoformat() if product.created_at else "",
-        updated_at=product.updated_at.isoformat() if product.updated_at else "",
-        status=StatusInfo(
-            id=product.status.id,
-            name=product.status.name,
-            code=product.status.code
-        ) if product.status else None,
-        category=CategoryInfo(
-            id=product.category.id,
-            name=product.category.name,
-            code=product.category.code
-        ) if product.category else None,
-        supplier=supplier_info,
-    )
-
-
-def _resolve_supplier_user_id(
-    db: Session,
-    supplier: Supplier,
-    *,
-    create_if_missing: bool = False,
-) -> Optional[int]:
-    if not supplier.tg_user_id:
-        logger.error(
-            f"У поставщика {supplier.id} отсутствует tg_user_id. Невозможно связать заявку с пользователем."
-        )
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="У вашего аккаунта нет связанного пользователя. Обратитесь к администратору.",
-        )
-    
-    user = (
-        db.query(UserAccount)
-        .filter(UserAccount.tg_user_id == supplier.tg_user_id)
-        .first()
-    )
-    
-    if user:
-        return user.id
-    
-    if not create_if_missing:
-        return None
-    
-    user = UserAccount(
-        tg_user_id=supplier.tg_user_id,
-        username=supplier.username,
-        first_name=supplier.first_name,
-        last_name=supplier.last_name,
-        phone=supplier.phone,
-        role="supplier",
-        is_client=False,
-        deeplink_ref=supplier.deeplink_ref,
-        registered_at=supplier.registered_at or datetime.utcnow(),
-    )
-    db.add(user)
-    db.flush()
-    logger.info(f"Создан аккаунт пользователя {user.id} для поставщика {supplier.id}")
-    return user.id
-
-
 @router.get(
     "",
+    dependencies=[query_budget(4)],
     response_model=ProductListResponse,
     summary="Получить список заявок",
-    description="Возвращает список заявок с пагинацией и фильтрацией. Для поставщиков возвращает только их заявки.",
+    description="Возвращает список заявок с пагинацией и фильтрацией. Для поставщиков возвращает только их заявки. "
+                "Фильтр по атрибутам: attr.<ключ>=<значение> (например attr.material=cotton, "
+                "вложенные ключи через точку; повтор ключа - любое из значений).",
 )
 async def get_products(
+    request: Request,
     page: int = Query(1, ge=1, description="Номер страницы"),
     page_size: int = Query(10, ge=1, le=100, description="Размер страницы"),
     status_id: Optional[int] = Query(None, description="Фильтр по ID статуса"),
     category_id: Optional[int] = Query(None, description="Фильтр по ID категории"),
-    search: Optional[str] = Query(None, description="Поиск по названию/описанию"),
-    supplier: Optional[Supplier] = Depends(get_supplier_by_token),
-    db: Session = Depends(get_db),
+    is_active: Optional[bool] = Query(None, description="Только активные (true) или неактивные (false) заявки"),
+    search: Optional[str] = Query(None, description="Полнотекстовый поиск по описанию/составу/URL"),
+    sort: Literal["created_at", "updated_at", "price_rub", "relevance"] = Query(
+        "created_at", description="Ключ сортировки (relevance - только вместе с search)"
+    ),
+    order: Literal["asc", "desc"] = Query("desc", description="Направление сортировки"),
+    cursor: Optional[str] = Query(
+        None,
+        description="Курсор keyset-пагинации (next_cursor/prev_cursor из предыдущего ответа). "
+                    "При передаче курсора параметр page игнорируется",
+    ),
+    include_total: Literal["exact", "estimate", "none"] = Query(
+        "exact",
+        description="Подсчёт total: exact - точно, estimate - оценка планировщика, none - не считать",
+    ),
+    highlight: bool = Query(False, description="Вернуть фрагменты описания с подсветкой совпадений"),
+    fields: Optional[str] = Query(
+        None,
+        description="Поля ответа через запятую (например id,price_rub,status) или пресет list "
+                    "(поля таблицы заявок). По умолчанию - все поля ProductResponse; "
+                    "незапрошенные поля в ответе отсутствуют",
+    ),
+    supplier: Optional[SupplierPrincipal] = Depends(get_supplier_by_token),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Получает список заявок.
     Если передан токен поставщика - возвращает только его заявки.
     """
     try:
+        selected_fields = parse_fields(fields)
+        attributes = parse_attribute_filters(request.query_params.multi_items())
+        
         supplier_user_id = None
         if supplier:
-            supplier_user_id = _resolve_supplier_user_id(db, supplier, create_if_missing=False)
+            supplier_user_id = await resolve_supplier_user_id(db, supplier, create_if_missing=False)
             if supplier_user_id is None:
-                return ProductListResponse(data=[], total=0, page=page, page_size=page_size)
+                return FastJSONResponse({
+                    "data": [],
+                    "total": None if include_total == "none" else 0,
+                    "total_estimated": False,
+                    "page": page,
+                    "page_size": page_size,
+                    "next_cursor": None,
+                    "prev_cursor": None,
+                })
     
-        products, total = ProductService.get_products(
+        result = await AsyncProductService.get_products(
             db=db,
             supplier_user_id=supplier_user_id,
             status_id=status_id,
@@ -162,25 +103,42 @@ async def get_products(
             page=page,
             page_size=page_size,
             search=search,
+            sort=sort,
+            order=order,
+            cursor=cursor,
+            include_total=include_total,
+            highlight=highlight,
+            fields=selected_fields,
+            attributes=attributes,
+            is_active=is_active,
         )
         
-        # Преобразуем в схемы ответа
+        # Строки из БД сериализуются напрямую, без pydantic-моделей (формат ProductListResponse)
         product_responses = []
-        for p in products:
-            try:
-                product_responses.append(_product_to_response(p))
-            except Exception as conv_error:
-                logger.error(f"Ошибка преобразования продукта {p.id}: {conv_error}")
-                # Пропускаем проблемный продукт
-                continue
+        with timed("serialize"):
+            for p in result.items:
+                try:
+                    product_responses.append(product_to_dict(p, result.snippets.get(p.id), selected_fields))
+                except Exception as conv_error:
+                    logger.error(f"Ошибка преобразования продукта {p.id}: {conv_error}")
+                    # Пропускаем проблемный продукт
+                    continue
         
-        return ProductListResponse(
-            data=product_responses,
-            total=total,
-            page=page,
-            page_size=page_size,
-        )
+        return FastJSONResponse({
+            "data": product_responses,
+            "total": result.total,
+            "total_estimated": result.total_estimated,
+            "page": page,
+            "page_size": page_size,
+            "next_cursor": result.next_cursor,
+            "prev_cursor": result.prev_cursor,
+        })
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     except Exception as e:
         logger.error(f"Ошибка при получении списка заявок: {e}")
         raise HTTPException(
@@ -189,29 +147,183 @@ async def get_products(
         )
 
 
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+async def _export_stream(
+    export_format: str,
+    fields: Optional[frozenset],
+    filters: Optional[dict],
+):
+    """
+    Тело выгрузки. Сессия открывается здесь, а не через Depends:
+    зависимости закрываются до отправки потокового ответа.
+    filters = None - у поставщика ещё нет заявок, выгрузка пустая.
+    """
+    columns = csv_columns(fields)
+    if export_format == "csv":
+        yield products_to_csv([], columns, header=True)
+    if filters is None:
+        return
+    
+    exported = 0
+    try:
+        async with AsyncSessionLocal() as db:
+            async for rows in AsyncProductService.export_products(db, fields=fields, **filters):
+                if export_format == "csv":
+                    yield products_to_csv(rows, columns)
+                else:
+                    yield b"".join(dumps(product_to_dict(p, fields=fields)) + b"\n" for p in rows)
+                exported += len(rows)
+    except Exception as e:
+        # Заголовки уже отправлены: остаётся оборвать поток, клиент увидит неполный ответ
+        logger.error(f"Ошибка выгрузки заявок после {exported} строк: {e}")
+        raise
+    logger.info(f"Выгружено {exported} заявок ({export_format})")
+
+
+@router.get(
+    "/export",
+    dependencies=[query_budget(2)],
+    summary="Выгрузить заявки",
+    description="Потоковая выгрузка всех заявок по фильтрам списка в NDJSON (строка - заявка "
+                "в формате ProductResponse) или CSV (связи развёрнуты в плоские колонки). "
+                "Для поставщиков - только их заявки. Фильтр по атрибутам - attr.<ключ>=<значение>, "
+                "как в списке.",
+)
+async def export_products(
+    request: Request,
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Формат выгрузки"),
+    status_id: Optional[int] = Query(None, description="Фильтр по ID статуса"),
+    category_id: Optional[int] = Query(None, description="Фильтр по ID категории"),
+    is_active: Optional[bool] = Query(None, description="Только активные (true) или неактивные (false) заявки"),
+    search: Optional[str] = Query(None, description="Полнотекстовый поиск по описанию/составу/URL"),
+    sort: Literal["created_at", "updated_at", "price_rub"] = Query("created_at", description="Ключ сортировки"),
+    order: Literal["asc", "desc"] = Query("desc", description="Направление сортировки"),
+    fields: Optional[str] = Query(
+        None,
+        description="Поля через запятую или пресет list, как в списке заявок. По умолчанию - все поля",
+    ),
+    supplier: Optional[SupplierPrincipal] = Depends(get_supplier_by_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Выгружает заявки без пагинации.
+    Строки читаются серверным курсором и отправляются пакетами по мере чтения.
+    """
+    try:
+        selected_fields = parse_fields(fields)
+        attributes = parse_attribute_filters(request.query_params.multi_items())
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    
+    filters = {
+        "supplier_user_id": None,
+        "status_id": status_id,
+        "category_id": category_id,
+        "search": search,
+        "sort": sort,
+        "order": order,
+        "attributes": attributes,
+        "is_active": is_active,
+    }
+    if supplier:
+        filters["supplier_user_id"] = await resolve_supplier_user_id(db, supplier, create_if_missing=False)
+        if filters["supplier_user_id"] is None:
+            filters = None
+    
+    filename = f"products_{datetime.now():%Y%m%d_%H%M%S}.{format}"
+    return StreamingResponse(
+        _export_stream(format, selected_fields, filters),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+def _facet_values(references: list[dict], counts: dict[int, int], fields: tuple) -> list[dict]:
+    """Счётчики в порядке справочника; значения, которых нет в справочнике, - в конце"""
+    values = [
+        {"id": item["id"], **{name: item.get(name) for name in fields}, "count": counts[item["id"]]}
+        for item in references
+        if item["id"] in counts
+    ]
+    known = {item["id"] for item in references}
+    values += [{"id": value_id, "count": count} for value_id, count in counts.items() if value_id not in known]
+    return values
+
+
+@router.get(
+    "/facets",
+    dependencies=[query_budget(4)],
+    response_model=ProductFacetsResponse,
+    summary="Счётчики заявок по статусам и категориям",
+    description="Количество заявок по каждому статусу и каждой категории одним запросом "
+                "(таблица bo.product_counters, поддерживается триггерами). "
+                "Для поставщиков - только их заявки. Значения без заявок не возвращаются.",
+)
+async def get_product_facets(
+    supplier: Optional[SupplierPrincipal] = Depends(get_supplier_by_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Счётчики для панели фильтров"""
+    try:
+        supplier_user_id = None
+        if supplier:
+            supplier_user_id = await resolve_supplier_user_id(db, supplier, create_if_missing=False)
+            if supplier_user_id is None:
+                return FastJSONResponse({"total": 0, "statuses": [], "categories": []})
+        
+        facets = await AsyncProductService.get_facets(db=db, supplier_user_id=supplier_user_id)
+        statuses = await get_statuses(db)
+        categories = await get_categories(db)
+        
+        return FastJSONResponse({
+            "total": sum(facets["status"].values()),
+            "statuses": _facet_values(statuses, facets["status"], ("code", "name", "color")),
+            "categories": _facet_values(categories, facets["category"], ("code", "name")),
+        })
+        
+    except Exception as e:
+        logger.error(f"Ошибка при получении счётчиков заявок: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка при получении счётчиков заявок",
+        )
+
+
 @router.get(
     "/{product_id}",
+    dependencies=[query_budget(2)],
     response_model=ProductResponse,
     summary="Получить заявку по ID",
     description="Возвращает информацию о заявке по её ID.",
 )
 async def get_product(
     product_id: int,
-    supplier: Optional[Supplier] = Depends(get_supplier_by_token),
-    db: Session = Depends(get_db),
+    supplier: Optional[SupplierPrincipal] = Depends(get_supplier_by_token),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Получает заявку по ID"""
     try:
         supplier_user_id = None
         if supplier:
-            supplier_user_id = _resolve_supplier_user_id(db, supplier, create_if_missing=False)
+            supplier_user_id = await resolve_supplier_user_id(db, supplier, create_if_missing=False)
             if supplier_user_id is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Заявка не найдена",
                 )
         
-        product = ProductService.get_product_by_id(
+        product = await AsyncProductService.get_product_by_id(
             db=db,
             product_id=product_id,
             supplier_user_id=supplier_user_id,
@@ -223,7 +335,7 @@ async def get_product(
                 detail="Заявка не найдена",
             )
         
-        return _product_to_response(product)
+        return FastJSONResponse(product_to_dict(product))
         
     except HTTPException:
         raise
@@ -237,6 +349,7 @@ async def get_product(
 
 @router.post(
     "",
+    dependencies=[query_budget(7)],
     response_model=ProductResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Создать новую заявку",
@@ -244,12 +357,12 @@ async def get_product(
 )
 async def create_product(
     product_data: ProductCreate,
-    supplier: Supplier = Depends(require_supplier_role),
-    db: Session = Depends(get_db),
+    supplier: SupplierPrincipal = Depends(require_supplier_role),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Создаёт новую заявку"""
     try:
-        supplier_user_id = _resolve_supplier_user_id(db, supplier, create_if_missing=True)
+        supplier_user_id = await resolve_supplier_user_id(db, supplier, create_if_missing=True)
         if not supplier_user_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -257,13 +370,13 @@ async def create_product(
             )
         product_data.supplier_user_id = supplier_user_id
         
-        product = ProductService.create_product(
+        product = await AsyncProductService.create_product(
             db=db,
             product_data=product_data,
             supplier=supplier,
         )
         
-        return _product_to_response(product)
+        return FastJSONResponse(product_to_dict(product), status_code=status.HTTP_201_CREATED)
         
     except ValueError as e:
         raise HTTPException(
@@ -278,8 +391,138 @@ async def create_product(
         )
 
 
+@router.post(
+    "/bulk",
+    dependencies=[query_budget(7)],
+    response_model=ProductBulkCreateResponse,
+    summary="Создать заявки пакетом",
+    description="Создаёт до PRODUCT_BULK_MAX_ITEMS заявок одним запросом и одной транзакцией. "
+                "Элементы с ошибками пропускаются, результат возвращается по каждому элементу. "
+                "Требуется роль 'supplier'.",
+)
+async def create_products_bulk(
+    payload: ProductBulkCreate,
+    supplier: SupplierPrincipal = Depends(require_supplier_role),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Создаёт заявки пакетом"""
+    try:
+        supplier_user_id = await resolve_supplier_user_id(db, supplier, create_if_missing=True)
+        if not supplier_user_id:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Не удалось определить пользователя для поставщика",
+            )
+        
+        results = await AsyncProductService.create_products_bulk(
+            db=db,
+            items=payload.items,
+            supplier_user_id=supplier_user_id,
+            supplier=supplier,
+        )
+        
+        created = sum(1 for item in results if item.id is not None)
+        return FastJSONResponse({
+            "created": created,
+            "failed": len(results) - created,
+            "results": [
+                {"index": item.index, "id": item.id, "errors": item.errors}
+                for item in results
+            ],
+        })
+        
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Ошибка при массовом создании заявок: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка при массовом создании заявок",
+        )
+
+
+@router.post(
+    "/bulk/status",
+    dependencies=[query_budget(4)],
+    response_model=ProductStatusTransitionResponse,
+    summary="Сменить статус заявок пакетом",
+    description="Переводит заявки в статус status_id. Каждый переход проверяется по графу "
+                "переходов из bo.statuses (can_transition_to, is_final), разрешённые "
+                "выполняются одним запросом. Поставщики могут менять статус только своих заявок; "
+                "перевод в approved - только по токену модератора (он записывается в approved_by).",
+)
+async def transition_products_status(
+    payload: ProductStatusTransition,
+    supplier: Optional[SupplierPrincipal] = Depends(get_supplier_by_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Меняет статус заявок пакетом"""
+    try:
+        supplier_user_id = None
+        approved_by = None
+        if supplier:
+            if supplier.role == "supplier":
+                supplier_user_id = await resolve_supplier_user_id(db, supplier, create_if_missing=False)
+                if supplier_user_id is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Заявки не найдены или нет прав на их изменение",
+                    )
+            else:
+                # Одобрение записывается на модератора (у него может ещё не быть записи в bo.users);
+                # поставщик и запрос без токена одобрять не могут
+                approved_by = await resolve_supplier_user_id(db, supplier, create_if_missing=True)
+        
+        results = await AsyncProductService.transition_status_bulk(
+            db=db,
+            product_ids=payload.product_ids,
+            status_id=payload.status_id,
+            approved_by=approved_by,
+            supplier_user_id=supplier_user_id,
+        )
+        
+        return FastJSONResponse({
+            "status_id": payload.status_id,
+            "updated": sum(1 for item in results if item.outcome == TRANSITION_UPDATED),
+            "results": [
+                {
+                    "id": item.id,
+                    "outcome": item.outcome,
+                    "from_status_id": item.from_status_id,
+                    "detail": item.detail,
+                }
+                for item in results
+            ],
+        })
+        
+    except PermissionError as e:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=str(e),
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Ошибка при массовой смене статуса: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка при массовой смене статуса",
+        )
+
+
 @router.put(
     "/{product_id}",
+    dependencies=[query_budget(6)],
     response_model=ProductResponse,
     summary="Обновить заявку",
     description="Обновляет заявку. Поставщики могут обновлять только свои заявки.",
@@ -287,21 +530,21 @@ async def create_product(
 async def update_product(
     product_id: int,
     product_data: ProductUpdate,
-    supplier: Optional[Supplier] = Depends(get_supplier_by_token),
-    db: Session = Depends(get_db),
+    supplier: Optional[SupplierPrincipal] = Depends(get_supplier_by_token),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Обновляет заявку"""
     try:
         supplier_user_id = None
         if supplier:
-            supplier_user_id = _resolve_supplier_user_id(db, supplier, create_if_missing=False)
+            supplier_user_id = await resolve_supplier_user_id(db, supplier, create_if_missing=False)
             if supplier_user_id is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Заявка не найдена или нет прав на её изменение",
                 )
         
-        product = ProductService.update_product(
+        product = await AsyncProductService.update_product(
             db=db,
             product_id=product_id,
             product_data=product_data,
@@ -314,8 +557,13 @@ async def update_product(
                 detail="Заявка не найдена или нет прав на её изменение",
             )
         
-        return _product_to_response(product)
+        return FastJSONResponse(product_to_dict(product))
         
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -328,27 +576,28 @@ async def update_product(
 
 @router.delete(
     "/{product_id}",
+    dependencies=[query_budget(3)],
     status_code=status.HTTP_204_NO_CONTENT,
     summary="Удалить заявку",
     description="Удаляет заявку. Поставщики могут удалять только свои заявки.",
 )
 async def delete_product(
     product_id: int,
-    supplier: Optional[Supplier] = Depends(get_supplier_by_token),
-    db: Session = Depends(get_db),
+    supplier: Optional[SupplierPrincipal] = Depends(get_supplier_by_token),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Удаляет заявку"""
     try:
         supplier_user_id = None
         if supplier:
-            supplier_user_id = _resolve_supplier_user_id(db, supplier, create_if_missing=False)
+            supplier_user_id = await resolve_supplier_user_id(db, supplier, create_if_missing=False)
             if supplier_user_id is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Заявка не найдена или нет прав на её удаление",
                 )
         
-        deleted = ProductService.delete_product(
+        deleted = await AsyncProductService.delete_product(
             db=db,
             product_id=product_id,
             supplier_user_id=supplier_user_id,
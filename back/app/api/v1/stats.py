@@ -0,0 +1,87 @@
+"""
+API endpoints статистики по заявкам
+"""
+from datetime import date, timedelta
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from app.config import settings
+from app.database import get_async_db
+from app.dependencies import get_supplier_by_token
+from app.schemas.stats import TimeseriesResponse
+from app.serialization import FastJSONResponse
+from app.services.auth_cache import SupplierPrincipal
+from app.services.product_stats import ProductStatsService
+from app.sql_accounting import query_budget
+
+router = APIRouter()
+
+DEFAULT_PERIOD_DAYS = 30
+
+
+@router.get(
+    "/timeseries",
+    dependencies=[query_budget(3)],
+    response_model=TimeseriesResponse,
+    summary="Поступление заявок по дням",
+    description="Количество заявок и средняя цена по дням создания из суточных итогов "
+                "(bo.product_daily_stats, пересчитываются в фоне раз в STATS_ROLLUP_INTERVAL секунд). "
+                "По умолчанию - последние 30 дней.",
+)
+async def get_timeseries(
+    date_from: Optional[date] = Query(None, description="Первый день (включительно)"),
+    date_to: Optional[date] = Query(None, description="Последний день (включительно), по умолчанию сегодня"),
+    group_by: Literal["day", "category", "status"] = Query(
+        "day", description="day - итог за день, category/status - отдельная точка на каждую категорию/статус"
+    ),
+    category_id: Optional[int] = Query(None, description="Фильтр по ID категории"),
+    status_id: Optional[int] = Query(None, description="Фильтр по ID статуса"),
+    supplier: Optional[SupplierPrincipal] = Depends(get_supplier_by_token),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Ряд по дням для графиков"""
+    # Итоги общие для всех поставщиков
+    if supplier and supplier.role == "supplier":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Статистика недоступна для поставщиков",
+        )
+    
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_PERIOD_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from не может быть позже date_to",
+        )
+    if (date_to - date_from).days >= settings.STATS_TIMESERIES_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Период не может быть длиннее {settings.STATS_TIMESERIES_MAX_DAYS} дней",
+        )
+    
+    try:
+        rows = await ProductStatsService.get_timeseries(
+            db,
+            date_from=date_from,
+            date_to=date_to,
+            group_by=group_by,
+            category_id=category_id,
+            status_id=status_id,
+        )
+        refreshed_at = await ProductStatsService.get_watermark(db)
+        return FastJSONResponse({
+            "date_from": date_from,
+            "date_to": date_to,
+            "group_by": group_by,
+            "refreshed_at": refreshed_at,
+            "points": [dict(row._mapping) for row in rows],
+        })
+    except Exception as e:
+        logger.error(f"Ошибка при получении статистики по заявкам: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Ошибка при получении статистики по заявкам",
+        )
@@ -3,48 +3,38 @@ API endpoints для работы со статусами
 """
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
-from app.database import get_db
-from app.models.status import Status
+from app.database import get_async_db
 from app.schemas.status import StatusResponse
+from app.services.reference_cache import get_statuses as load_statuses
+from app.sql_accounting import query_budget
 
 router = APIRouter()
 
 
 @router.get(
     "",
+    dependencies=[query_budget(1)],
     response_model=list[StatusResponse],
     summary="Получить список статусов",
     description="Возвращает список всех доступных статусов для продуктов.",
 )
 async def get_statuses(
     entity_type: Optional[str] = Query("product", description="Тип сущности (product, etc)"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Получает список статусов"""
     try:
-        query = db.query(Status)
+        # Справочник статусов из кэша (сбрасывается по уведомлению из БД)
+        statuses = await load_statuses(db)
         
         # Фильтруем по типу сущности (по умолчанию product)
         if entity_type:
-            query = query.filter(Status.entity_type == entity_type)
+            statuses = [s for s in statuses if s["entity_type"] == entity_type]
         
-        statuses = query.order_by(Status.order_index.asc().nullslast(), Status.id).all()
-        
-        return [
-            StatusResponse(
-                id=s.id,
-                entity_type=s.entity_type,
-                code=s.code,
-                name=s.name,
-                color=s.color,
-                order_index=s.order_index,
-                is_final=s.is_final,
-            )
-            for s in statuses
-        ]
+        return statuses
     except Exception as e:
         logger.error(f"Ошибка при получении статусов: {e}")
         raise HTTPException(
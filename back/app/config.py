@@ -22,6 +22,67 @@ class Settings(BaseSettings):
     # API
     API_V1_PREFIX: str = "/api/v1"
     
+    # Подсчёт total в списке заявок
+    PRODUCT_COUNT_CACHE_TTL: int = 30  # TTL кэша точных счётчиков, сек (0 - без кэша)
+    PRODUCT_COUNT_EXACT_THRESHOLD: int = 1000  # Ниже этой оценки планировщика считаем точно
+    
+    # Массовое создание заявок (POST /products/bulk): максимум элементов в запросе
+    PRODUCT_BULK_MAX_ITEMS: int = 5000
+    
+    # Выгрузка заявок (GET /products/export): строк за одно чтение серверного курсора
+    PRODUCT_EXPORT_BATCH_SIZE: int = 1000
+    
+    # Импорт заявок из CSV/XLSX (POST /products/import) фоновыми задачами
+    PRODUCT_IMPORT_CHUNK_SIZE: int = 1000  # Строк на одну вставку и обновление прогресса
+    PRODUCT_IMPORT_MAX_BYTES: int = 100 * 1024 * 1024  # Максимальный размер файла
+    PRODUCT_IMPORT_WORKERS: int = 2  # Одновременных задач на воркер, остальные ждут в очереди
+    PRODUCT_IMPORT_DIR: Optional[str] = None  # Каталог для загруженных файлов (None - системный temp)
+    # Задачи queued/running без обновлений дольше этого считаются прерванными при старте воркера
+    PRODUCT_IMPORT_STALE_MINUTES: int = 30
+    
+    # Суточные итоги по заявкам (GET /stats/timeseries) и их фоновый пересчёт
+    STATS_ROLLUP_ENABLED: bool = True
+    STATS_ROLLUP_INTERVAL: int = 60  # Сек между пересчётами
+    STATS_ROLLUP_OVERLAP: int = 300  # Сек перекрытия с прошлым водяным знаком (долгие транзакции)
+    STATS_TIMESERIES_MAX_DAYS: int = 366  # Максимальный период одного запроса
+    
+    # Поиск по заявкам: fts - полнотекстовый (tsvector + GIN), ilike - по подстроке
+    PRODUCT_SEARCH_MODE: str = "fts"
+    # Поиск/attr-фильтры с сортировкой по колонке: при оценке совпадений ниже порога
+    # они берутся из GIN-индекса и сортируются, а не ищутся обходом индекса сортировки
+    PRODUCT_GIN_SORT_MAX_ROWS: int = 20000
+    
+    # Кэш аутентификации по токену (токен -> поставщик и его bo.users.id)
+    AUTH_CACHE_TTL: int = 60  # Сек (0 - без кэша)
+    AUTH_CACHE_MAX_ENTRIES: int = 1024
+    
+    # Учёт SQL на HTTP-запрос (app/sql_accounting.py)
+    SQL_SLOW_QUERY_MS: int = 500  # Запросы дольше пишутся в лог с формой параметров (0 - не писать)
+    SQL_REPEAT_THRESHOLD: int = 5  # Одинаковый SQL столько раз за запрос - предупреждение о N+1 (0 - выкл.)
+    SQL_QUERY_BUDGET_MODE: str = "log"  # Превышение бюджета маршрута (query_budget): off, log, raise (тесты)
+    
+    # Логирование (app/logging_config.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_FILE: str = "logs/app.log"
+    LOG_JSON: bool = True  # Файл в JSON по строке на событие (false - текст)
+    LOG_STDERR: bool = True  # Дублировать в stderr текстом
+    LOG_ENQUEUE: bool = True  # Запись в фоновом потоке, а не в потоке запроса
+    LOG_QUEUE_SIZE: int = 10000  # Событий в очереди записи; при переполнении отбрасываются
+    LOG_SAMPLE_RATE_INFO: float = 0.1  # Доля частых INFO-событий (sampled_logger), 1 - все
+    LOG_SAMPLE_RATE_DEBUG: float = 0.01
+    
+    # Заголовок Server-Timing (auth, db, db-queries, serialize, total) и его запись в лог
+    SERVER_TIMING_ENABLED: bool = True
+    SERVER_TIMING_LOG: bool = False  # Разбивка каждого запроса в лог (с выборкой LOG_SAMPLE_RATE_INFO)
+    
+    # Метрики Prometheus (GET /metrics); при нескольких воркерах нужен PROMETHEUS_MULTIPROC_DIR
+    METRICS_ENABLED: bool = True
+    
+    # Справочные данные (категории, статусы, кэш авторизации) и их сброс через LISTEN/NOTIFY
+    REFERENCE_LISTEN_ENABLED: bool = True
+    REFERENCE_CACHE_TTL: int = 6 * 3600  # Сек, пока слушатель подключён
+    REFERENCE_CACHE_FALLBACK_TTL: int = 300  # Сек, если слушатель не подключён
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -2,15 +2,21 @@
 Подключение к базе данных PostgreSQL
 """
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from loguru import logger
 
 from app.config import settings
+from app import sql_accounting
+from app.metrics import TimedAsyncAdaptedQueuePool, TimedQueuePool, instrument_engine
 
 # Создаём движок SQLAlchemy
 engine = create_engine(
     settings.DATABASE_URL,
+    poolclass=TimedQueuePool,  # QueuePool + время ожидания соединения для /metrics
     pool_pre_ping=True,  # Проверка соединения перед использованием
     pool_size=5,  # Уменьшил размер пула
     max_overflow=10,  # Уменьшил overflow
@@ -26,6 +32,44 @@ engine = create_engine(
 # Создаём фабрику сессий
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+
+def _async_database_url(url: str) -> str:
+    """postgresql://... -> postgresql+asyncpg://..."""
+    scheme, rest = url.split("://", 1)
+    return f"{scheme.split('+', 1)[0]}+asyncpg://{rest}"
+
+
+# Асинхронный движок (asyncpg) для API: запросы к БД не блокируют event loop
+async_engine = create_async_engine(
+    _async_database_url(settings.DATABASE_URL),
+    poolclass=TimedAsyncAdaptedQueuePool,
+    pool_pre_ping=True,
+    pool_size=5,
+    max_overflow=10,
+    pool_timeout=30,
+    pool_recycle=3600,
+    connect_args={
+        "timeout": 30,  # Таймаут подключения к БД
+        "server_settings": {"statement_timeout": "60000"},  # Таймаут выполнения запроса (60 сек)
+    },
+    echo=False,
+)
+
+# Учёт SQL на HTTP-запрос (медленные запросы, N+1, бюджет маршрута) и метрики
+sql_accounting.instrument_engine(engine)
+sql_accounting.instrument_engine(async_engine.sync_engine)
+if settings.METRICS_ENABLED:
+    instrument_engine(engine, "sync")
+    instrument_engine(async_engine.sync_engine, "async")
+
+# Фабрика асинхронных сессий
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 # Базовый класс для моделей
 Base = declarative_base()
 
@@ -46,6 +90,41 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Dependency для получения асинхронной сессии БД.
+    Используется в FastAPI через Depends(get_async_db)
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception as e:
+            logger.error(f"Ошибка работы с БД: {e}")
+            await db.rollback()
+            raise
+
+
+class Explain(Executable, ClauseElement):
+    """
+    EXPLAIN для произвольного SELECT с обычными bind-параметрами.
+    Пример: db.execute(Explain(stmt)).scalar()
+    """
+    inherit_cache = False
+
+    def __init__(self, statement, analyze: bool = False, format: str = "JSON"):
+        self.statement = statement
+        self.analyze = analyze
+        self.format = format
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    options = [f"FORMAT {element.format}"]
+    if element.analyze:
+        options.insert(0, "ANALYZE")
+    return f"EXPLAIN ({', '.join(options)}) " + compiler.process(element.statement, **kw)
+
+
 def init_db():
     """Инициализация БД (создание таблиц, если их нет)"""
     try:
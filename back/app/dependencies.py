@@ -1,50 +1,154 @@
 """
 Зависимости для FastAPI (JWT, токены, авторизация)
 """
+from datetime import datetime
 from typing import Optional
 from fastapi import Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from loguru import logger
 
-from app.database import get_db
+from app.database import get_async_db
+from app.logging_config import sampled_logger
+from app.server_timing import timed
 from app.models.supplier import Supplier
+from app.models.user_account import UserAccount
+from app.services.auth_cache import SupplierPrincipal, principal_cache
 
+# bo.users.id пользователя поставщика (по tg_user_id), считается в том же запросе
+_supplier_user_id = (
+    select(UserAccount.id)
+    .where(UserAccount.tg_user_id == Supplier.tg_user_id)
+    .order_by(UserAccount.id)
+    .limit(1)
+    .scalar_subquery()
+)
 
-def get_supplier_by_token(
+
+async def _load_principal(db: AsyncSession, token: str) -> Optional[SupplierPrincipal]:
+    """Поставщик по токену вместе с bo.users.id одним запросом"""
+    result = await db.execute(
+        select(
+            Supplier.id,
+            Supplier.role,
+            Supplier.tg_user_id,
+            Supplier.custom_name,
+            Supplier.first_name,
+            Supplier.username,
+            _supplier_user_id.label("user_id"),
+        )
+        .where(Supplier.token == token)
+        .limit(1)
+    )
+    row = result.first()
+    if row is None:
+        return None
+    return SupplierPrincipal(
+        id=row.id,
+        role=row.role,
+        tg_user_id=row.tg_user_id,
+        user_id=row.user_id,
+        name=row.custom_name or row.first_name or row.username or f"ID:{row.id}",
+    )
+
+
+async def get_supplier_by_token(
     token: Optional[str] = Query(None, description="Токен для доступа"),
-    db: Session = Depends(get_db),
-) -> Optional[Supplier]:
+    db: AsyncSession = Depends(get_async_db),
+) -> Optional[SupplierPrincipal]:
     """
     Получает поставщика по токену из query параметра.
     Если токен не передан или не найден - возвращает None.
+    Результат кэшируется (principal_cache), ненайденные токены не кэшируются.
+    Время попадает в Server-Timing (auth).
     """
+    with timed("auth"):
+        return await _principal_for_token(db, token)
+
+
+async def _principal_for_token(db: AsyncSession, token: Optional[str]) -> Optional[SupplierPrincipal]:
     if not token:
-        logger.warning("Токен не передан в запросе")
+        sampled_logger.info("Токен не передан в запросе")
         return None
     
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+    
     try:
-        supplier = db.query(Supplier).filter(Supplier.token == token).first()
-        if not supplier:
+        generation = principal_cache.generation
+        principal = await _load_principal(db, token)
+        if not principal:
             logger.warning(f"Поставщик с токеном {token[:10]}... не найден")
             return None
         
-        # Получаем имя поставщика для логирования
-        supplier_name = (
-            supplier.custom_name or 
-            supplier.first_name or 
-            supplier.username or 
-            f"ID:{supplier.id}"
-        )
-        logger.info(f"Поставщик {supplier_name} (ID: {supplier.id}) авторизован по токену")
-        return supplier
+        principal_cache.set(token, principal, generation)
+        logger.info("Поставщик {} (ID: {}) авторизован по токену", principal.name, principal.id)
+        return principal
     except Exception as e:
         logger.error(f"Ошибка при проверке токена: {e}")
         return None
 
 
+async def resolve_supplier_user_id(
+    db: AsyncSession,
+    supplier: SupplierPrincipal,
+    *,
+    create_if_missing: bool = False,
+) -> Optional[int]:
+    """
+    bo.users.id поставщика (или модератора). Обычно уже есть в principal (get_supplier_by_token),
+    в БД идём, только если пользователя на момент авторизации не было.
+    """
+    if not supplier.tg_user_id:
+        logger.error(
+            f"У поставщика {supplier.id} отсутствует tg_user_id. Невозможно связать заявку с пользователем."
+        )
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="У вашего аккаунта нет связанного пользователя. Обратитесь к администратору.",
+        )
+    
+    if supplier.user_id:
+        return supplier.user_id
+    
+    result = await db.execute(
+        select(UserAccount.id)
+        .where(UserAccount.tg_user_id == supplier.tg_user_id)
+        .limit(1)
+    )
+    user_id = result.scalar()
+    
+    if user_id:
+        # Пользователь появился после авторизации (например, в другом воркере)
+        principal_cache.invalidate_supplier(supplier.id)
+        return user_id
+    
+    if not create_if_missing:
+        return None
+    
+    # Для нового пользователя нужны полные данные поставщика
+    supplier_row = await db.get(Supplier, supplier.id)
+    user = UserAccount(
+        tg_user_id=supplier_row.tg_user_id,
+        username=supplier_row.username,
+        first_name=supplier_row.first_name,
+        last_name=supplier_row.last_name,
+        phone=supplier_row.phone,
+        role=supplier.role,
+        is_client=False,
+        deeplink_ref=supplier_row.deeplink_ref,
+        registered_at=supplier_row.registered_at or datetime.utcnow(),
+    )
+    db.add(user)
+    await db.flush()
+    logger.info(f"Создан аккаунт пользователя {user.id} для поставщика {supplier.id}")
+    return user.id
+
+
 def require_supplier(
-    supplier: Optional[Supplier] = Depends(get_supplier_by_token),
-) -> Supplier:
+    supplier: Optional[SupplierPrincipal] = Depends(get_supplier_by_token),
+) -> SupplierPrincipal:
     """
     Требует наличие валидного токена и возвращает поставщика.
     Вызывает 401 если токен невалиден или отсутствует.
@@ -59,8 +163,8 @@ def require_supplier(
 
 
 def require_supplier_role(
-    supplier: Supplier = Depends(require_supplier),
-) -> Supplier:
+    supplier: SupplierPrincipal = Depends(require_supplier),
+) -> SupplierPrincipal:
     """
     Требует роль 'supplier' у пользователя.
     """
@@ -0,0 +1,223 @@
+"""
+Настройка логирования (loguru).
+
+- Файл LOG_FILE пишется в JSON по строке на событие (LOG_JSON): время, уровень, сообщение,
+  модуль/функция/строка, поля bind() и traceback; stderr (LOG_STDERR) - текстом;
+- запись идёт в фоновом потоке (LOG_ENQUEUE): в потоке запроса остаются сборка строки и
+  постановка в очередь, поток записи пишет накопившееся одной пачкой. Очередь ограничена
+  (LOG_QUEUE_SIZE): если диск не успевает, события отбрасываются со счётчиком, а не
+  задерживают запросы. enqueue=True самого loguru не используется - он передаёт каждую
+  запись через pipe multiprocessing с pickle и стоит дороже синхронной записи;
+- частые события горячего пути (авторизация, список, карточка, справочники) пишутся через
+  sampled_logger: INFO/DEBUG с вероятностью LOG_SAMPLE_RATE_INFO/DEBUG, в JSON добавляется
+  sample_rate (чтобы пересчитать количество). WARNING и выше не прореживаются;
+- сообщения с аргументами ("Заявка {} найдена", product_id) форматируются только если
+  событие прошло уровень и выборку, в отличие от f-строк.
+"""
+import atexit
+import queue
+import random
+import sys
+import threading
+import traceback
+from typing import Any, Callable, Optional, TextIO
+
+import orjson
+from loguru import logger
+
+from app.config import settings
+
+# Ключ extra, в который формат-функция кладёт готовую строку
+_LINE_KEY = "_line"
+# Метка записей потока записи (пачка готовых строк для файлового обработчика)
+_BATCH_KEY = "_log_batch"
+_STOP = object()
+
+
+def _exception_text(record: dict) -> Optional[str]:
+    exception = record["exception"]
+    if exception is None:
+        return None
+    return "".join(traceback.format_exception(exception.type, exception.value, exception.traceback))
+
+
+def _json_line(record: dict) -> str:
+    payload: dict[str, Any] = {
+        "time": record["time"].isoformat(),
+        "level": record["level"].name,
+        "message": record["message"],
+        "module": record["name"],
+        "function": record["function"],
+        "line": record["line"],
+    }
+    extra = {key: value for key, value in record["extra"].items() if key != _LINE_KEY}
+    if extra:
+        payload["extra"] = extra
+    exception = _exception_text(record)
+    if exception is not None:
+        payload["exception"] = exception
+    return orjson.dumps(payload, default=str).decode()
+
+
+def _text_line(record: dict) -> str:
+    # Формат времени loguru ({time:...}) разбирается на каждом событии, strftime быстрее
+    line = f"{record['time']:%Y-%m-%d %H:%M:%S} | {record['level'].name} | {record['message']}"
+    exception = _exception_text(record)
+    if exception is not None:
+        line = f"{line}\n{exception.rstrip()}"
+    return line
+
+
+def _format_with(render: Callable[[dict], str]) -> Callable[[dict], str]:
+    """Формат-функция loguru: строка собирается целиком, шаблон только подставляет её"""
+    template = "{extra[" + _LINE_KEY + "]}\n"
+
+    def format_record(record: dict) -> str:
+        record["extra"][_LINE_KEY] = render(record)
+        return template
+
+    return format_record
+
+
+def _not_batch(record: dict) -> bool:
+    return _BATCH_KEY not in record["extra"]
+
+
+def _is_batch(record: dict) -> bool:
+    return _BATCH_KEY in record["extra"]
+
+
+class BackgroundWriter:
+    """
+    Sink loguru с записью в фоновом потоке: вызов кладёт готовую строку в очередь,
+    поток забирает всё накопившееся и вызывает write() один раз на пачку.
+    """
+
+    def __init__(self, write: Callable[[str], None], name: str, max_queue: int):
+        self._write = write
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f"log-writer-{name}", daemon=True)
+        self._thread.start()
+
+    def __call__(self, message: str) -> None:
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            with self._lock:
+                self._dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = []
+            while item is not _STOP:
+                batch.append(item)
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            with self._lock:
+                dropped, self._dropped = self._dropped, 0
+            if dropped:
+                batch.append(f"Очередь лога переполнена, пропущено событий: {dropped}\n")
+            if batch:
+                try:
+                    self._write("".join(batch))
+                except Exception as e:
+                    sys.stderr.write(f"Ошибка записи лога: {e}\n")
+            if item is _STOP:
+                return
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Дописывает очередь и останавливает поток"""
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+
+_writers: list[BackgroundWriter] = []
+
+
+def _stream_writer(stream: TextIO) -> Callable[[str], None]:
+    def write(batch: str) -> None:
+        stream.write(batch)
+        stream.flush()
+
+    return write
+
+
+def setup_logging(
+    log_file: Optional[str] = None,
+    stderr: Optional[TextIO] = sys.stderr,
+) -> None:
+    """
+    Заменяет обработчики loguru: файл (JSON или текст) и stderr (текст).
+    log_file=None - settings.LOG_FILE; stderr=None - без вывода в консоль.
+    """
+    stop_logging()
+    logger.remove()
+    level = settings.LOG_LEVEL
+    log_file = log_file or settings.LOG_FILE
+    file_format = _format_with(_json_line if settings.LOG_JSON else _text_line)
+    file_options = {"rotation": "10 MB", "retention": "10 days"}
+    stderr = stderr if settings.LOG_STDERR else None
+
+    if not settings.LOG_ENQUEUE:
+        if stderr is not None:
+            logger.add(stderr, level=level, format=_format_with(_text_line))
+        logger.add(log_file, level=level, format=file_format, **file_options)
+        return
+
+    if stderr is not None:
+        writer = BackgroundWriter(_stream_writer(stderr), "stderr", settings.LOG_QUEUE_SIZE)
+        _writers.append(writer)
+        logger.add(writer, level=level, format=_format_with(_text_line), filter=_not_batch)
+
+    # Ротацию и очистку файла оставляем loguru: поток записи передаёт пачку строк
+    # отдельному файловому обработчику, который принимает только такие записи
+    batch_logger = logger.bind(**{_BATCH_KEY: True}).opt(raw=True)
+    logger.add(log_file, level=level, filter=_is_batch, **file_options)
+    writer = BackgroundWriter(lambda batch: batch_logger.log(level, batch), "file", settings.LOG_QUEUE_SIZE)
+    _writers.append(writer)
+    logger.add(writer, level=level, format=file_format, filter=_not_batch)
+
+
+def stop_logging() -> None:
+    """Дописывает очереди фоновой записи (при остановке приложения)"""
+    while _writers:
+        _writers.pop().stop()
+
+
+class SampledLogger:
+    """
+    Логгер частых событий: INFO и DEBUG пишутся с вероятностью из настроек,
+    остальные уровни - всегда. Выборка делается до форматирования сообщения.
+    """
+
+    def __init__(self, rates: Optional[dict[str, float]] = None):
+        self.rates = rates if rates is not None else {
+            "DEBUG": settings.LOG_SAMPLE_RATE_DEBUG,
+            "INFO": settings.LOG_SAMPLE_RATE_INFO,
+        }
+
+    def _log(self, level: str, message: str, args: tuple, kwargs: dict) -> None:
+        rate = self.rates.get(level, 1.0)
+        if rate < 1.0:
+            if rate <= 0.0 or random.random() >= rate:
+                return
+            # depth=2: в записи место вызова sampled_logger.info(), а не этот метод
+            logger.opt(depth=2).bind(sample_rate=rate).log(level, message, *args, **kwargs)
+            return
+        logger.opt(depth=2).log(level, message, *args, **kwargs)
+
+    def debug(self, message: str, *args: Any, **kwargs: Any) -> None:
+        self._log("DEBUG", message, args, kwargs)
+
+    def info(self, message: str, *args: Any, **kwargs: Any) -> None:
+        self._log("INFO", message, args, kwargs)
+
+
+sampled_logger = SampledLogger()
+
+atexit.register(stop_logging)
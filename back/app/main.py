@@ -1,21 +1,48 @@
 """
 Главный файл приложения FastAPI
 """
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from loguru import logger
 
 from app.config import settings
 from app.api.v1 import api_router
+from app.database import async_engine
+from app.logging_config import setup_logging, stop_logging
+from app.metrics import METRICS_PATH, MetricsMiddleware, render_metrics
+from app.server_timing import ServerTimingMiddleware
+from app.sql_accounting import SQLAccountingMiddleware
+from app.services.product_import import product_import_runner
+from app.services.product_stats import product_stats_refresher
+from app.services.reference_listener import reference_listener
+
+# Настраиваем логирование (JSON-файл и stderr, запись в фоновом потоке)
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Старт и остановка приложения"""
+    # Справочники: прогрев кэшей и сброс по уведомлениям из БД
+    if settings.REFERENCE_LISTEN_ENABLED:
+        await reference_listener.start()
+    # Задачи импорта, оставшиеся от прошлого запуска, уже никто не выполнит
+    await asyncio.to_thread(product_import_runner.recover)
+    # Суточные итоги по заявкам для GET /stats/timeseries
+    if settings.STATS_ROLLUP_ENABLED:
+        await product_stats_refresher.start()
+    yield
+    await reference_listener.stop()
+    await product_stats_refresher.stop()
+    # Задачи импорта дописывают текущий пакет и помечаются прерванными
+    await asyncio.to_thread(product_import_runner.stop)
+    # Закрываем соединения асинхронного пула
+    await async_engine.dispose()
+    # Дописываем очередь логов
+    stop_logging()
 
-# Настраиваем логирование
-logger.add(
-    "logs/app.log",
-    rotation="10 MB",
-    retention="10 days",
-    level="INFO",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}",
-)
 
 # Создаём приложение
 app = FastAPI(
@@ -24,6 +51,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Настраиваем CORS
@@ -35,6 +63,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Server-Timing, метрики запросов (считают и время CORS-обработки) и снаружи - учёт SQL на запрос
+if settings.SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+app.add_middleware(SQLAccountingMiddleware)
+
 # Подключаем роуты
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
@@ -55,6 +90,14 @@ async def health_check():
     return {"status": "ok", "message": "API работает"}
 
 
+if settings.METRICS_ENABLED:
+    @app.get(METRICS_PATH, tags=["health"], include_in_schema=False)
+    async def metrics():
+        """Метрики Prometheus"""
+        content, content_type = render_metrics()
+        return Response(content, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
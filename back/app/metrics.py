@@ -0,0 +1,193 @@
+"""
+Метрики Prometheus (GET /metrics).
+
+- HTTP: гистограмма длительности по шаблону маршрута (/api/v1/products/{product_id},
+  а не конкретный URL), счётчик ответов по статусу, запросы в работе;
+- пул соединений (sync и async движки): ожидание соединения, выданные соединения,
+  overflow - обновляются событиями пула, а не опросом при сборе метрик;
+- SQL: число запросов и время в БД на один HTTP-запрос (из учёта app/sql_accounting.py).
+
+Накладные расходы - несколько обращений к счётчикам на запрос и на SQL-запрос,
+поэтому метрики включены по умолчанию (METRICS_ENABLED).
+При нескольких воркерах uvicorn нужна переменная окружения PROMETHEUS_MULTIPROC_DIR
+(пустой каталог): значения воркеров складываются через файлы prometheus_client.
+"""
+import os
+import threading
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.sql_accounting import request_sql_stats
+
+METRICS_PATH = "/metrics"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Длительность HTTP-запроса (до отправки последнего байта ответа)",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+http_responses = Counter(
+    "http_responses_total",
+    "HTTP-ответы по статусу",
+    ["method", "route", "status"],
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "HTTP-запросы в работе",
+    multiprocess_mode="livesum",
+)
+db_pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Ожидание соединения из пула (включая создание соединения и pre-ping)",
+    ["pool"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+db_pool_checked_out = Gauge(
+    "db_pool_checked_out",
+    "Соединения, выданные из пула",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+db_pool_overflow = Gauge(
+    "db_pool_overflow",
+    "Соединения сверх pool_size (max_overflow - предел)",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+db_pool_size = Gauge(
+    "db_pool_size",
+    "Размер пула (pool_size)",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+db_queries = Counter(
+    "db_queries_total",
+    "SQL-запросы (включая фоновые задачи)",
+    ["pool"],
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request",
+    "SQL-запросов на один HTTP-запрос",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+db_time_per_request = Histogram(
+    "db_time_per_request_seconds",
+    "Время выполнения SQL на один HTTP-запрос",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+
+
+class _TimedPoolMixin:
+    """Время получения соединения из пула (имя - метка pool)"""
+    metrics_name: str
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            db_pool_checkout_wait.labels(self.metrics_name).observe(time.perf_counter() - started)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    metrics_name = "sync"
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    metrics_name = "async"
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Подписывает метрики на события пула и движка (для async - передать engine.sync_engine)"""
+    pool = engine.pool
+    checked_out = db_pool_checked_out.labels(name)
+    overflow = db_pool_overflow.labels(name)
+    queries = db_queries.labels(name)
+    size = pool.size() if hasattr(pool, "size") else 0
+    db_pool_size.labels(name).set(size)
+    # Собственный счётчик: событие checkin приходит до того, как пул учтёт возврат
+    lock = threading.Lock()
+    state = {"checked_out": 0}
+
+    def update_pool(delta: int) -> None:
+        with lock:
+            state["checked_out"] += delta
+            current = state["checked_out"]
+        checked_out.set(current)
+        overflow.set(max(current - size, 0))
+
+    event.listen(pool, "checkout", lambda *args: update_pool(1))
+    event.listen(pool, "checkin", lambda *args: update_pool(-1))
+
+    event.listen(engine, "after_cursor_execute", lambda *args: queries.inc())
+
+
+def _route_template(scope: dict) -> str:
+    """Шаблон маршрута после роутинга; неизвестные пути в одну метку (ограничение кардинальности)"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI-middleware метрик HTTP (не буферизует потоковые ответы, в отличие от BaseHTTPMiddleware).
+    SQL на запрос берётся из RequestSQLStats, поэтому SQLAccountingMiddleware должен быть снаружи.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        stats = request_sql_stats.get()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        http_requests_in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_progress.dec()
+            method = scope["method"]
+            route = _route_template(scope)
+            http_request_duration.labels(method, route).observe(elapsed)
+            http_responses.labels(method, route, str(status_code)).inc()
+            if stats is not None:
+                db_queries_per_request.labels(route).observe(stats.queries)
+                db_time_per_request.labels(route).observe(stats.duration)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Текст метрик и его Content-Type; при PROMETHEUS_MULTIPROC_DIR - сумма по воркерам"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -6,6 +6,20 @@ from app.models.product import Product
 from app.models.status import Status
 from app.models.category import Category
 from app.models.user_account import UserAccount
+from app.models.product_import import ProductImportJob, ProductImportError
+from app.models.product_counter import ProductCounter
+from app.models.product_stats import ProductDailyStat, ProductDailyStatDirty, RollupWatermark
 
-__all__ = ["Supplier", "Product", "Status", "Category", "UserAccount"]
-
+__all__ = [
+    "Supplier",
+    "Product",
+    "Status",
+    "Category",
+    "UserAccount",
+    "ProductImportJob",
+    "ProductImportError",
+    "ProductCounter",
+    "ProductDailyStat",
+    "ProductDailyStatDirty",
+    "RollupWatermark",
+]
@@ -1,9 +1,9 @@
 """
 Модель заявки/товара (products)
 """
-from sqlalchemy import Column, BigInteger, Text, ForeignKey, Numeric, Boolean, DateTime, JSON
-from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship, foreign
+from sqlalchemy import Column, BigInteger, Text, ForeignKey, Numeric, Boolean, DateTime, JSON, Index, Computed, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, foreign, deferred
 from sqlalchemy.sql import func
 
 from app.database import Base
@@ -15,21 +15,66 @@ class Product(Base):
     Таблица: bo.products
     """
     __tablename__ = "products"
-    __table_args__ = {"schema": "bo"}
+    __table_args__ = (
+        # Составные индексы (ключ сортировки, id) для keyset-пагинации
+        Index("ix_products_created_at_id", "created_at", "id"),
+        Index("ix_products_updated_at_id", "updated_at", "id"),
+        Index("ix_products_price_rub_id", "price_rub", "id"),
+        # Фильтры списка (равенство) + сортировка по умолчанию created_at, id
+        Index("ix_products_supplier_created_at", "supplier_user_id", "created_at", "id"),
+        Index("ix_products_status_created_at", "status_id", "created_at", "id"),
+        Index("ix_products_category_created_at", "category_id", "created_at", "id"),
+        Index("ix_products_supplier_status_created_at", "supplier_user_id", "status_id", "created_at", "id"),
+        Index("ix_products_supplier_category_created_at", "supplier_user_id", "category_id", "created_at", "id"),
+        Index("ix_products_status_category_created_at", "status_id", "category_id", "created_at", "id"),
+        Index(
+            "ix_products_supplier_status_category_created_at",
+            "supplier_user_id", "status_id", "category_id", "created_at", "id",
+        ),
+        # Список активных заявок: is_active - предикатом частичного индекса
+        Index("ix_products_active_created_at", "created_at", "id", postgresql_where=text("is_active")),
+        Index(
+            "ix_products_active_supplier_created_at",
+            "supplier_user_id", "created_at", "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_products_active_status_created_at",
+            "status_id", "created_at", "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_products_active_category_created_at",
+            "category_id", "created_at", "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index(
+            "ix_products_active_supplier_status_created_at",
+            "supplier_user_id", "status_id", "created_at", "id",
+            postgresql_where=text("is_active"),
+        ),
+        Index("ix_products_search_vector", "search_vector", postgresql_using="gin"),
+        # Фильтры attr.<ключ>=<значение> (attributes @> ...), см. app/services/attribute_filter.py
+        Index(
+            "ix_products_attributes",
+            "attributes",
+            postgresql_using="gin",
+            postgresql_ops={"attributes": "jsonb_path_ops"},
+        ),
+        {"schema": "bo"},
+    )
     
-    id = Column(BigInteger, primary_key=True, autoincrement=True, index=True, nullable=False)
+    id = Column(BigInteger, primary_key=True, autoincrement=True, nullable=False)
     supplier_user_id = Column(
         BigInteger,
         ForeignKey("bo.users.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
         comment="ID пользователя (из таблицы bo.users), создавшего заявку",
     )
     category_id = Column(
         BigInteger,
         ForeignKey("bo.categories.id", ondelete="SET NULL"),
         nullable=False,
-        index=True,
         comment="ID категории",
     )
     source_url = Column(Text, nullable=False, comment="URL источника товара")
@@ -44,7 +89,6 @@ class Product(Base):
         BigInteger,
         ForeignKey("bo.statuses.id", ondelete="SET NULL"),
         nullable=False,
-        index=True,
         comment="ID статуса",
     )
     approved_by = Column(BigInteger, nullable=True, comment="ID пользователя, который утвердил")
@@ -52,6 +96,17 @@ class Product(Base):
     is_active = Column(Boolean, nullable=False, server_default="true", comment="Активна ли заявка")
     created_at = Column(DateTime(timezone=False), nullable=False, server_default=func.now(), comment="Дата создания")
     updated_at = Column(DateTime(timezone=False), nullable=False, server_default=func.now(), onupdate=func.now(), comment="Дата обновления")
+    # Поисковый вектор (конфигурация russian), вычисляется PostgreSQL. Не загружается по умолчанию.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('russian', coalesce(description, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(composition, '')), 'B') || "
+            "setweight(to_tsvector('russian', coalesce(source_url, '')), 'C')",
+            persisted=True,
+        ),
+        comment="Полнотекстовый индекс по описанию, составу и URL",
+    ))
     
     # Связи
     supplier_account = relationship(
@@ -0,0 +1,29 @@
+"""
+Модель счётчиков заявок по статусам и категориям (product_counters)
+"""
+from sqlalchemy import Column, BigInteger, Text
+
+from app.database import Base
+
+
+class ProductCounter(Base):
+    """
+    Количество заявок с данным статусом/категорией у поставщика.
+    Таблица: bo.product_counters (миграция 007_product_counters.sql).
+    Поддерживается триггерами на bo.products, из приложения только читается.
+    Итоги по всем поставщикам - сумма строк (миграция 010_product_counters_per_supplier.sql).
+    """
+    __tablename__ = "product_counters"
+    __table_args__ = {"schema": "bo"}
+    
+    supplier_user_id = Column(
+        BigInteger,
+        primary_key=True,
+        comment="ID пользователя (bo.users)",
+    )
+    facet = Column(Text, primary_key=True, comment="Измерение: status или category")
+    value_id = Column(BigInteger, primary_key=True, comment="ID статуса или категории")
+    count = Column(BigInteger, nullable=False, server_default="0", comment="Количество заявок")
+    
+    def __repr__(self):
+        return f"<ProductCounter({self.supplier_user_id}, {self.facet}={self.value_id}: {self.count})>"
@@ -0,0 +1,71 @@
+"""
+Модели импорта заявок из файлов (product_import_jobs, product_import_errors)
+"""
+from sqlalchemy import Column, BigInteger, Integer, Text, Numeric, DateTime, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class ProductImportJob(Base):
+    """
+    Задача импорта заявок из CSV/XLSX.
+    Таблица: bo.product_import_jobs
+    """
+    __tablename__ = "product_import_jobs"
+    __table_args__ = (
+        # Поиск прерванных задач при старте (ProductImportService.fail_stale_jobs)
+        Index(
+            "ix_product_import_jobs_unfinished_updated_at",
+            "updated_at",
+            postgresql_where=text("status IN ('queued', 'running')"),
+        ),
+        {"schema": "bo"},
+    )
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True, index=True, nullable=False)
+    supplier_user_id = Column(
+        BigInteger,
+        ForeignKey("bo.users.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+        comment="ID пользователя (bo.users), загрузившего файл",
+    )
+    file_name = Column(Text, nullable=True, comment="Имя загруженного файла")
+    file_format = Column(Text, nullable=False, comment="Формат файла (csv, xlsx)")
+    file_path = Column(Text, nullable=True, comment="Сохранённый файл (удаляется по окончании импорта)")
+    status = Column(Text, nullable=False, server_default="queued", comment="queued, running, done, failed")
+    rows_processed = Column(Integer, nullable=False, server_default="0", comment="Обработано строк")
+    rows_created = Column(Integer, nullable=False, server_default="0", comment="Создано заявок")
+    rows_failed = Column(Integer, nullable=False, server_default="0", comment="Строк с ошибками")
+    progress = Column(Numeric(5, 4), nullable=False, server_default="0", comment="Доля обработанного файла, 0..1")
+    error = Column(Text, nullable=True, comment="Причина сбоя задачи целиком")
+    created_at = Column(DateTime(timezone=False), nullable=False, server_default=func.now(), comment="Дата создания")
+    started_at = Column(DateTime(timezone=False), nullable=True, comment="Начало обработки")
+    finished_at = Column(DateTime(timezone=False), nullable=True, comment="Окончание обработки")
+    updated_at = Column(DateTime(timezone=False), nullable=False, server_default=func.now(), onupdate=func.now(), comment="Дата обновления")
+    
+    def __repr__(self):
+        return f"<ProductImportJob(id={self.id}, status={self.status}, rows_processed={self.rows_processed})>"
+
+
+class ProductImportError(Base):
+    """
+    Ошибки строк файла импорта (отчёт для загрузки).
+    Таблица: bo.product_import_errors
+    """
+    __tablename__ = "product_import_errors"
+    __table_args__ = {"schema": "bo"}
+    
+    job_id = Column(
+        BigInteger,
+        ForeignKey("bo.product_import_jobs.id", ondelete="CASCADE"),
+        primary_key=True,
+        comment="ID задачи импорта",
+    )
+    row_number = Column(Integer, primary_key=True, comment="Номер строки в файле (заголовок - 1)")
+    errors = Column(ARRAY(Text), nullable=False, comment="Сообщения об ошибках")
+    
+    def __repr__(self):
+        return f"<ProductImportError(job_id={self.job_id}, row_number={self.row_number})>"
@@ -0,0 +1,49 @@
+"""
+Модели суточных итогов по заявкам (product_daily_stats, product_daily_stats_dirty, rollup_watermarks)
+"""
+from sqlalchemy import Column, BigInteger, Text, Numeric, Date, DateTime
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class ProductDailyStat(Base):
+    """
+    Количество и сумма цен заявок, созданных за день, по категории и статусу.
+    Таблица: bo.product_daily_stats (миграция 008_product_daily_stats.sql)
+    """
+    __tablename__ = "product_daily_stats"
+    __table_args__ = {"schema": "bo"}
+    
+    day = Column(Date, primary_key=True, comment="День создания заявок")
+    category_id = Column(BigInteger, primary_key=True, comment="ID категории")
+    status_id = Column(BigInteger, primary_key=True, comment="ID текущего статуса")
+    products_count = Column(BigInteger, nullable=False, comment="Количество заявок")
+    price_sum = Column(Numeric, nullable=False, comment="Сумма цен, руб")
+    
+    def __repr__(self):
+        return f"<ProductDailyStat({self.day}, category={self.category_id}, status={self.status_id}: {self.products_count})>"
+
+
+class ProductDailyStatDirty(Base):
+    """
+    Дни, в которых удалялись заявки (заполняется триггером), - пересчитываются при следующем обновлении.
+    Таблица: bo.product_daily_stats_dirty
+    """
+    __tablename__ = "product_daily_stats_dirty"
+    __table_args__ = {"schema": "bo"}
+    
+    day = Column(Date, primary_key=True, comment="День создания удалённых заявок")
+
+
+class RollupWatermark(Base):
+    """
+    Водяной знак инкрементального пересчёта итогов.
+    Таблица: bo.rollup_watermarks
+    """
+    __tablename__ = "rollup_watermarks"
+    __table_args__ = {"schema": "bo"}
+    
+    name = Column(Text, primary_key=True, comment="Имя итоговой таблицы")
+    watermark = Column(DateTime(timezone=False), nullable=False, comment="Изменения не позже этого момента учтены")
+    refreshed_at = Column(DateTime(timezone=False), nullable=False, server_default=func.now(), comment="Время последнего пересчёта")
@@ -17,7 +17,7 @@ class Supplier(Base):
     __table_args__ = {"schema": "bo"}
     
     id = Column(BigInteger, primary_key=True, autoincrement=True, index=True, nullable=False)
-    tg_user_id = Column(BigInteger, nullable=True, comment="Telegram user ID")
+    tg_user_id = Column(BigInteger, nullable=True, index=True, comment="Telegram user ID")
     phone = Column(Text, nullable=True, comment="Телефон")
     email = Column(Text, nullable=True, comment="Email")
     username = Column(Text, nullable=True, comment="Username")
@@ -18,7 +18,7 @@ class UserAccount(Base):
     __table_args__ = {"schema": "bo"}
 
     id = Column(BigInteger, primary_key=True, nullable=False, index=True)
-    tg_user_id = Column(BigInteger, nullable=True, comment="ID пользователя в Telegram")
+    tg_user_id = Column(BigInteger, nullable=True, index=True, comment="ID пользователя в Telegram")
     phone = Column(Text, nullable=True)
     email = Column(Text, nullable=True)
     username = Column(Text, nullable=True)
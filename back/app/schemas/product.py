@@ -6,6 +6,8 @@ from decimal import Decimal
 from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
 
+from app.config import settings
+
 
 class ProductBase(BaseModel):
     """Базовая схема продукта"""
@@ -91,13 +93,84 @@ class ProductResponse(ProductBase):
     category: Optional[CategoryInfo] = Field(None, description="Информация о категории")
     supplier: Optional[SupplierInfo] = Field(None, description="Информация о поставщике")
     
+    # Фрагмент описания с подсветкой совпадений (только при search + highlight)
+    snippet: Optional[str] = Field(None, description="Фрагмент описания с подсветкой совпадений")
+    
     model_config = ConfigDict(from_attributes=True)
 
 
 class ProductListResponse(BaseModel):
     """Схема ответа со списком продуктов"""
     data: list[ProductResponse] = Field(..., description="Список продуктов")
-    total: int = Field(..., description="Общее количество записей")
+    total: Optional[int] = Field(..., description="Общее количество записей (null при include_total=none)")
+    total_estimated: bool = Field(False, description="total - оценка планировщика, а не точное значение")
     page: int = Field(..., description="Текущая страница")
     page_size: int = Field(..., description="Размер страницы")
-
+    next_cursor: Optional[str] = Field(None, description="Курсор следующей страницы (keyset-пагинация)")
+    prev_cursor: Optional[str] = Field(None, description="Курсор предыдущей страницы (keyset-пагинация)")
+
+
+class ProductFacetValue(BaseModel):
+    """Количество заявок с одним значением фильтра"""
+    id: int = Field(..., description="ID статуса или категории")
+    code: Optional[str] = Field(None, description="Код")
+    name: Optional[str] = Field(None, description="Название")
+    color: Optional[str] = Field(None, description="Цвет (только для статусов)")
+    count: int = Field(..., description="Количество заявок")
+
+
+class ProductFacetsResponse(BaseModel):
+    """Схема ответа со счётчиками заявок для панели фильтров"""
+    total: int = Field(..., description="Всего заявок")
+    statuses: list[ProductFacetValue] = Field(..., description="Количество заявок по статусам")
+    categories: list[ProductFacetValue] = Field(..., description="Количество заявок по категориям")
+
+
+class ProductBulkCreate(BaseModel):
+    """Схема массового создания заявок"""
+    items: list[dict[str, Any]] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.PRODUCT_BULK_MAX_ITEMS,
+        description="Заявки в формате ProductCreate; каждая проверяется отдельно",
+    )
+
+
+class ProductBulkItemResult(BaseModel):
+    """Результат создания одной заявки из пакета"""
+    index: int = Field(..., description="Позиция элемента в items")
+    id: Optional[int] = Field(None, description="ID созданной заявки (null при ошибке)")
+    errors: list[str] = Field(default_factory=list, description="Ошибки проверки элемента")
+
+
+class ProductBulkCreateResponse(BaseModel):
+    """Схема ответа массового создания заявок"""
+    created: int = Field(..., description="Количество созданных заявок")
+    failed: int = Field(..., description="Количество элементов с ошибками")
+    results: list[ProductBulkItemResult] = Field(..., description="Результат по каждому элементу")
+
+
+class ProductStatusTransition(BaseModel):
+    """Схема массовой смены статуса заявок"""
+    product_ids: list[int] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.PRODUCT_BULK_MAX_ITEMS,
+        description="ID заявок",
+    )
+    status_id: int = Field(..., description="ID целевого статуса")
+
+
+class ProductTransitionResult(BaseModel):
+    """Результат смены статуса одной заявки"""
+    id: int = Field(..., description="ID заявки")
+    outcome: str = Field(..., description="updated, unchanged, forbidden или not_found")
+    from_status_id: Optional[int] = Field(None, description="Статус заявки до перехода")
+    detail: Optional[str] = Field(None, description="Причина отказа")
+
+
+class ProductStatusTransitionResponse(BaseModel):
+    """Схема ответа массовой смены статуса"""
+    status_id: int = Field(..., description="ID целевого статуса")
+    updated: int = Field(..., description="Количество переведённых заявок")
+    results: list[ProductTransitionResult] = Field(..., description="Результат по каждой заявке")
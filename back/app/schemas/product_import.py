@@ -0,0 +1,24 @@
+"""
+Схемы для импорта заявок из файлов
+"""
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class ProductImportJobResponse(BaseModel):
+    """Схема ответа с состоянием задачи импорта"""
+    id: int = Field(..., description="ID задачи импорта")
+    status: str = Field(..., description="Статус: queued, running, done, failed")
+    file_name: Optional[str] = Field(None, description="Имя загруженного файла")
+    file_format: str = Field(..., description="Формат файла (csv, xlsx)")
+    rows_processed: int = Field(..., description="Обработано строк")
+    rows_created: int = Field(..., description="Создано заявок")
+    rows_failed: int = Field(..., description="Строк с ошибками (см. отчёт об ошибках)")
+    progress: float = Field(..., description="Доля обработанного файла, от 0 до 1")
+    error: Optional[str] = Field(None, description="Причина сбоя задачи целиком (status=failed)")
+    created_at: datetime = Field(..., description="Дата создания")
+    started_at: Optional[datetime] = Field(None, description="Начало обработки")
+    finished_at: Optional[datetime] = Field(None, description="Окончание обработки")
+    
+    model_config = ConfigDict(from_attributes=True)
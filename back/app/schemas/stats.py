@@ -0,0 +1,27 @@
+"""
+Схемы для статистики по заявкам
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+from pydantic import BaseModel, Field
+
+
+class TimeseriesPoint(BaseModel):
+    """Итог за один день"""
+    day: date = Field(..., description="День создания заявок")
+    category_id: Optional[int] = Field(None, description="ID категории (только при group_by=category)")
+    status_id: Optional[int] = Field(None, description="ID статуса (только при group_by=status)")
+    count: int = Field(..., description="Количество заявок")
+    avg_price: Decimal = Field(..., description="Средняя цена, руб")
+
+
+class TimeseriesResponse(BaseModel):
+    """Схема ответа с рядом по дням"""
+    date_from: date = Field(..., description="Первый день периода")
+    date_to: date = Field(..., description="Последний день периода")
+    group_by: str = Field(..., description="Группировка: day, category, status")
+    refreshed_at: Optional[datetime] = Field(
+        None, description="Изменения заявок до этого момента учтены (null - итоги ещё не считались)"
+    )
+    points: list[TimeseriesPoint] = Field(..., description="Точки в порядке дней; дни без заявок пропускаются")
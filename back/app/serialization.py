@@ -0,0 +1,221 @@
+"""
+Быстрая сериализация ответов API в JSON (orjson).
+
+Строки из БД считаются доверенными: они превращаются в dict и сразу в байты,
+без построения pydantic-моделей и повторной валидации через response_model.
+Формат ответа совпадает со схемами из app.schemas.product.
+Для выгрузки заявок в CSV связи разворачиваются в плоские колонки.
+"""
+import csv
+import io
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Optional
+
+import orjson
+from fastapi.responses import Response
+from loguru import logger
+
+from app.server_timing import timed
+
+# Текст ошибки может дойти до клиента: без имён внутренних типов, они пишутся в лог
+SERIALIZATION_ERROR = "Ответ не сериализуется в JSON"
+
+
+def _default(value: Any) -> Any:
+    """Типы, которые orjson не сериализует сам"""
+    if isinstance(value, Decimal):
+        # Как pydantic в JSON-режиме: Decimal -> строка без потери точности
+        return str(value)
+    raise TypeError(SERIALIZATION_ERROR)
+
+
+def dumps(content: Any) -> bytes:
+    """JSON в байтах. datetime сериализуется в ISO 8601 средствами orjson"""
+    try:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError as e:
+        # Сообщение orjson содержит имя типа ("Type is not JSON serializable: Product")
+        logger.error(f"Ошибка сериализации в JSON: {e}")
+        raise TypeError(SERIALIZATION_ERROR) from None
+
+
+class FastJSONResponse(Response):
+    """JSON-ответ через orjson; принимает готовые байты или сериализуемый объект"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        with timed("serialize"):
+            return dumps(content)
+
+
+def _status_info(product) -> Optional[dict]:
+    if product.status_ref_id is None:
+        return None
+    return {"id": product.status_ref_id, "name": product.status_name, "code": product.status_code}
+
+
+def _category_info(product) -> Optional[dict]:
+    if product.category_ref_id is None:
+        return None
+    return {"id": product.category_ref_id, "name": product.category_name, "code": product.category_code}
+
+
+def _supplier_info(product) -> Optional[dict]:
+    """Профиль из bo.suppliers, а если его нет - данные пользователя из bo.users"""
+    if product.supplier_id is not None:
+        return {
+            "id": product.supplier_id,
+            "custom_name": product.supplier_custom_name,
+            "first_name": product.supplier_first_name,
+            "username": product.supplier_username,
+            "email": None,
+            "role": product.supplier_role,
+        }
+    if product.user_id is not None:
+        return {
+            "id": product.user_id,
+            "custom_name": product.user_first_name or product.user_username,
+            "first_name": product.user_first_name,
+            "username": product.user_username,
+            "email": product.user_email,
+            "role": product.user_role or "supplier",
+        }
+    return None
+
+
+# Поля-связи ответа и функции, собирающие их из строки
+_RELATION_BUILDERS = {
+    "status": _status_info,
+    "category": _category_info,
+    "supplier": _supplier_info,
+}
+
+
+def product_to_dict(
+    product,
+    snippet: Optional[str] = None,
+    fields: Optional[frozenset] = None,
+) -> dict:
+    """
+    Строка заявки (PRODUCT_FIELDS + DISPLAY_FIELDS из ProductService) -> dict
+    в формате ProductResponse.
+    
+    fields - набор полей из ProductService.parse_fields: в ответ попадают только они
+    (строка в этом случае содержит только запрошенные колонки). None - все поля.
+    """
+    if fields is not None:
+        data = {}
+        for key, value in product._mapping.items():
+            if key in fields:
+                data[key] = value
+        for key, build in _RELATION_BUILDERS.items():
+            if key in fields:
+                data[key] = build(product)
+        if snippet is not None:
+            data["snippet"] = snippet
+        return data
+    
+    return {
+        "source_url": product.source_url,
+        "price_rub": product.price_rub,
+        "category_id": product.category_id,
+        "status_id": product.status_id,
+        "country_of_origin": product.country_of_origin,
+        "composition": product.composition,
+        "size_range": product.size_range,
+        "color": product.color,
+        "description": product.description,
+        "attributes": product.attributes,
+        "is_active": product.is_active,
+        "id": product.id,
+        "supplier_user_id": product.supplier_user_id,
+        "approved_by": product.approved_by,
+        "approved_at": product.approved_at,
+        "created_at": product.created_at if product.created_at else "",
+        "updated_at": product.updated_at if product.updated_at else "",
+        "status": _status_info(product),
+        "category": _category_info(product),
+        "supplier": _supplier_info(product),
+        "snippet": snippet,
+    }
+
+
+# Колонки CSV-выгрузки в порядке вывода. Связи (status, category, supplier)
+# разворачиваются в плоские колонки, attributes пишется как JSON
+CSV_COLUMNS = [
+    "id",
+    "supplier_user_id",
+    "supplier_name",
+    "category_id",
+    "category_code",
+    "category_name",
+    "status_id",
+    "status_code",
+    "status_name",
+    "source_url",
+    "price_rub",
+    "country_of_origin",
+    "composition",
+    "size_range",
+    "color",
+    "description",
+    "attributes",
+    "is_active",
+    "approved_by",
+    "approved_at",
+    "created_at",
+    "updated_at",
+]
+
+# Плоская колонка -> поле ответа, при запросе которого она выводится
+_CSV_RELATION_COLUMNS = {
+    "supplier_name": "supplier",
+    "category_code": "category",
+    "category_name": "category",
+    "status_code": "status",
+    "status_name": "status",
+}
+
+
+def csv_columns(fields: Optional[frozenset] = None) -> list[str]:
+    """Колонки CSV для набора полей из parse_fields (None - все)"""
+    if fields is None:
+        return list(CSV_COLUMNS)
+    return [name for name in CSV_COLUMNS if _CSV_RELATION_COLUMNS.get(name, name) in fields]
+
+
+def _supplier_name(product) -> Optional[str]:
+    info = _supplier_info(product)
+    if info is None:
+        return None
+    return info["custom_name"] or info["first_name"] or info["username"]
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return dumps(value).decode()
+    return value
+
+
+def products_to_csv(products, columns: list[str], header: bool = False) -> bytes:
+    """Пакет строк заявок -> CSV (UTF-8), при header - с BOM и заголовком для Excel"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        buffer.write("\ufeff")
+        writer.writerow(columns)
+    for product in products:
+        writer.writerow([
+            _csv_value(_supplier_name(product) if name == "supplier_name" else getattr(product, name))
+            for name in columns
+        ])
+    return buffer.getvalue().encode("utf-8")
@@ -0,0 +1,118 @@
+"""
+Заголовок Server-Timing: из чего сложилось время ответа.
+
+    Server-Timing: auth;dur=0.4, serialize;dur=1.9, db;dur=12.8, db-queries;count=3, total;dur=17.2
+
+- auth - get_supplier_by_token (вместе с его SQL, если токена нет в кэше);
+- db - время выполнения SQL драйвером и db-queries - их количество (из RequestSQLStats,
+  app/sql_accounting.py); ожидание соединения из пула сюда не входит;
+- serialize - строки в dict и JSON для ответов FastJSONResponse (ответы по response_model
+  сериализует FastAPI, они не размечены);
+- total - от входа в middleware до начала ответа. Потоковые ответы (выгрузка, SSE)
+  дописываются после заголовков, их тело в total не попадает.
+
+Участки размечаются через with timed("имя"): накладные расходы - пара вызовов perf_counter.
+Браузер показывает заголовок во вкладке Timing (для другого origin нужен
+Timing-Allow-Origin, он выставляется по CORS_ORIGINS). SERVER_TIMING_LOG пишет ту же
+разбивку в лог (через sampled_logger).
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from starlette.datastructures import MutableHeaders
+
+from app.config import settings
+from app.logging_config import sampled_logger
+from app.sql_accounting import RequestSQLStats, request_sql_stats
+
+
+class RequestTimings:
+    """Размеченные участки одного HTTP-запроса: имя -> секунды"""
+    __slots__ = ("durations",)
+
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+
+request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Добавляет время блока к участку name текущего запроса (вне запроса - ничего не делает)"""
+    timings = request_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def build_header(timings: RequestTimings, sql: Optional[RequestSQLStats], total: float) -> str:
+    """Значение Server-Timing: размеченные участки в порядке появления, SQL и total"""
+    parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.durations.items()]
+    if sql is not None:
+        parts.append(f"db;dur={sql.duration * 1000:.2f}")
+        parts.append(f"db-queries;count={sql.queries}")
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def _log_breakdown(scope: dict, status_code: int, timings: RequestTimings,
+                   sql: Optional[RequestSQLStats], total: float) -> None:
+    route = sql.route if sql is not None else scope.get("path", "-")
+    sampled_logger.info(
+        "Server-Timing {method} {route} {status}: {total_ms} мс",
+        method=scope["method"],
+        route=route,
+        status=status_code,
+        total_ms=round(total * 1000, 2),
+        db_ms=round(sql.duration * 1000, 2) if sql is not None else None,
+        db_queries=sql.queries if sql is not None else None,
+        **{f"{name}_ms": round(seconds * 1000, 2) for name, seconds in timings.durations.items()},
+    )
+
+
+class ServerTimingMiddleware:
+    """
+    ASGI-middleware: заголовок Server-Timing в начале ответа.
+    SQL берётся из RequestSQLStats, поэтому SQLAccountingMiddleware должен быть снаружи.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.allow_origin = ", ".join(settings.CORS_ORIGINS)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        sql = request_sql_stats.get()
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - started
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", build_header(timings, sql, total))
+                if self.allow_origin:
+                    headers.append("Timing-Allow-Origin", self.allow_origin)
+                if settings.SERVER_TIMING_LOG:
+                    _log_breakdown(scope, message["status"], timings, sql, total)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_timings.reset(token)
@@ -0,0 +1,215 @@
+"""
+Асинхронный сервис для работы с заявками (products).
+
+Логика запросов общая с ProductService: методы выполняются через
+AsyncSession.run_sync, т.е. синхронный ORM-код работает поверх asyncpg
+и не блокирует event loop на время обращения к БД. Исключение - выгрузка:
+её строки читаются серверным курсором по мере отправки ответа.
+"""
+from typing import Any, AsyncIterator, Optional
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.schemas.product import ProductCreate, ProductUpdate
+from app.services.attribute_filter import AttributeFilters
+from app.services.auth_cache import SupplierPrincipal
+from app.services.product_service import (
+    BulkItemResult,
+    ProductPage,
+    ProductService,
+    TransitionResult,
+    TOTAL_EXACT,
+)
+
+
+class AsyncProductService:
+    """Асинхронный сервис для работы с заявками"""
+
+    @staticmethod
+    async def get_products(
+        db: AsyncSession,
+        supplier_user_id: Optional[int] = None,
+        status_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        page: int = 1,
+        page_size: int = 10,
+        search: Optional[str] = None,
+        sort: str = "created_at",
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        include_total: str = TOTAL_EXACT,
+        highlight: bool = False,
+        fields: Optional[frozenset] = None,
+        attributes: Optional[AttributeFilters] = None,
+        is_active: Optional[bool] = None,
+    ) -> ProductPage:
+        """Список заявок, параметры как у ProductService.get_products"""
+        return await db.run_sync(
+            lambda session: ProductService.get_products(
+                session,
+                supplier_user_id=supplier_user_id,
+                status_id=status_id,
+                category_id=category_id,
+                page=page,
+                page_size=page_size,
+                search=search,
+                sort=sort,
+                order=order,
+                cursor=cursor,
+                include_total=include_total,
+                highlight=highlight,
+                fields=fields,
+                attributes=attributes,
+                is_active=is_active,
+            )
+        )
+
+    @staticmethod
+    async def export_products(
+        db: AsyncSession,
+        supplier_user_id: Optional[int] = None,
+        status_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        search: Optional[str] = None,
+        sort: str = "created_at",
+        order: str = "desc",
+        fields: Optional[frozenset] = None,
+        attributes: Optional[AttributeFilters] = None,
+        is_active: Optional[bool] = None,
+    ) -> AsyncIterator[list[Row]]:
+        """
+        Выгрузка заявок пакетами по PRODUCT_EXPORT_BATCH_SIZE строк.
+        Запрос читается серверным курсором (db.stream + yield_per): в памяти
+        только текущий пакет, первый пакет готов до окончания чтения выборки.
+        """
+        statement = ProductService.export_statement(
+            supplier_user_id=supplier_user_id,
+            status_id=status_id,
+            category_id=category_id,
+            search=search,
+            sort=sort,
+            order=order,
+            fields=fields,
+            attributes=attributes,
+            is_active=is_active,
+        ).execution_options(yield_per=settings.PRODUCT_EXPORT_BATCH_SIZE)
+        result = await db.stream(statement)
+        try:
+            async for rows in result.partitions():
+                yield rows
+        finally:
+            await result.close()
+
+    @staticmethod
+    async def get_facets(
+        db: AsyncSession,
+        supplier_user_id: Optional[int] = None,
+    ) -> dict[str, dict[int, int]]:
+        """Счётчики заявок по статусам и категориям, см. ProductService.get_facets"""
+        return await db.run_sync(
+            lambda session: ProductService.get_facets(session, supplier_user_id=supplier_user_id)
+        )
+
+    @staticmethod
+    async def get_product_by_id(
+        db: AsyncSession,
+        product_id: int,
+        supplier_user_id: Optional[int] = None,
+    ) -> Optional[Row]:
+        """Заявка по ID вместе с полями статуса, категории и поставщика"""
+        return await db.run_sync(
+            lambda session: ProductService.get_product_by_id(
+                session,
+                product_id=product_id,
+                supplier_user_id=supplier_user_id,
+            )
+        )
+
+    @staticmethod
+    async def create_product(
+        db: AsyncSession,
+        product_data: ProductCreate,
+        supplier: Optional[SupplierPrincipal] = None,
+    ) -> Row:
+        """
+        Создаёт заявку и возвращает её строку со связанными полями
+        (ленивая загрузка вне run_sync в асинхронной сессии невозможна).
+        """
+        def _create(session) -> Row:
+            product = ProductService.create_product(session, product_data=product_data, supplier=supplier)
+            return ProductService.get_product_by_id(session, product_id=product.id)
+
+        return await db.run_sync(_create)
+
+    @staticmethod
+    async def create_products_bulk(
+        db: AsyncSession,
+        items: list[dict[str, Any]],
+        supplier_user_id: int,
+        supplier: Optional[SupplierPrincipal] = None,
+    ) -> list[BulkItemResult]:
+        """Массовое создание заявок, см. ProductService.create_products_bulk"""
+        return await db.run_sync(
+            lambda session: ProductService.create_products_bulk(
+                session,
+                items=items,
+                supplier_user_id=supplier_user_id,
+                supplier=supplier,
+            )
+        )
+
+    @staticmethod
+    async def transition_status_bulk(
+        db: AsyncSession,
+        product_ids: list[int],
+        status_id: int,
+        approved_by: Optional[int] = None,
+        supplier_user_id: Optional[int] = None,
+    ) -> list[TransitionResult]:
+        """Массовая смена статуса, см. ProductService.transition_status_bulk"""
+        return await db.run_sync(
+            lambda session: ProductService.transition_status_bulk(
+                session,
+                product_ids=product_ids,
+                status_id=status_id,
+                approved_by=approved_by,
+                supplier_user_id=supplier_user_id,
+            )
+        )
+
+    @staticmethod
+    async def update_product(
+        db: AsyncSession,
+        product_id: int,
+        product_data: ProductUpdate,
+        supplier_user_id: Optional[int] = None,
+    ) -> Optional[Row]:
+        """Обновляет заявку и возвращает её строку со связанными полями"""
+        def _update(session) -> Optional[Row]:
+            product = ProductService.update_product(
+                session,
+                product_id=product_id,
+                product_data=product_data,
+                supplier_user_id=supplier_user_id,
+            )
+            if not product:
+                return None
+            return ProductService.get_product_by_id(session, product_id=product.id)
+
+        return await db.run_sync(_update)
+
+    @staticmethod
+    async def delete_product(
+        db: AsyncSession,
+        product_id: int,
+        supplier_user_id: Optional[int] = None,
+    ) -> bool:
+        """Удаляет заявку"""
+        return await db.run_sync(
+            lambda session: ProductService.delete_product(
+                session,
+                product_id=product_id,
+                supplier_user_id=supplier_user_id,
+            )
+        )
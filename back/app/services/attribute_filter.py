@@ -0,0 +1,83 @@
+"""
+Фильтры по атрибутам заявки: attr.<ключ>=<значение> в query-параметрах списка.
+
+Каждый фильтр превращается в JSONB-вхождение attributes @> '{"ключ": значение}',
+которое обслуживается GIN-индексом ix_products_attributes (jsonb_path_ops).
+- attr.material=cotton - атрибут material равен "cotton";
+- attr.size.eu=42 - вложенный ключ: attributes @> '{"size": {"eu": ...}}';
+- значения, похожие на JSON-скаляр (42, 4.5, true, null), ищутся и как строка,
+  и как число/логическое значение: в attributes встречаются оба варианта;
+- повтор ключа (attr.color=red&attr.color=blue) - любое из значений,
+  разные ключи - все одновременно.
+"""
+import json
+import math
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import and_, or_
+
+from app.models.product import Product
+
+ATTRIBUTE_PREFIX = "attr."
+MAX_ATTRIBUTE_FILTERS = 10
+MAX_ATTRIBUTE_VALUES = 20
+
+# Нормализованные фильтры: ((путь ключа, (значения, ...)), ...) - хэшируемые,
+# поэтому участвуют в ключе кэша счётчиков
+AttributeFilters = tuple[tuple[tuple[str, ...], tuple[str, ...]], ...]
+
+
+def parse_attribute_filters(params: Iterable[tuple[str, str]]) -> Optional[AttributeFilters]:
+    """
+    Выбирает фильтры attr.* из пар query-параметров (request.query_params.multi_items()).
+    Возвращает None, если фильтров нет; ValueError при некорректном ключе или их избытке.
+    """
+    filters: dict[tuple[str, ...], list[str]] = {}
+    for name, value in params:
+        if not name.startswith(ATTRIBUTE_PREFIX):
+            continue
+        path = tuple(name[len(ATTRIBUTE_PREFIX):].split("."))
+        if not all(path):
+            raise ValueError(f"Некорректный фильтр по атрибуту: {name}")
+        filters.setdefault(path, []).append(value)
+
+    if len(filters) > MAX_ATTRIBUTE_FILTERS:
+        raise ValueError(f"Не больше {MAX_ATTRIBUTE_FILTERS} фильтров по атрибутам")
+    for path, values in filters.items():
+        if len(values) > MAX_ATTRIBUTE_VALUES:
+            raise ValueError(
+                f"Не больше {MAX_ATTRIBUTE_VALUES} значений для attr.{'.'.join(path)}"
+            )
+    if not filters:
+        return None
+    return tuple(sorted((path, tuple(dict.fromkeys(values))) for path, values in filters.items()))
+
+
+def _variants(value: str) -> list[Any]:
+    """Значение как строка и, если похоже, как JSON-скаляр"""
+    variants: list[Any] = [value]
+    try:
+        typed = json.loads(value)
+    except ValueError:
+        return variants
+    if typed is None or isinstance(typed, (bool, int)):
+        variants.append(typed)
+    elif isinstance(typed, float) and math.isfinite(typed):
+        variants.append(typed)
+    return variants
+
+
+def _document(path: tuple[str, ...], value: Any) -> dict:
+    document = value
+    for key in reversed(path):
+        document = {key: document}
+    return document
+
+
+def attribute_filter(filters: AttributeFilters):
+    """Условие WHERE: вхождения @> (через OR по значениям, через AND по ключам)"""
+    conditions = []
+    for path, values in filters:
+        documents = [_document(path, variant) for value in values for variant in _variants(value)]
+        conditions.append(or_(*(Product.attributes.contains(document) for document in documents)))
+    return and_(*conditions)
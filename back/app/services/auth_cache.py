@@ -0,0 +1,128 @@
+"""
+Кэш аутентификации по токену поставщика.
+
+Токен -> SupplierPrincipal: неизменяемая выжимка из bo.suppliers вместе с уже
+найденным id пользователя в bo.users. Кэш LRU с TTL, в пределах воркера.
+Изменения поставщиков и пользователей через ORM сбрасывают затронутые записи
+(события mapper'ов ниже), изменения в других воркерах и в обход приложения -
+уведомления из БД (reference_listener); без слушателя они видны не позже чем через TTL.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from sqlalchemy import event, inspect
+
+from app.config import settings
+from app.models.supplier import Supplier
+from app.models.user_account import UserAccount
+
+
+@dataclass(frozen=True)
+class SupplierPrincipal:
+    """Поставщик, авторизованный по токену"""
+    id: int
+    role: str
+    tg_user_id: Optional[int]
+    user_id: Optional[int]  # bo.users.id по tg_user_id, None - пользователя ещё нет
+    name: str  # Для логов: custom_name / first_name / username
+
+
+class PrincipalCache:
+    """Потокобезопасный LRU-кэш с TTL: токен -> SupplierPrincipal"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self.ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, SupplierPrincipal]] = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Растёт при каждой инвалидации: загруженное до неё значение не сохраняется"""
+        return self._generation
+
+    def get(self, token: str) -> Optional[SupplierPrincipal]:
+        """Возвращает principal, если он есть и не устарел"""
+        with self._lock:
+            entry = self._data.get(token)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at < time.monotonic():
+                del self._data[token]
+                return None
+            self._data.move_to_end(token)
+            return principal
+
+    def set(self, token: str, principal: SupplierPrincipal, generation: Optional[int] = None) -> None:
+        """Сохраняет principal, вытесняя давно не использованные записи"""
+        if self.ttl <= 0 or self._max_entries <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._data[token] = (time.monotonic() + self.ttl, principal)
+            self._data.move_to_end(token)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate_token(self, token: str) -> None:
+        """Сбрасывает запись для токена"""
+        with self._lock:
+            self._generation += 1
+            self._data.pop(token, None)
+
+    def _invalidate_where(self, predicate: Callable[[SupplierPrincipal], bool]) -> None:
+        with self._lock:
+            self._generation += 1
+            stale = [token for token, (_, principal) in self._data.items() if predicate(principal)]
+            for token in stale:
+                del self._data[token]
+
+    def invalidate_supplier(self, supplier_id: int) -> None:
+        """Сбрасывает записи поставщика (смена токена, роли, удаление)"""
+        self._invalidate_where(lambda principal: principal.id == supplier_id)
+
+    def invalidate_tg_user(self, tg_user_id: int) -> None:
+        """Сбрасывает записи с этим tg_user_id (изменилось сопоставление с bo.users)"""
+        self._invalidate_where(lambda principal: principal.tg_user_id == tg_user_id)
+
+    def clear(self) -> None:
+        """Сбрасывает кэш целиком"""
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+
+principal_cache = PrincipalCache(settings.AUTH_CACHE_TTL, settings.AUTH_CACHE_MAX_ENTRIES)
+
+
+# Поля поставщика, от которых зависит principal
+_PRINCIPAL_SUPPLIER_FIELDS = ("token", "role", "tg_user_id", "custom_name", "first_name", "username")
+
+
+@event.listens_for(Supplier, "after_update")
+def _supplier_updated(mapper, connection, target: Supplier) -> None:
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _PRINCIPAL_SUPPLIER_FIELDS):
+        principal_cache.invalidate_supplier(target.id)
+        # Старый токен мог уже не совпадать ни с одним principal.id - сбрасываем и его
+        for old_token in state.attrs.token.history.deleted:
+            if old_token:
+                principal_cache.invalidate_token(old_token)
+
+
+@event.listens_for(Supplier, "after_delete")
+def _supplier_deleted(mapper, connection, target: Supplier) -> None:
+    principal_cache.invalidate_supplier(target.id)
+
+
+@event.listens_for(UserAccount, "after_insert")
+@event.listens_for(UserAccount, "after_delete")
+def _user_changed(mapper, connection, target: UserAccount) -> None:
+    if target.tg_user_id is not None:
+        principal_cache.invalidate_tg_user(target.tg_user_id)
@@ -0,0 +1,160 @@
+"""
+Проверка заявок по правилам категории (bo.categories).
+
+Category.attributes_schema - подмножество JSON Schema для Product.attributes:
+    {
+        "type": "object",
+        "properties": {
+            "size": {"type": "string", "enum": ["S", "M", "L"]},
+            "length_cm": {"type": "number", "minimum": 0}
+        },
+        "required": ["size"],
+        "additionalProperties": false
+    }
+Допускается и краткая форма {"size": "string", "length_cm": "number"}.
+Category.required_fields - список обязательных полей: поле заявки (color,
+composition, ...) должно быть заполнено, остальные имена - ключи attributes.
+
+Схема каждой категории компилируется один раз в pydantic-модель (проверка
+выполняется pydantic-core без разбора схемы) и хранится в памяти воркера
+вместе с остальными справочными данными: изменение bo.categories сбрасывает
+кэш (reference_listener).
+"""
+from typing import Any, Literal, Optional, Union
+
+from loguru import logger
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, create_model
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.category import Category
+from app.schemas.product import ProductCreate
+from app.services.reference_cache import category_validators_cache
+
+# Типы JSON Schema -> аннотации pydantic
+_JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+    "null": type(None),
+}
+
+# Ограничения JSON Schema -> параметры Field
+_CONSTRAINTS = {
+    "minimum": "ge",
+    "maximum": "le",
+    "exclusiveMinimum": "gt",
+    "exclusiveMaximum": "lt",
+    "minLength": "min_length",
+    "maxLength": "max_length",
+    "minItems": "min_length",
+    "maxItems": "max_length",
+    "pattern": "pattern",
+}
+
+# Поля заявки, которые можно указать в required_fields
+PRODUCT_FIELDS = frozenset(ProductCreate.model_fields) - {"supplier_user_id"}
+
+
+def _annotation(schema: Any, name: str) -> Any:
+    """Аннотация для свойства схемы (вложенные объекты - отдельные модели)"""
+    if isinstance(schema, str):
+        schema = {"type": schema}
+    if not isinstance(schema, dict):
+        return Any
+    if "enum" in schema:
+        return Literal[tuple(schema["enum"])]
+    json_type = schema.get("type")
+    if isinstance(json_type, list):
+        variants = tuple(_annotation({**schema, "type": item}, name) for item in json_type)
+        return Union[variants] if variants else Any
+    if json_type == "object" and isinstance(schema.get("properties"), dict):
+        return _compile_object(schema, name)
+    if json_type == "array" and "items" in schema:
+        return list[_annotation(schema["items"], name)]
+    return _JSON_TYPES.get(json_type, Any)
+
+
+def _compile_object(schema: dict, name: str, required: frozenset = frozenset()) -> type[BaseModel]:
+    """Объект JSON Schema -> pydantic-модель (ключи - через alias, они не обязаны быть идентификаторами)"""
+    properties = schema.get("properties", {})
+    required = required | frozenset(schema.get("required", ()))
+    fields = {}
+    for index, key in enumerate(dict.fromkeys([*properties, *sorted(required - set(properties))])):
+        property_schema = properties.get(key, {})
+        constraints = {}
+        if isinstance(property_schema, dict):
+            constraints = {
+                option: property_schema[keyword]
+                for keyword, option in _CONSTRAINTS.items()
+                if keyword in property_schema
+            }
+        fields[f"field_{index}"] = (
+            _annotation(property_schema, f"{name}_{index}"),
+            Field(... if key in required else None, alias=key, **constraints),
+        )
+    extra = "forbid" if schema.get("additionalProperties") is False else "allow"
+    return create_model(
+        name,
+        __config__=ConfigDict(extra=extra, strict=True),
+        **fields,
+    )
+
+
+class CategoryValidator:
+    """Скомпилированные правила одной категории"""
+
+    def __init__(self, category: Category):
+        self.category_id = category.id
+        self.name = category.name or category.code or str(category.id)
+        required = [str(name) for name in (category.required_fields or []) if isinstance(name, str)]
+        self.required_product_fields = tuple(name for name in required if name in PRODUCT_FIELDS)
+        required_attributes = frozenset(name for name in required if name not in PRODUCT_FIELDS)
+
+        schema = category.attributes_schema
+        if isinstance(schema, dict) and "properties" not in schema and "type" not in schema:
+            schema = {"properties": schema}
+        self._model: Optional[type[BaseModel]] = None
+        if isinstance(schema, dict) or required_attributes:
+            try:
+                self._model = _compile_object(
+                    schema if isinstance(schema, dict) else {},
+                    f"CategoryAttributes{category.id}",
+                    required_attributes,
+                )
+            except Exception as e:
+                # Ошибка в схеме не должна блокировать создание заявок категории
+                logger.error(f"Некорректная attributes_schema категории {category.id}: {e}")
+                self._model = None
+
+    def errors(self, values: dict) -> list[str]:
+        """Ошибки заявки (поля в формате ProductCreate) или пустой список"""
+        messages = [
+            f"{name}: обязательное поле для категории «{self.name}»"
+            for name in self.required_product_fields
+            if values.get(name) is None or values.get(name) == ""
+        ]
+        if self._model is not None:
+            attributes = values.get("attributes")
+            try:
+                self._model.model_validate({} if attributes is None else attributes)
+            except ValidationError as e:
+                messages += [
+                    f"attributes{''.join(f'.{part}' for part in item['loc'])}: {item['msg']}"
+                    for item in e.errors()
+                ]
+        return messages
+
+
+def get_category_validators(db: Session) -> dict[int, CategoryValidator]:
+    """Правила всех категорий из кэша или из bo.categories"""
+    validators = category_validators_cache.get()
+    if validators is not None:
+        return validators
+    generation = category_validators_cache.generation
+    validators = {category.id: CategoryValidator(category) for category in db.scalars(select(Category))}
+    category_validators_cache.set(validators, generation)
+    return validators
@@ -0,0 +1,53 @@
+"""
+Кэш точных значений COUNT(*) для списка заявок.
+
+Ключ — набор фильтров запроса. TTL короткий: в пределах воркера кэш
+сбрасывается при любой записи, между воркерами устаревание ограничено TTL.
+"""
+import threading
+import time
+from typing import Hashable, Optional
+
+from app.config import settings
+
+
+class CountCache:
+    """Потокобезопасный TTL-кэш счётчиков"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024):
+        self._ttl = ttl_seconds
+        self._max_entries = max_entries
+        self._data: dict[Hashable, tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[int]:
+        """Возвращает значение, если оно есть и не устарело"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: Hashable, value: int) -> None:
+        """Сохраняет значение"""
+        if self._ttl <= 0:
+            return
+        with self._lock:
+            if len(self._data) >= self._max_entries:
+                now = time.monotonic()
+                self._data = {k: v for k, v in self._data.items() if v[0] >= now}
+                if len(self._data) >= self._max_entries:
+                    self._data.clear()
+            self._data[key] = (time.monotonic() + self._ttl, value)
+
+    def clear(self) -> None:
+        """Сбрасывает кэш целиком"""
+        with self._lock:
+            self._data.clear()
+
+
+product_count_cache = CountCache(settings.PRODUCT_COUNT_CACHE_TTL)
@@ -0,0 +1,143 @@
+"""
+Keyset (cursor) пагинация для списка заявок.
+
+Курсор — непрозрачная строка (base64url от JSON), содержащая ключ сортировки,
+направление, значение ключа и id последней/первой строки страницы.
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+from sqlalchemy import tuple_
+
+from app.models.product import Product
+
+
+# Разрешённые ключи сортировки -> колонка модели.
+# Для каждого ключа есть составной индекс (ключ, id), см. Product.__table_args__
+SORT_COLUMNS = {
+    "created_at": Product.created_at,
+    "updated_at": Product.updated_at,
+    "price_rub": Product.price_rub,
+}
+
+SORT_ORDERS = ("asc", "desc")
+
+# Нулевое смещение ключа: ORDER BY (ключ + 0) упорядочивает так же, но не совпадает
+# с индексом (ключ, id), и планировщик не может выбрать обход этого индекса
+_SORT_ZERO = {
+    "created_at": timedelta(0),
+    "updated_at": timedelta(0),
+    "price_rub": 0,
+}
+
+DIRECTION_NEXT = "next"
+DIRECTION_PREV = "prev"
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Декодированный курсор"""
+    sort: str
+    order: str
+    value: Any
+    id: int
+    direction: str = DIRECTION_NEXT
+
+
+def _serialize_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _deserialize_value(sort: str, raw: Any) -> Any:
+    if sort in ("created_at", "updated_at"):
+        return datetime.fromisoformat(raw)
+    if sort == "price_rub":
+        return Decimal(raw)
+    return raw
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """Кодирует курсор в непрозрачную строку"""
+    payload = {
+        "s": cursor.sort,
+        "o": cursor.order,
+        "v": _serialize_value(cursor.value),
+        "i": cursor.id,
+        "d": cursor.direction,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Cursor:
+    """
+    Декодирует курсор.
+    Вызывает ValueError, если курсор повреждён или содержит неизвестный ключ сортировки.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        sort = payload["s"]
+        order = payload["o"]
+        direction = payload.get("d", DIRECTION_NEXT)
+        if sort not in SORT_COLUMNS or order not in SORT_ORDERS:
+            raise ValueError
+        if direction not in (DIRECTION_NEXT, DIRECTION_PREV):
+            raise ValueError
+        return Cursor(
+            sort=sort,
+            order=order,
+            value=_deserialize_value(sort, payload["v"]),
+            id=int(payload["i"]),
+            direction=direction,
+        )
+    except (ValueError, KeyError, TypeError, InvalidOperation, json.JSONDecodeError):
+        raise ValueError("Некорректный курсор пагинации")
+
+
+def cursor_for(product: Product, sort: str, order: str, direction: str) -> str:
+    """Строит курсор, указывающий на переданную строку"""
+    return encode_cursor(
+        Cursor(
+            sort=sort,
+            order=order,
+            value=getattr(product, sort),
+            id=product.id,
+            direction=direction,
+        )
+    )
+
+
+def order_by_clause(sort: str, order: str, reverse: bool = False, indexed: bool = True) -> list:
+    """
+    ORDER BY (ключ, id) в нужном направлении.
+    indexed=False - сортировка без обхода индекса (ключ, id): строки выбираются
+    по другим условиям (GIN), а затем сортируются.
+    """
+    column = SORT_COLUMNS[sort]
+    if not indexed:
+        column = column + _SORT_ZERO[sort]
+    descending = (order == "desc") != reverse
+    if descending:
+        return [column.desc(), Product.id.desc()]
+    return [column.asc(), Product.id.asc()]
+
+
+def seek_clause(cursor: Cursor):
+    """
+    Условие "строки после курсора" в направлении обхода.
+    Сравнение кортежей (ключ, id) обслуживается составным индексом.
+    """
+    column = SORT_COLUMNS[cursor.sort]
+    descending = (cursor.order == "desc") != (cursor.direction == DIRECTION_PREV)
+    key = tuple_(column, Product.id)
+    bound = tuple_(cursor.value, cursor.id)
+    return key < bound if descending else key > bound
@@ -0,0 +1,247 @@
+"""
+Лента изменений заявок (created / updated / deleted) для SSE и WebSocket.
+
+Методы записи ProductService вызывают emit() до commit: события копятся в сессии,
+и перед commit уходят в канал PRODUCT_EVENTS_CHANNEL одним pg_notify на транзакцию
+(NOTIFY берёт общую блокировку очереди уведомлений на время commit, поэтому их не
+больше одного на транзакцию). Уведомление доставляется только после успешного commit
+и видно всем воркерам; если пакет не помещается в уведомление (NOTIFY_PAYLOAD_MAX),
+вместо него отправляется resync. При REFERENCE_LISTEN_ENABLED=false уведомления никто
+не слушает и они не отправляются. Слушатель
+(reference_listener) передаёт их в product_broadcaster - один на воркер, -
+который раздаёт события подписчикам с учётом их фильтров. Если слушатель
+не подключён, события публикуются напрямую после commit (только в своём воркере).
+Commit бывает и в потоках (импорт, asyncio.to_thread), поэтому publish() можно
+вызывать из любого потока: очереди подписчиков меняются только в их цикле событий.
+"""
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+PRODUCT_EVENTS_CHANNEL = "sliv_products"
+
+EVENT_CREATED = "created"
+EVENT_UPDATED = "updated"
+EVENT_DELETED = "deleted"
+# Подписчик пропустил события (переполнение очереди, переподключение слушателя) -
+# клиенту нужно перечитать список
+EVENT_RESYNC = "resync"
+
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Предел payload pg_notify - 8000 байт
+NOTIFY_PAYLOAD_MAX = 7900
+
+_SESSION_EVENTS_KEY = "product_events"
+
+
+def product_event(
+    event_type: str,
+    product_id: int,
+    status_id: Optional[int],
+    category_id: Optional[int],
+    supplier_user_id: Optional[int],
+    previous_status_id: Optional[int] = None,
+) -> dict:
+    """Событие по заявке: только поля, по которым фильтруют подписчики"""
+    return {
+        "type": event_type,
+        "id": product_id,
+        "status_id": status_id,
+        "previous_status_id": previous_status_id,
+        "category_id": category_id,
+        "supplier_user_id": supplier_user_id,
+    }
+
+
+def event_for(event_type: str, product, previous_status_id: Optional[int] = None) -> dict:
+    """Событие по ORM-объекту Product"""
+    return product_event(
+        event_type,
+        product.id,
+        product.status_id,
+        product.category_id,
+        product.supplier_user_id,
+        previous_status_id,
+    )
+
+
+def emit(db: Session, events: list[dict]) -> None:
+    """
+    Добавляет события к транзакции сессии (отправляются перед commit).
+    Вызывать до commit: при откате события не доставляются.
+    """
+    if events:
+        db.info.setdefault(_SESSION_EVENTS_KEY, []).extend(events)
+
+
+def encode_notification(events: list[dict]) -> str:
+    """
+    Payload уведомления о событиях транзакции: {тип: [[id, status_id, category_id,
+    supplier_user_id, previous_status_id], ...]}. Не помещается - {"resync": []}.
+    """
+    grouped: dict[str, list] = {}
+    for item in events:
+        grouped.setdefault(item["type"], []).append([
+            item["id"],
+            item["status_id"],
+            item["category_id"],
+            item["supplier_user_id"],
+            item["previous_status_id"],
+        ])
+    payload = json.dumps(grouped, separators=(",", ":"))
+    if len(payload.encode()) > NOTIFY_PAYLOAD_MAX:
+        return json.dumps({EVENT_RESYNC: []})
+    return payload
+
+
+def decode_notification(payload: str) -> list[dict]:
+    """События из payload encode_notification"""
+    items = []
+    for event_type, rows in json.loads(payload).items():
+        if event_type == EVENT_RESYNC:
+            items.append({"type": EVENT_RESYNC})
+            continue
+        items.extend(product_event(event_type, *row) for row in rows)
+    return items
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+@dataclass(eq=False)
+class Subscription:
+    """Подписчик ленты с фильтрами (None - без фильтра)"""
+    supplier_user_id: Optional[int] = None
+    status_id: Optional[int] = None
+    category_id: Optional[int] = None
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(SUBSCRIBER_QUEUE_SIZE))
+    # Цикл событий, в котором читается очередь (asyncio.Queue не потокобезопасна)
+    loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def matches(self, item: dict) -> bool:
+        if item["type"] == EVENT_RESYNC:
+            return True
+        if self.supplier_user_id is not None and item.get("supplier_user_id") != self.supplier_user_id:
+            return False
+        if self.status_id is not None and self.status_id not in (
+            item.get("status_id"),
+            item.get("previous_status_id"),
+        ):
+            return False
+        if self.category_id is not None and item.get("category_id") != self.category_id:
+            return False
+        return True
+
+    def offer(self, item: dict) -> None:
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            # Медленный клиент: вместо части событий - одно указание перечитать данные
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": EVENT_RESYNC})
+
+    def offer_many(self, items: list[dict]) -> None:
+        for item in items:
+            self.offer(item)
+
+
+class ProductEventBroadcaster:
+    """Раздаёт события заявок подписчикам воркера"""
+
+    def __init__(self):
+        self._subscriptions: set[Subscription] = set()
+        # True - события приходят через LISTEN (в т.ч. из других воркеров)
+        self.relayed = False
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscriptions)
+
+    def subscribe(
+        self,
+        supplier_user_id: Optional[int] = None,
+        status_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+    ) -> Subscription:
+        subscription = Subscription(
+            supplier_user_id=supplier_user_id,
+            status_id=status_id,
+            category_id=category_id,
+            loop=asyncio.get_running_loop(),
+        )
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    def publish(self, item: dict) -> None:
+        self.publish_many([item])
+
+    def publish_many(self, items: list[dict]) -> None:
+        """
+        Раздаёт события подписчикам. Из потока вне цикла подписчика события
+        передаются в его цикл через call_soon_threadsafe - одним вызовом на пакет
+        (commit пакета импорта - до PRODUCT_IMPORT_CHUNK_SIZE событий).
+        """
+        current = _running_loop()
+        for subscription in list(self._subscriptions):
+            matched = [item for item in items if subscription.matches(item)]
+            if not matched:
+                continue
+            if subscription.loop is current:
+                subscription.offer_many(matched)
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer_many, matched)
+            except RuntimeError:
+                # Цикл уже закрыт (остановка приложения)
+                pass
+
+    def publish_payload(self, payload: str) -> None:
+        """События из уведомления PostgreSQL"""
+        try:
+            items = decode_notification(payload)
+        except (ValueError, TypeError, AttributeError):
+            logger.warning(f"Некорректное уведомление о событиях заявок: {payload!r}")
+            return
+        self.publish_many(items)
+
+    def resync(self) -> None:
+        """Сообщает всем подписчикам, что события могли быть пропущены"""
+        self.publish({"type": EVENT_RESYNC})
+
+
+product_broadcaster = ProductEventBroadcaster()
+
+
+@event.listens_for(Session, "before_commit")
+def _notify_pending(session: Session) -> None:
+    events = session.info.get(_SESSION_EVENTS_KEY)
+    if events and settings.REFERENCE_LISTEN_ENABLED:
+        session.execute(select(func.pg_notify(PRODUCT_EVENTS_CHANNEL, encode_notification(events))))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session: Session) -> None:
+    events = session.info.pop(_SESSION_EVENTS_KEY, None)
+    if events and not product_broadcaster.relayed:
+        # Может выполняться в потоке (импорт, to_thread) - publish_many потокобезопасен
+        product_broadcaster.publish_many(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session: Session) -> None:
+    session.info.pop(_SESSION_EVENTS_KEY, None)
@@ -0,0 +1,473 @@
+"""
+Импорт заявок из CSV/XLSX фоновыми задачами.
+
+Загруженный файл сохраняется во временный каталог, задача записывается в
+bo.product_import_jobs, а обработка идёт в отдельном пуле потоков
+(PRODUCT_IMPORT_WORKERS на воркер): запрос не ждёт импорта, event loop не занят.
+Файл читается потоково (csv.reader, openpyxl в режиме read_only) пакетами по
+PRODUCT_IMPORT_CHUNK_SIZE строк. Пакет проверяется и вставляется через
+ProductService.create_products_bulk, затем в задаче обновляется прогресс, а в
+bo.product_import_errors записываются ошибки строк пакета - в памяти
+одновременно только один пакет.
+
+Задачи живут в пуле потоков воркера, поэтому после перезапуска или сбоя их
+никто не продолжит: при старте воркер помечает failed задачи queued/running,
+не обновлявшиеся дольше PRODUCT_IMPORT_STALE_MINUTES (выполняемая задача
+обновляет прогресс после каждого пакета), и удаляет их файлы.
+"""
+import csv
+import io
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, AsyncIterator, BinaryIO, Iterator, Optional
+
+from loguru import logger
+from openpyxl import load_workbook
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.product_import import ProductImportError, ProductImportJob
+from app.services.auth_cache import SupplierPrincipal
+from app.services.product_service import ProductService
+
+IMPORT_QUEUED = "queued"
+IMPORT_RUNNING = "running"
+IMPORT_DONE = "done"
+IMPORT_FAILED = "failed"
+
+IMPORT_FORMATS = ("csv", "xlsx")
+
+# Колонки файла, которые переносятся в ProductCreate как есть
+IMPORT_FIELDS = (
+    "source_url",
+    "price_rub",
+    "category_id",
+    "status_id",
+    "country_of_origin",
+    "composition",
+    "size_range",
+    "color",
+    "description",
+    "attributes",
+    "is_active",
+)
+# Код категории вместо category_id (колонка category_code есть в выгрузке /products/export)
+CATEGORY_CODE_COLUMNS = ("category_code", "category")
+# is_active по-русски, остальные варианты (true/false, 1/0, yes/no) понимает pydantic
+_BOOLEAN_WORDS = {"да": True, "нет": False}
+
+STALE_JOB_ERROR = "Импорт прерван перезапуском сервера, загрузите файл заново"
+
+_COPY_BUFFER = 1024 * 1024
+_SNIFF_BYTES = 64 * 1024
+
+
+def detect_format(filename: Optional[str]) -> str:
+    """Формат по расширению файла"""
+    extension = os.path.splitext(filename or "")[1].lower().lstrip(".")
+    if extension not in IMPORT_FORMATS:
+        raise ValueError("Поддерживаются только файлы CSV и XLSX")
+    return extension
+
+
+def save_upload(source: BinaryIO, file_format: str) -> str:
+    """
+    Копирует загруженный файл во временный каталог (блоками, без чтения в память).
+    Возвращает путь к копии; файл больше PRODUCT_IMPORT_MAX_BYTES отклоняется.
+    """
+    target = tempfile.NamedTemporaryFile(
+        prefix="product_import_",
+        suffix=f".{file_format}",
+        dir=settings.PRODUCT_IMPORT_DIR,
+        delete=False,
+    )
+    size = 0
+    try:
+        with target:
+            while chunk := source.read(_COPY_BUFFER):
+                size += len(chunk)
+                if size > settings.PRODUCT_IMPORT_MAX_BYTES:
+                    raise ValueError(
+                        f"Файл больше {settings.PRODUCT_IMPORT_MAX_BYTES // (1024 * 1024)} МБ"
+                    )
+                target.write(chunk)
+    except Exception:
+        remove_upload(target.name)
+        raise
+    return target.name
+
+
+def remove_upload(path: str) -> None:
+    """Удаляет сохранённый файл (после импорта или при ошибке создания задачи)"""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+def _header(cells) -> list[str]:
+    return [str(cell).strip().lower() if cell is not None else "" for cell in cells]
+
+
+def _csv_encoding(sample: bytes) -> str:
+    """UTF-8 (с BOM или без), иначе cp1251 - так сохраняет CSV русский Excel"""
+    try:
+        sample.decode("utf-8")
+    except UnicodeDecodeError as e:
+        # Ошибка в самом конце образца - обрезанный многобайтовый символ, а не другая кодировка
+        if e.start < len(sample) - 3:
+            return "cp1251"
+    return "utf-8-sig"
+
+
+def _read_csv(path: str) -> Iterator[tuple[int, dict, float]]:
+    size = os.path.getsize(path) or 1
+    with open(path, "rb") as raw:
+        encoding = _csv_encoding(raw.read(_SNIFF_BYTES))
+        raw.seek(0)
+        text = io.TextIOWrapper(raw, encoding=encoding, newline="")
+        sample = text.read(_SNIFF_BYTES)
+        text.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(text, dialect)
+        header = next(reader, None)
+        if header is None:
+            return
+        columns = _header(header)
+        for row_number, row in enumerate(reader, start=2):
+            if not any(cell.strip() for cell in row):
+                continue
+            # Позиция в файле с учётом буфера чтения - для прогресса достаточно
+            yield row_number, dict(zip(columns, row)), min(raw.tell() / size, 1.0)
+
+
+def _read_xlsx(path: str) -> Iterator[tuple[int, dict, float]]:
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        # Размер листа из его заголовка; если его нет, прогресс известен только в конце
+        total = (sheet.max_row or 0) - 1
+        rows = sheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = _header(header)
+        for row_number, row in enumerate(rows, start=2):
+            if all(cell is None or str(cell).strip() == "" for cell in row):
+                continue
+            progress = min((row_number - 1) / total, 1.0) if total > 0 else 0.0
+            yield row_number, dict(zip(columns, row)), progress
+    finally:
+        workbook.close()
+
+
+def read_rows(path: str, file_format: str) -> Iterator[tuple[int, dict, float]]:
+    """
+    Строки файла: (номер строки, значения по колонкам заголовка, доля прочитанного).
+    Первая строка - заголовок с именами полей, пустые строки пропускаются.
+    """
+    if file_format == "xlsx":
+        return _read_xlsx(path)
+    return _read_csv(path)
+
+
+def _row_item(values: dict[str, Any], category_ids: dict[str, int]) -> tuple[dict, list[str]]:
+    """Строка файла -> элемент в формате ProductCreate и ошибки разбора"""
+    item = {}
+    errors = []
+    for name in IMPORT_FIELDS:
+        value = values.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == "":
+            continue
+        item[name] = value
+
+    if isinstance(item.get("is_active"), str):
+        item["is_active"] = _BOOLEAN_WORDS.get(item["is_active"].lower(), item["is_active"])
+
+    if isinstance(item.get("attributes"), str):
+        try:
+            item["attributes"] = json.loads(item["attributes"])
+        except ValueError:
+            errors.append("attributes: некорректный JSON")
+
+    if "category_id" not in item:
+        for column in CATEGORY_CODE_COLUMNS:
+            code = values.get(column)
+            if code is None or str(code).strip() == "":
+                continue
+            code = str(code).strip()
+            if code in category_ids:
+                item["category_id"] = category_ids[code]
+            else:
+                errors.append(f"{column}: категория {code!r} не найдена")
+            break
+    return item, errors
+
+
+def _chunks(rows: Iterator, size: int) -> Iterator[list]:
+    while chunk := list(islice(rows, size)):
+        yield chunk
+
+
+def _update_job(db: Session, job_id: int, **values) -> None:
+    db.execute(update(ProductImportJob).where(ProductImportJob.id == job_id).values(**values))
+
+
+class ProductImportService:
+    """Сервис задач импорта заявок"""
+
+    @staticmethod
+    async def create_job(
+        db: AsyncSession,
+        supplier_user_id: int,
+        file_name: Optional[str],
+        file_format: str,
+        file_path: Optional[str] = None,
+    ) -> ProductImportJob:
+        """Создаёт задачу импорта в статусе queued (file_path - сохранённый файл)"""
+        job = ProductImportJob(
+            supplier_user_id=supplier_user_id,
+            file_name=file_name,
+            file_format=file_format,
+            file_path=file_path,
+            status=IMPORT_QUEUED,
+        )
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        logger.info(f"Создана задача импорта {job.id} ({file_name}) для пользователя {supplier_user_id}")
+        return job
+
+    @staticmethod
+    async def get_job(
+        db: AsyncSession,
+        job_id: int,
+        supplier_user_id: Optional[int] = None,
+    ) -> Optional[ProductImportJob]:
+        """Задача импорта по ID (с опциональной проверкой владельца)"""
+        query = select(ProductImportJob).where(ProductImportJob.id == job_id)
+        if supplier_user_id:
+            query = query.where(ProductImportJob.supplier_user_id == supplier_user_id)
+        return (await db.execute(query)).scalar_one_or_none()
+
+    @staticmethod
+    async def stream_errors(db: AsyncSession, job_id: int) -> AsyncIterator[list[Row]]:
+        """Ошибки строк задачи по порядку строк, пакетами через серверный курсор"""
+        query = (
+            select(ProductImportError.row_number, ProductImportError.errors)
+            .where(ProductImportError.job_id == job_id)
+            .order_by(ProductImportError.row_number)
+            .execution_options(yield_per=settings.PRODUCT_EXPORT_BATCH_SIZE)
+        )
+        result = await db.stream(query)
+        try:
+            async for rows in result.partitions():
+                yield rows
+        finally:
+            await result.close()
+
+    @staticmethod
+    def fail_stale_jobs(db: Session, stale_minutes: Optional[int] = None) -> int:
+        """
+        Помечает failed задачи queued/running без обновлений дольше stale_minutes
+        (по умолчанию PRODUCT_IMPORT_STALE_MINUTES) и удаляет их файлы.
+        Вызывается при старте воркера. Возвращает количество задач.
+        """
+        if stale_minutes is None:
+            stale_minutes = settings.PRODUCT_IMPORT_STALE_MINUTES
+        # Условие на status перепроверяется после блокировки строки: при одновременном
+        # старте нескольких воркеров каждую задачу помечает только один из них
+        jobs = db.execute(
+            update(ProductImportJob)
+            .where(
+                ProductImportJob.status.in_((IMPORT_QUEUED, IMPORT_RUNNING)),
+                ProductImportJob.updated_at < func.now() - func.make_interval(0, 0, 0, 0, 0, stale_minutes),
+            )
+            .values(
+                status=IMPORT_FAILED,
+                error=STALE_JOB_ERROR,
+                finished_at=func.now(),
+            )
+            .returning(ProductImportJob.id, ProductImportJob.file_path)
+        ).all()
+        db.commit()
+        for job in jobs:
+            if job.file_path:
+                remove_upload(job.file_path)
+        if jobs:
+            logger.warning(
+                f"Задачи импорта прерваны перезапуском и помечены failed: {', '.join(str(job.id) for job in jobs)}"
+            )
+        return len(jobs)
+
+    @staticmethod
+    def run_job(
+        job_id: int,
+        path: str,
+        file_format: str,
+        supplier_user_id: int,
+        category_ids: dict[str, int],
+        supplier: Optional[SupplierPrincipal] = None,
+        stop: Optional[threading.Event] = None,
+    ) -> None:
+        """
+        Выполняет задачу импорта (в потоке пула ProductImportRunner).
+
+        Args:
+            job_id: ID задачи в bo.product_import_jobs
+            path: Сохранённый файл, удаляется по окончании
+            file_format: csv или xlsx
+            supplier_user_id: ID пользователя поставщика (bo.users.id)
+            category_ids: Код категории -> id (из кэша справочников на момент загрузки)
+            supplier: Поставщик, для логов
+            stop: Событие остановки приложения, проверяется между пакетами
+        """
+        processed = created = failed = 0
+        with SessionLocal() as db:
+            try:
+                started = db.execute(
+                    update(ProductImportJob)
+                    .where(ProductImportJob.id == job_id, ProductImportJob.status == IMPORT_QUEUED)
+                    .values(status=IMPORT_RUNNING, started_at=func.now())
+                ).rowcount
+                db.commit()
+                if not started:
+                    # Задачу уже пометили прерванной (fail_stale_jobs другого воркера)
+                    logger.warning(f"Задача импорта {job_id} не в очереди, пропускаю")
+                    return
+
+                for chunk in _chunks(read_rows(path, file_format), settings.PRODUCT_IMPORT_CHUNK_SIZE):
+                    if stop is not None and stop.is_set():
+                        raise RuntimeError("Импорт прерван остановкой сервера")
+
+                    row_errors: dict[int, list[str]] = {}
+                    items = []
+                    item_rows = []
+                    for row_number, values, _ in chunk:
+                        item, errors = _row_item(values, category_ids)
+                        if errors:
+                            row_errors[row_number] = errors
+                        else:
+                            items.append(item)
+                            item_rows.append(row_number)
+
+                    if items:
+                        results = ProductService.create_products_bulk(
+                            db,
+                            items=items,
+                            supplier_user_id=supplier_user_id,
+                            supplier=supplier,
+                        )
+                        for row_number, result in zip(item_rows, results):
+                            if result.errors:
+                                row_errors[row_number] = result.errors
+                            else:
+                                created += 1
+
+                    processed += len(chunk)
+                    failed += len(row_errors)
+                    if row_errors:
+                        db.execute(insert(ProductImportError), [
+                            {"job_id": job_id, "row_number": row_number, "errors": errors}
+                            for row_number, errors in row_errors.items()
+                        ])
+                    _update_job(
+                        db,
+                        job_id,
+                        rows_processed=processed,
+                        rows_created=created,
+                        rows_failed=failed,
+                        progress=chunk[-1][2],
+                    )
+                    db.commit()
+
+                _update_job(db, job_id, status=IMPORT_DONE, progress=1, finished_at=func.now())
+                db.commit()
+                logger.info(
+                    f"Задача импорта {job_id} завершена: строк {processed}, "
+                    f"создано {created}, с ошибками {failed}"
+                )
+
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Ошибка задачи импорта {job_id} после {processed} строк: {e}")
+                try:
+                    _update_job(db, job_id, status=IMPORT_FAILED, error=str(e), finished_at=func.now())
+                    db.commit()
+                except Exception as update_error:
+                    logger.error(f"Не удалось записать статус задачи импорта {job_id}: {update_error}")
+            finally:
+                remove_upload(path)
+
+
+class ProductImportRunner:
+    """Пул потоков для задач импорта в пределах воркера"""
+
+    def __init__(self, workers: int):
+        self._workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        job_id: int,
+        path: str,
+        file_format: str,
+        supplier_user_id: int,
+        category_ids: dict[str, int],
+        supplier: Optional[SupplierPrincipal] = None,
+    ) -> None:
+        """Ставит задачу в очередь; сверх PRODUCT_IMPORT_WORKERS задачи ждут в статусе queued"""
+        with self._lock:
+            if self._executor is None:
+                self._stop.clear()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._workers,
+                    thread_name_prefix="product-import",
+                )
+            self._executor.submit(
+                ProductImportService.run_job,
+                job_id,
+                path,
+                file_format,
+                supplier_user_id,
+                category_ids,
+                supplier,
+                self._stop,
+            )
+
+    def recover(self) -> None:
+        """Старт приложения: задачи, прерванные перезапуском, помечаются failed. Блокирующий вызов."""
+        try:
+            with SessionLocal() as db:
+                ProductImportService.fail_stale_jobs(db)
+        except Exception as e:
+            logger.error(f"Ошибка восстановления задач импорта: {e}")
+
+    def stop(self) -> None:
+        """
+        Остановка приложения: выполняемые задачи завершаются после текущего пакета,
+        ожидающие сразу получают статус failed. Блокирующий вызов.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            self._stop.set()
+            executor.shutdown(wait=True)
+
+
+product_import_runner = ProductImportRunner(settings.PRODUCT_IMPORT_WORKERS)
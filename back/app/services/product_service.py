@@ -1,21 +1,369 @@
 """
 Сервис для работы с заявками (products)
 """
-from typing import Optional
-from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import and_, or_, func
+import json
+from dataclasses import dataclass, field
+from typing import Any, Optional
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.orm import Session, Query
+from sqlalchemy import BigInteger, Select, bindparam, func, insert, select, true, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Result, Row
 from loguru import logger
 
+from app.config import settings
+from app.database import Explain
+from app.logging_config import sampled_logger
+
 from app.models.product import Product
+from app.models.product_counter import ProductCounter
 from app.models.supplier import Supplier
 from app.models.status import Status
+from app.models.category import Category
 from app.models.user_account import UserAccount
 from app.schemas.product import ProductCreate, ProductUpdate
+from app.services import pagination
+from app.services.auth_cache import SupplierPrincipal
+from app.services import search as search_module
+from app.services.attribute_filter import AttributeFilters, attribute_filter
+from app.services.count_cache import product_count_cache
+from app.services import product_events
+from app.services.category_validation import get_category_validators
+from app.services.status_graph import get_status_graph
+
+TOTAL_EXACT = "exact"
+TOTAL_ESTIMATE = "estimate"
+TOTAL_NONE = "none"
+TOTAL_MODES = (TOTAL_EXACT, TOTAL_ESTIMATE, TOTAL_NONE)
+
+SORT_RELEVANCE = "relevance"
+
+# Профиль поставщика для пользователя (bo.suppliers по tg_user_id), не больше одного
+_supplier_profile = (
+    select(
+        Supplier.id.label("id"),
+        Supplier.custom_name.label("custom_name"),
+        Supplier.first_name.label("first_name"),
+        Supplier.username.label("username"),
+        Supplier.role.label("role"),
+    )
+    .where(Supplier.tg_user_id == UserAccount.tg_user_id)
+    .order_by(Supplier.id)
+    .limit(1)
+    .lateral("supplier_profile")
+)
+
+# Колонки заявки в строке ответа (имена совпадают с атрибутами Product)
+PRODUCT_FIELDS = [
+    Product.id,
+    Product.supplier_user_id,
+    Product.category_id,
+    Product.source_url,
+    Product.price_rub,
+    Product.country_of_origin,
+    Product.composition,
+    Product.size_range,
+    Product.color,
+    Product.description,
+    Product.attributes,
+    Product.status_id,
+    Product.approved_by,
+    Product.approved_at,
+    Product.is_active,
+    Product.created_at,
+    Product.updated_at,
+]
+
+# Отображаемые поля статуса, категории, пользователя и поставщика
+STATUS_FIELDS = [
+    Status.id.label("status_ref_id"),
+    Status.name.label("status_name"),
+    Status.code.label("status_code"),
+]
+CATEGORY_FIELDS = [
+    Category.id.label("category_ref_id"),
+    Category.name.label("category_name"),
+    Category.code.label("category_code"),
+]
+SUPPLIER_FIELDS = [
+    UserAccount.id.label("user_id"),
+    UserAccount.first_name.label("user_first_name"),
+    UserAccount.username.label("user_username"),
+    UserAccount.email.label("user_email"),
+    UserAccount.role.label("user_role"),
+    _supplier_profile.c.id.label("supplier_id"),
+    _supplier_profile.c.custom_name.label("supplier_custom_name"),
+    _supplier_profile.c.first_name.label("supplier_first_name"),
+    _supplier_profile.c.username.label("supplier_username"),
+    _supplier_profile.c.role.label("supplier_role"),
+]
+DISPLAY_FIELDS = STATUS_FIELDS + CATEGORY_FIELDS + SUPPLIER_FIELDS
+
+# Поля ответа, для которых нужен JOIN, и колонка bo.products, по которой он делается
+RELATION_FIELDS = {
+    "status": "status_id",
+    "category": "category_id",
+    "supplier": "supplier_user_id",
+}
+ALL_FIELDS = frozenset([column.key for column in PRODUCT_FIELDS] + list(RELATION_FIELDS))
+
+# Набор полей для таблицы заявок в админке (fields=list): без тяжёлых
+# composition/attributes и полей, которые в списке не показываются
+FIELDS_PRESET_LIST = "list"
+LIST_VIEW_FIELDS = frozenset([
+    "id",
+    "source_url",
+    "price_rub",
+    "description",
+    "is_active",
+    "created_at",
+    "updated_at",
+    "status_id",
+    "category_id",
+    "supplier_user_id",
+    "status",
+    "category",
+    "supplier",
+])
+
+
+def parse_fields(fields: Optional[str]) -> Optional[frozenset]:
+    """
+    Разбирает параметр fields ("id,price_rub,status" или пресет "list").
+    None - все поля (формат ProductResponse целиком).
+    """
+    if fields is None or not fields.strip():
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    if FIELDS_PRESET_LIST in names:
+        names.discard(FIELDS_PRESET_LIST)
+        names |= LIST_VIEW_FIELDS
+    unknown = names - ALL_FIELDS
+    if unknown:
+        raise ValueError(f"Неизвестные поля: {', '.join(sorted(unknown))}")
+    # id нужен всегда: по нему строятся курсоры и фрагменты подсветки
+    return frozenset(names | {"id"})
+
+
+def _page_fields(fields: Optional[frozenset], *extra: str) -> list:
+    """
+    Колонки bo.products для подзапроса страницы: запрошенные поля,
+    ключи JOIN для запрошенных связей и служебные (extra), например ключ сортировки
+    """
+    if fields is None:
+        return PRODUCT_FIELDS
+    needed = set(fields) | set(extra)
+    needed |= {RELATION_FIELDS[name] for name in RELATION_FIELDS if name in fields}
+    return [column for column in PRODUCT_FIELDS if column.key in needed]
+
+
+def _filter_conditions(
+    supplier_user_id: Optional[int] = None,
+    status_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    search: Optional[str] = None,
+    attributes: Optional[AttributeFilters] = None,
+    is_active: Optional[bool] = None,
+) -> list:
+    """Условия WHERE по bo.products для фильтров списка и выгрузки"""
+    conditions = []
+    if supplier_user_id:
+        conditions.append(Product.supplier_user_id == supplier_user_id)
+    if status_id:
+        conditions.append(Product.status_id == status_id)
+    if category_id:
+        conditions.append(Product.category_id == category_id)
+    if search:
+        conditions.append(search_module.search_filter(search))
+    if attributes:
+        conditions.append(attribute_filter(attributes))
+    if is_active is not None:
+        conditions.append(Product.is_active == is_active)
+    return conditions
+
+
+def _product_select(
+    page,
+    snippet_term: Optional[str] = None,
+    fields: Optional[frozenset] = None,
+) -> Select:
+    """
+    SELECT строк заявок со связанными полями поверх подзапроса page
+    (колонки bo.products). LEFT JOIN к справочникам выполняются только
+    для строк подзапроса и только для связей, запрошенных в fields (None - все).
+    """
+    columns = [page.c[column.key] for column in PRODUCT_FIELDS if column.key in page.c]
+    with_status = fields is None or "status" in fields
+    with_category = fields is None or "category" in fields
+    with_supplier = fields is None or "supplier" in fields
+    if with_status:
+        columns += STATUS_FIELDS
+    if with_category:
+        columns += CATEGORY_FIELDS
+    if with_supplier:
+        columns += SUPPLIER_FIELDS
+    columns += [c for c in page.c if c.key in ("total_count", "page_pos")]
+    if snippet_term:
+        columns.append(search_module.fts_headline(snippet_term, page.c.description).label("snippet"))
+    
+    source = page
+    if with_status:
+        source = source.outerjoin(Status, Status.id == page.c.status_id)
+    if with_category:
+        source = source.outerjoin(Category, Category.id == page.c.category_id)
+    if with_supplier:
+        source = (
+            source
+            .outerjoin(UserAccount, UserAccount.id == page.c.supplier_user_id)
+            .outerjoin(_supplier_profile, true())
+        )
+    statement = select(*columns).select_from(source)
+    if "page_pos" in page.c:
+        statement = statement.order_by(page.c.page_pos)
+    return statement
+
+
+def _product_rows(
+    db: Session,
+    page_query: Query,
+    snippet_term: Optional[str] = None,
+    fields: Optional[frozenset] = None,
+) -> Result:
+    """
+    Проекция страницы заявок со связанными полями одним SQL-запросом
+    вместо цепочки selectinload. Возвращает лёгкие Row вместо ORM-объектов.
+    
+    page_query - запрос по bo.products с фильтрами, сортировкой и LIMIT
+    (и, возможно, служебными колонками total_count/page_pos). Он становится
+    подзапросом, а LEFT JOIN к справочникам выполняются только для строк страницы
+    и только для связей, запрошенных в fields (None - все).
+    """
+    return db.execute(_product_select(page_query.subquery("page"), snippet_term, fields))
+
+
+@dataclass
+class ProductPage:
+    """Страница списка заявок"""
+    items: list[Row] = field(default_factory=list)
+    total: Optional[int] = 0
+    total_estimated: bool = False
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    snippets: dict[int, str] = field(default_factory=dict)
+
+
+@dataclass
+class BulkItemResult:
+    """Результат для одного элемента массового создания"""
+    index: int
+    id: Optional[int] = None
+    errors: list[str] = field(default_factory=list)
+
+
+# Колонки, которые заполняются при массовом создании (одинаковый набор ключей для всех строк)
+BULK_INSERT_FIELDS = (
+    "source_url",
+    "price_rub",
+    "category_id",
+    "status_id",
+    "supplier_user_id",
+    "country_of_origin",
+    "composition",
+    "size_range",
+    "color",
+    "description",
+    "attributes",
+    "is_active",
+)
+
+# Многострочный INSERT ... RETURNING (insertmanyvalues), id возвращаются в порядке строк.
+# attributes=None пишется как SQL NULL, а не JSON null - как при создании через ORM.
+_bulk_insert = (
+    insert(Product)
+    .values(attributes=bindparam("attributes", type_=JSONB(none_as_null=True)))
+    .returning(Product.id, sort_by_parameter_order=True)
+)
+
+
+# Итог перехода статуса для одной заявки
+TRANSITION_UPDATED = "updated"
+TRANSITION_UNCHANGED = "unchanged"
+TRANSITION_FORBIDDEN = "forbidden"
+TRANSITION_NOT_FOUND = "not_found"
+
+# Код статуса, при переходе в который заполняются approved_by/approved_at
+STATUS_APPROVED = "approved"
+
+
+@dataclass
+class TransitionResult:
+    """Результат перехода статуса для одной заявки"""
+    id: int
+    outcome: str
+    from_status_id: Optional[int] = None
+    detail: Optional[str] = None
+
+
+# Проверка пакета элементов одним вызовом pydantic-core вместо model_validate на каждый
+_product_create_list = TypeAdapter(list[ProductCreate])
+
+
+def _validate_items(items: list) -> tuple[dict[int, ProductCreate], dict[int, list[str]]]:
+    """
+    Проверяет элементы пакета по ProductCreate.
+    
+    Возвращает корректные элементы и сообщения об ошибках по индексам. При ошибках
+    некорректные элементы отбрасываются, а остальные проверяются ещё одним вызовом.
+    """
+    try:
+        return dict(enumerate(_product_create_list.validate_python(items))), {}
+    except ValidationError as e:
+        errors: dict[int, list[str]] = {}
+        for item in e.errors():
+            index, *loc = item["loc"]
+            errors.setdefault(index, []).append(
+                f"{'.'.join(str(part) for part in loc) or 'item'}: {item['msg']}"
+            )
+    valid = [index for index in range(len(items)) if index not in errors]
+    parsed = _product_create_list.validate_python([items[index] for index in valid])
+    return dict(zip(valid, parsed)), errors
+
+
+def _check_category_rules(
+    db: Session,
+    category_id: Optional[int],
+    values: dict,
+    changed: Optional[set] = None,
+) -> None:
+    """
+    Проверка полей и attributes по правилам категории; ValueError со списком нарушений.
+    changed - изменённые поля: если правил категории они не касаются, проверки нет
+    (заявки, заведённые до появления правил, можно править по другим полям).
+    """
+    validator = get_category_validators(db).get(category_id)
+    if validator is None:
+        return
+    if changed is not None and not changed & {"category_id", "attributes", *validator.required_product_fields}:
+        return
+    errors = validator.errors(values)
+    if errors:
+        raise ValueError(f"Заявка не соответствует правилам категории: {'; '.join(errors)}")
 
 
 class ProductService:
     """Сервис для работы с заявками"""
     
+    @staticmethod
+    def _estimate_count(db: Session, query: Query) -> int:
+        """
+        Оценка количества строк по плану запроса (EXPLAIN), без выполнения самого запроса.
+        """
+        statement = query.with_entities(Product.id).statement
+        plan = db.execute(Explain(statement)).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    
     @staticmethod
     def get_products(
         db: Session,
@@ -25,7 +373,15 @@ class ProductService:
         page: int = 1,
         page_size: int = 10,
         search: Optional[str] = None,
-    ) -> tuple[list[Product], int]:
+        sort: str = "created_at",
+        order: str = "desc",
+        cursor: Optional[str] = None,
+        include_total: str = TOTAL_EXACT,
+        highlight: bool = False,
+        fields: Optional[frozenset] = None,
+        attributes: Optional[AttributeFilters] = None,
+        is_active: Optional[bool] = None,
+    ) -> ProductPage:
         """
         Получает список заявок с фильтрацией и пагинацией.
         
@@ -34,65 +390,244 @@ class ProductService:
             supplier_user_id: Фильтр по ID пользователя (bo.users.id), создавшего заявку
             status_id: Фильтр по ID статуса
             category_id: Фильтр по ID категории
-            page: Номер страницы (начинается с 1)
+            page: Номер страницы (начинается с 1), игнорируется при переданном cursor
             page_size: Размер страницы
-            search: Поиск по названию/описанию
+            search: Поиск по описанию/составу/URL
+            sort: Ключ сортировки (created_at, updated_at, price_rub, relevance)
+            order: Направление сортировки (asc, desc), для relevance не используется
+            cursor: Курсор keyset-пагинации (next_cursor/prev_cursor из предыдущего ответа)
+            include_total: Режим подсчёта total: exact - точно (count(*) OVER() в запросе
+                страницы или кэш), estimate - оценка планировщика, none - не считать
+            highlight: Вернуть фрагменты описания с подсветкой совпадений (ts_headline)
+            fields: Поля ответа (см. parse_fields); None - все. Незапрошенные колонки
+                не читаются, а JOIN к статусам/категориям/поставщикам не выполняются
+            attributes: Фильтры по атрибутам (см. attribute_filter.parse_attribute_filters)
+            is_active: Фильтр по активности заявки
         
         Returns:
-            Кортеж (список продуктов, общее количество)
+            ProductPage со списком продуктов, общим количеством и курсорами соседних страниц
         """
         try:
-            # Базовый запрос
-            query = db.query(Product)
+            relevance = sort == SORT_RELEVANCE
+            if not relevance and sort not in pagination.SORT_COLUMNS:
+                raise ValueError(f"Недопустимый ключ сортировки: {sort}")
+            if order not in pagination.SORT_ORDERS:
+                raise ValueError(f"Недопустимое направление сортировки: {order}")
+            if include_total not in TOTAL_MODES:
+                raise ValueError(f"Недопустимый режим подсчёта: {include_total}")
             
-            # Фильтры
-            if supplier_user_id:
-                query = query.filter(Product.supplier_user_id == supplier_user_id)
+            use_fts = bool(search) and search_module.is_fts_enabled()
+            if relevance:
+                if not use_fts:
+                    raise ValueError("Сортировка по релевантности требует полнотекстового поиска (search)")
+                if cursor:
+                    raise ValueError("Курсорная пагинация недоступна при сортировке по релевантности")
             
-            if status_id:
-                query = query.filter(Product.status_id == status_id)
+            decoded = None
+            if cursor:
+                decoded = pagination.decode_cursor(cursor)
+                if decoded.sort != sort or decoded.order != order:
+                    raise ValueError("Курсор не соответствует параметрам сортировки")
             
-            if category_id:
-                query = query.filter(Product.category_id == category_id)
+            # Базовый запрос с фильтрами
+            filtered = db.query(Product).filter(
+                *_filter_conditions(supplier_user_id, status_id, category_id, search, attributes, is_active)
+            )
             
-            if search:
-                search_pattern = f"%{search}%"
-                query = query.filter(
-                    or_(
-                        Product.source_url.ilike(search_pattern),
-                        Product.description.ilike(search_pattern),
-                        Product.composition.ilike(search_pattern),
-                    )
-                )
+            # Общее количество
+            total = None
+            total_estimated = False
+            count_key = (supplier_user_id, status_id, category_id, search, attributes, is_active)
+            estimated = None
+            if include_total == TOTAL_ESTIMATE:
+                total = estimated = ProductService._estimate_count(db, filtered)
+                if total < settings.PRODUCT_COUNT_EXACT_THRESHOLD:
+                    # Мелкие выборки дешевле посчитать точно, чем доверять оценке
+                    include_total = TOTAL_EXACT
+                    total = None
+                else:
+                    total_estimated = True
+            if include_total == TOTAL_EXACT:
+                total = product_count_cache.get(count_key)
+            # count(*) OVER() считается в том же запросе, что и страница (только без курсора)
+            window_count = include_total == TOTAL_EXACT and total is None and decoded is None
+            with_snippets = highlight and use_fts
             
-            # Подгружаем связанные объекты для избежания N+1 проблемы
-            # Используем selectinload для более эффективной загрузки
-            query = query.options(
-                selectinload(Product.supplier_account).selectinload(UserAccount.supplier_profile),
-                selectinload(Product.status),
-                selectinload(Product.category),
-            )
+            # Страница по bo.products (фильтры, сортировка, LIMIT)
+            # Ключ сортировки нужен для курсоров, description - для ts_headline
+            extra = [] if relevance else [sort]
+            if with_snippets:
+                extra.append("description")
+            page_query = filtered.with_entities(*_page_fields(fields, *extra))
+            if window_count:
+                page_query = page_query.add_columns(func.count().over().label("total_count"))
             
-            # Получаем общее количество
-            total = query.count()
+            if relevance:
+                order_by = [search_module.fts_rank(search).desc(), Product.id.desc()]
             
-            # Применяем пагинацию
-            offset = (page - 1) * page_size
-            products = query.order_by(Product.created_at.desc()).offset(offset).limit(page_size).all()
+            # Поиск и attr-фильтры обслуживает GIN. Обход индекса сортировки с фильтром
+            # быстр для частых совпадений, но при редких читает почти всю таблицу, а
+            # оценка планировщика для редких слов завышена. Поэтому совпадения берутся
+            # из GIN и сортируются, если их читать все (count(*) OVER()) или их немного.
+            indexed_sort = True
+            if not relevance and (use_fts or attributes):
+                if window_count:
+                    indexed_sort = False
+                else:
+                    if estimated is None:
+                        estimated = ProductService._estimate_count(db, filtered)
+                    indexed_sort = estimated >= settings.PRODUCT_GIN_SORT_MAX_ROWS
             
-            logger.info(f"Получено {len(products)} заявок из {total} (страница {page})")
-            return products, total
+            if decoded is None:
+                # Первая страница курсорного режима или обычная offset-пагинация
+                offset = (page - 1) * page_size
+                if not relevance:
+                    order_by = pagination.order_by_clause(sort, order, indexed=indexed_sort)
+                page_query = page_query.order_by(*order_by).offset(offset)
+            else:
+                # Keyset: стоимость любой страницы равна стоимости первой
+                backwards = decoded.direction == pagination.DIRECTION_PREV
+                order_by = pagination.order_by_clause(sort, order, reverse=backwards, indexed=indexed_sort)
+                page_query = page_query.filter(pagination.seek_clause(decoded)).order_by(*order_by)
+            page_query = page_query.add_columns(
+                func.row_number().over(order_by=order_by).label("page_pos")
+            ).limit(page_size + 1)
+            
+            # Статус, категория и поставщик подтягиваются в том же запросе
+            rows = _product_rows(db, page_query, search if with_snippets else None, fields).all()
+            if window_count:
+                if rows:
+                    total = rows[0].total_count
+                elif offset == 0:
+                    total = 0
+            
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+            if decoded is not None and backwards:
+                rows.reverse()
+            
+            products = rows
+            snippets = {}
+            if with_snippets:
+                snippets = {row.id: row.snippet for row in rows}
+            
+            next_cursor = None
+            prev_cursor = None
+            if products and not relevance:
+                if decoded is None:
+                    if has_more:
+                        next_cursor = pagination.cursor_for(
+                            products[-1], sort, order, pagination.DIRECTION_NEXT
+                        )
+                    if offset > 0:
+                        prev_cursor = pagination.cursor_for(
+                            products[0], sort, order, pagination.DIRECTION_PREV
+                        )
+                else:
+                    if has_more or not backwards:
+                        prev_cursor = pagination.cursor_for(
+                            products[0], sort, order, pagination.DIRECTION_PREV
+                        )
+                    if has_more or backwards:
+                        next_cursor = pagination.cursor_for(
+                            products[-1], sort, order, pagination.DIRECTION_NEXT
+                        )
+            
+            if include_total == TOTAL_EXACT and total is None:
+                # Курсорный режим или страница за пределами выборки
+                total = filtered.count()
+            if include_total == TOTAL_EXACT:
+                product_count_cache.set(count_key, total)
+            
+            sampled_logger.info("Получено {} заявок из {} (страница {})", len(products), total, page)
+            return ProductPage(
+                items=products,
+                total=total,
+                total_estimated=total_estimated,
+                next_cursor=next_cursor,
+                prev_cursor=prev_cursor,
+                snippets=snippets,
+            )
             
         except Exception as e:
             logger.error(f"Ошибка при получении заявок: {e}")
             raise
     
+    @staticmethod
+    def export_statement(
+        supplier_user_id: Optional[int] = None,
+        status_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        search: Optional[str] = None,
+        sort: str = "created_at",
+        order: str = "desc",
+        fields: Optional[frozenset] = None,
+        attributes: Optional[AttributeFilters] = None,
+        is_active: Optional[bool] = None,
+    ) -> Select:
+        """
+        Запрос выгрузки: все заявки по фильтрам списка, без LIMIT и подсчёта total.
+        
+        Строки те же, что в get_products (PRODUCT_FIELDS + DISPLAY_FIELDS или fields),
+        порядок - (sort, id) по составному индексу, поэтому PostgreSQL отдаёт первые
+        строки сразу, без сортировки всей выборки. Выполнять через серверный курсор
+        (AsyncProductService.export_products).
+        """
+        if sort not in pagination.SORT_COLUMNS:
+            raise ValueError(f"Недопустимый ключ сортировки: {sort}")
+        if order not in pagination.SORT_ORDERS:
+            raise ValueError(f"Недопустимое направление сортировки: {order}")
+        
+        page = (
+            select(*_page_fields(fields, sort))
+            .where(*_filter_conditions(supplier_user_id, status_id, category_id, search, attributes, is_active))
+            .subquery("page")
+        )
+        key = page.c[sort]
+        if order == "desc":
+            order_by = [key.desc(), page.c.id.desc()]
+        else:
+            order_by = [key.asc(), page.c.id.asc()]
+        return _product_select(page, fields=fields).order_by(*order_by)
+    
+    @staticmethod
+    def get_facets(db: Session, supplier_user_id: Optional[int] = None) -> dict[str, dict[int, int]]:
+        """
+        Количество заявок по статусам и категориям из bo.product_counters.
+        Счётчики ведутся по поставщикам; общие значения - сумма по всем поставщикам
+        (отдельные общие строки были бы общей блокировкой для всех записей).
+        
+        Args:
+            db: Сессия БД
+            supplier_user_id: Счётчики одного пользователя (bo.users.id); None - по всем поставщикам
+        
+        Returns:
+            {"status": {status_id: count}, "category": {category_id: count}}, нулевые значения не включаются
+        """
+        if supplier_user_id:
+            query = select(ProductCounter.facet, ProductCounter.value_id, ProductCounter.count).where(
+                ProductCounter.supplier_user_id == supplier_user_id,
+                ProductCounter.count > 0,
+            )
+        else:
+            total = func.sum(ProductCounter.count)
+            query = (
+                select(ProductCounter.facet, ProductCounter.value_id, total.cast(BigInteger).label("count"))
+                .group_by(ProductCounter.facet, ProductCounter.value_id)
+                .having(total > 0)
+            )
+        rows = db.execute(query)
+        facets: dict[str, dict[int, int]] = {"status": {}, "category": {}}
+        for row in rows:
+            facets[row.facet][row.value_id] = row.count
+        return facets
+    
     @staticmethod
     def get_product_by_id(
         db: Session,
         product_id: int,
         supplier_user_id: Optional[int] = None,
-    ) -> Optional[Product]:
+    ) -> Optional[Row]:
         """
         Получает заявку по ID.
         
@@ -102,24 +637,20 @@ class ProductService:
             supplier_user_id: Опциональный фильтр по пользователю (bo.users.id) для проверки прав
         
         Returns:
-            Product или None
+            Строка заявки со связанными полями (PRODUCT_FIELDS + DISPLAY_FIELDS) или None
         """
         try:
-            query = db.query(Product).options(
-                selectinload(Product.supplier_account).selectinload(UserAccount.supplier_profile),
-                selectinload(Product.status),
-                selectinload(Product.category),
-            ).filter(Product.id == product_id)
+            query = db.query(*PRODUCT_FIELDS).filter(Product.id == product_id)
             
             if supplier_user_id:
                 query = query.filter(Product.supplier_user_id == supplier_user_id)
             
-            product = query.first()
+            product = _product_rows(db, query).first()
             
             if product:
-                logger.info(f"Заявка {product_id} найдена")
+                sampled_logger.info("Заявка {} найдена", product_id)
             else:
-                logger.warning(f"Заявка {product_id} не найдена")
+                logger.warning("Заявка {} не найдена", product_id)
             
             return product
             
@@ -127,11 +658,31 @@ class ProductService:
             logger.error(f"Ошибка при получении заявки {product_id}: {e}")
             raise
     
+    @staticmethod
+    def _default_status_id(db: Session) -> int:
+        """Статус новой заявки: "new", а если его нет - первый статус для продуктов"""
+        new_status = db.query(Status).filter(
+            Status.entity_type == "product",
+            Status.code == "new"
+        ).first()
+        if new_status:
+            logger.info(f"Установлен статус 'новый' (ID: {new_status.id}) для новой заявки")
+            return new_status.id
+        
+        # Если статус "новый" не найден, берем первый статус для продуктов
+        first_status = db.query(Status).filter(
+            Status.entity_type == "product"
+        ).order_by(Status.order_index.asc().nullslast(), Status.id).first()
+        if first_status:
+            logger.warning(f"Статус 'новый' не найден, используется первый статус (ID: {first_status.id})")
+            return first_status.id
+        raise ValueError("Не найден статус для новой заявки")
+    
     @staticmethod
     def create_product(
         db: Session,
         product_data: ProductCreate,
-        supplier: Optional[Supplier] = None,
+        supplier: Optional[SupplierPrincipal] = None,
     ) -> Product:
         """
         Создаёт новую заявку.
@@ -158,46 +709,28 @@ class ProductService:
                 )
             
             # Если status_id не указан, устанавливаем статус "новый" автоматически
-            status_id = product_data.status_id
-            if not status_id:
-                new_status = db.query(Status).filter(
-                    Status.entity_type == "product",
-                    Status.code == "new"
-                ).first()
-                if new_status:
-                    status_id = new_status.id
-                    logger.info(f"Установлен статус 'новый' (ID: {status_id}) для новой заявки")
-                else:
-                    # Если статус "новый" не найден, берем первый статус для продуктов
-                    first_status = db.query(Status).filter(
-                        Status.entity_type == "product"
-                    ).order_by(Status.order_index.asc().nullslast(), Status.id).first()
-                    if first_status:
-                        status_id = first_status.id
-                        logger.warning(f"Статус 'новый' не найден, используется первый статус (ID: {status_id})")
-                    else:
-                        raise ValueError("Не найден статус для новой заявки")
+            status_id = product_data.status_id or ProductService._default_status_id(db)
             
             # Подготавливаем данные для создания продукта
             # Используем id пользователя из bo.users (не tg_user_id!)
             product_dict = product_data.model_dump(exclude_unset=True)
             product_dict["status_id"] = status_id
             product_dict["supplier_user_id"] = user.id
+            _check_category_rules(db, product_data.category_id, product_dict)
             
             # Создаём заявку
             product = Product(**product_dict)
             db.add(product)
+            db.flush()
+            product_events.emit(db, [product_events.event_for(product_events.EVENT_CREATED, product)])
             db.commit()
-            db.refresh(product)
+            product_count_cache.clear()
+            # Без refresh: id есть после flush, строку с названиями статуса, категории
+            # и поставщика вызывающий код читает сам (AsyncProductService.create_product)
             
             supplier_name = None
             if supplier:
-                supplier_name = (
-                    supplier.custom_name
-                    or supplier.first_name
-                    or supplier.username
-                    or f"SupplierID:{supplier.id}"
-                )
+                supplier_name = supplier.name
             else:
                 supplier_name = (
                     user.first_name
@@ -212,6 +745,232 @@ class ProductService:
             logger.error(f"Ошибка при создании заявки: {e}")
             raise
     
+    @staticmethod
+    def create_products_bulk(
+        db: Session,
+        items: list[dict[str, Any]],
+        supplier_user_id: int,
+        supplier: Optional[SupplierPrincipal] = None,
+    ) -> list[BulkItemResult]:
+        """
+        Массовое создание заявок одного поставщика.
+        
+        Элементы проверяются по схеме ProductCreate, категории и статусы - одним
+        запросом на весь пакет. Корректные элементы вставляются многострочным
+        INSERT ... RETURNING в одной транзакции, некорректные пропускаются
+        с описанием ошибок.
+        
+        Args:
+            db: Сессия БД
+            items: Элементы в формате ProductCreate (supplier_user_id игнорируется)
+            supplier_user_id: ID пользователя поставщика (bo.users.id)
+            supplier: Поставщик, для логов
+        
+        Returns:
+            Результат по каждому элементу в порядке items
+        """
+        try:
+            results = [BulkItemResult(index=index) for index in range(len(items))]
+            
+            parsed, errors = _validate_items(items)
+            for index, messages in errors.items():
+                results[index].errors = messages
+            
+            if parsed:
+                if not db.query(UserAccount.id).filter(UserAccount.id == supplier_user_id).first():
+                    raise ValueError(f"Пользователь с ID {supplier_user_id} не найден в bo.users")
+                
+                category_ids = {data.category_id for data in parsed.values()}
+                known_categories = set(
+                    db.scalars(select(Category.id).where(Category.id.in_(category_ids)))
+                )
+                status_ids = {data.status_id for data in parsed.values() if data.status_id}
+                known_statuses = set()
+                if status_ids:
+                    known_statuses = set(db.scalars(
+                        select(Status.id).where(
+                            Status.id.in_(status_ids),
+                            Status.entity_type == "product",
+                        )
+                    ))
+                
+                default_status_id = None
+                validators = get_category_validators(db)
+                for index, data in list(parsed.items()):
+                    if data.category_id not in known_categories:
+                        results[index].errors.append(f"category_id: категория {data.category_id} не найдена")
+                    elif data.category_id in validators:
+                        results[index].errors.extend(validators[data.category_id].errors(data.model_dump()))
+                    if data.status_id and data.status_id not in known_statuses:
+                        results[index].errors.append(f"status_id: статус {data.status_id} не найден")
+                    if results[index].errors:
+                        del parsed[index]
+                    elif not data.status_id and default_status_id is None:
+                        default_status_id = ProductService._default_status_id(db)
+            
+            if parsed:
+                rows = []
+                for data in parsed.values():
+                    row = data.model_dump(include=set(BULK_INSERT_FIELDS))
+                    row["status_id"] = data.status_id or default_status_id
+                    row["supplier_user_id"] = supplier_user_id
+                    rows.append(row)
+                
+                ids = db.scalars(_bulk_insert, rows).all()
+                product_events.emit(db, [
+                    product_events.product_event(
+                        product_events.EVENT_CREATED,
+                        product_id,
+                        row["status_id"],
+                        row["category_id"],
+                        supplier_user_id,
+                    )
+                    for product_id, row in zip(ids, rows)
+                ])
+                db.commit()
+                product_count_cache.clear()
+                
+                for index, product_id in zip(parsed, ids):
+                    results[index].id = product_id
+            
+            supplier_name = supplier.name if supplier else f"UserID:{supplier_user_id}"
+            logger.info(
+                f"Массовое создание для {supplier_name}: создано {len(parsed)}, "
+                f"с ошибками {len(items) - len(parsed)}"
+            )
+            return results
+            
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Ошибка при массовом создании заявок: {e}")
+            raise
+    
+    @staticmethod
+    def transition_status_bulk(
+        db: Session,
+        product_ids: list[int],
+        status_id: int,
+        approved_by: Optional[int] = None,
+        supplier_user_id: Optional[int] = None,
+    ) -> list[TransitionResult]:
+        """
+        Переводит заявки в статус status_id по графу переходов (bo.statuses).
+        
+        Все разрешённые переходы выполняются одним UPDATE ... RETURNING: условие
+        "текущий статус - один из допустимых источников" проверяется в самом UPDATE,
+        поэтому параллельная смена статуса не приводит к запрещённому переходу.
+        Для остальных заявок причина определяется одним дополнительным SELECT.
+        
+        Args:
+            db: Сессия БД
+            product_ids: ID заявок (повторы игнорируются)
+            status_id: Целевой статус
+            approved_by: bo.users.id модератора, записывается при переходе в "approved"
+            supplier_user_id: Опциональный фильтр по пользователю (bo.users.id) для проверки прав
+        
+        Returns:
+            Результат по каждой заявке в порядке product_ids
+        
+        Raises:
+            PermissionError: Переход в "approved" без approved_by (не модератор)
+        """
+        try:
+            graph = get_status_graph(db)
+            target = graph.get(status_id)
+            if target is None or target.entity_type != "product":
+                raise ValueError(f"Статус {status_id} не найден")
+            if target.code == STATUS_APPROVED and approved_by is None:
+                raise PermissionError("Одобрять заявки может только модератор")
+            
+            ids = list(dict.fromkeys(product_ids))
+            sources = graph.sources_for(status_id)
+            
+            values = {"status_id": status_id}
+            # Кто и когда одобрил - сохраняется и при дальнейших переходах (published, archived ...)
+            if target.code == STATUS_APPROVED:
+                values.update(approved_by=approved_by, approved_at=func.now())
+            
+            scope = [Product.id.in_(ids)]
+            if supplier_user_id:
+                scope.append(Product.supplier_user_id == supplier_user_id)
+            
+            moved: dict[int, int] = {}
+            if sources:
+                # Старые значения берутся из второго экземпляра таблицы (снимок до UPDATE)
+                products = Product.__table__
+                previous = products.alias("previous")
+                stmt = (
+                    update(products)
+                    .where(*scope, Product.status_id.in_(sources), previous.c.id == products.c.id)
+                    .values(**values)
+                    .returning(
+                        products.c.id,
+                        previous.c.status_id.label("from_status_id"),
+                        products.c.category_id,
+                        products.c.supplier_user_id,
+                    )
+                )
+                moved_rows = db.execute(stmt).all()
+                moved = {row.id: row.from_status_id for row in moved_rows}
+                product_events.emit(db, [
+                    product_events.product_event(
+                        product_events.EVENT_UPDATED,
+                        row.id,
+                        status_id,
+                        row.category_id,
+                        row.supplier_user_id,
+                        previous_status_id=row.from_status_id,
+                    )
+                    for row in moved_rows
+                ])
+            
+            rest = [product_id for product_id in ids if product_id not in moved]
+            current: dict[int, int] = {}
+            if rest:
+                query = select(Product.id, Product.status_id).where(Product.id.in_(rest))
+                if supplier_user_id:
+                    query = query.where(Product.supplier_user_id == supplier_user_id)
+                current = dict(db.execute(query).all())
+            
+            db.commit()
+            if moved:
+                product_count_cache.clear()
+            
+            results = []
+            for product_id in ids:
+                if product_id in moved:
+                    results.append(TransitionResult(
+                        id=product_id, outcome=TRANSITION_UPDATED, from_status_id=moved[product_id]
+                    ))
+                elif product_id not in current:
+                    results.append(TransitionResult(
+                        id=product_id, outcome=TRANSITION_NOT_FOUND, detail="Заявка не найдена"
+                    ))
+                elif current[product_id] == status_id:
+                    results.append(TransitionResult(
+                        id=product_id, outcome=TRANSITION_UNCHANGED, from_status_id=status_id
+                    ))
+                else:
+                    source = graph.get(current[product_id])
+                    source_name = (source.code or source.id) if source else current[product_id]
+                    reason = " (статус финальный)" if source and source.is_final else ""
+                    results.append(TransitionResult(
+                        id=product_id,
+                        outcome=TRANSITION_FORBIDDEN,
+                        from_status_id=current[product_id],
+                        detail=f"Переход {source_name} -> {target.code or target.id} запрещён{reason}",
+                    ))
+            
+            logger.info(
+                f"Смена статуса на {target.code or target.id}: переведено {len(moved)} из {len(ids)} заявок"
+            )
+            return results
+            
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Ошибка при массовой смене статуса: {e}")
+            raise
+    
     @staticmethod
     def update_product(
         db: Session,
@@ -244,11 +1003,23 @@ class ProductService:
                 return None
             
             # Обновляем поля
+            previous_status_id = product.status_id
             update_data = product_data.model_dump(exclude_unset=True)
             for field, value in update_data.items():
                 setattr(product, field, value)
             
+            _check_category_rules(
+                db,
+                product.category_id,
+                {name: getattr(product, name) for name in ProductCreate.model_fields if hasattr(product, name)},
+                changed=set(update_data),
+            )
+            
+            product_events.emit(db, [
+                product_events.event_for(product_events.EVENT_UPDATED, product, previous_status_id)
+            ])
             db.commit()
+            product_count_cache.clear()
             db.refresh(product)
             
             logger.info(f"Заявка {product_id} обновлена")
@@ -288,8 +1059,10 @@ class ProductService:
                 logger.warning(f"Заявка {product_id} не найдена для удаления")
                 return False
             
+            product_events.emit(db, [product_events.event_for(product_events.EVENT_DELETED, product)])
             db.delete(product)
             db.commit()
+            product_count_cache.clear()
             
             logger.info(f"Заявка {product_id} удалена")
             return True
@@ -0,0 +1,211 @@
+"""
+Суточные итоги по заявкам (bo.product_daily_stats) и их фоновый пересчёт.
+
+Итоги по (день создания, категория, статус): количество и сумма цен.
+Пересчёт инкрементальный: берутся только дни, в которых есть заявки с
+updated_at позже водяного знака (bo.rollup_watermarks), плюс дни удалённых
+заявок (bo.product_daily_stats_dirty, заполняется триггером). Каждый такой день
+пересчитывается целиком по bo.products - это идемпотентно, поэтому окно
+перекрытия STATS_ROLLUP_OVERLAP безопасно и подбирает транзакции, которые
+начались до прошлого пересчёта, а зафиксировались после него.
+Соседние дни объединяются в диапазоны created_at, их выборку обслуживает
+BRIN-индекс ix_products_created_at_brin.
+"""
+import asyncio
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import BigInteger, Date, and_, cast, delete, func, insert, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.product import Product
+from app.models.product_stats import ProductDailyStat, ProductDailyStatDirty, RollupWatermark
+
+ROLLUP_NAME = "product_daily_stats"
+
+GROUP_BY_DAY = "day"
+GROUP_BY_CATEGORY = "category"
+GROUP_BY_STATUS = "status"
+GROUP_BY_COLUMNS = {
+    GROUP_BY_DAY: (),
+    GROUP_BY_CATEGORY: (ProductDailyStat.category_id,),
+    GROUP_BY_STATUS: (ProductDailyStat.status_id,),
+}
+
+
+def _day_ranges(days: list[date]) -> list[tuple[date, date]]:
+    """Отсортированные дни -> диапазоны [начало, конец) из подряд идущих дней"""
+    ranges: list[tuple[date, date]] = []
+    for day in sorted(days):
+        if ranges and ranges[-1][1] == day:
+            ranges[-1] = (ranges[-1][0], day + timedelta(days=1))
+        else:
+            ranges.append((day, day + timedelta(days=1)))
+    return ranges
+
+
+class ProductStatsService:
+    """Сервис суточных итогов по заявкам"""
+
+    @staticmethod
+    def refresh(db: Session) -> Optional[int]:
+        """
+        Пересчитывает итоги за изменённые дни и сдвигает водяной знак.
+        Без водяного знака (первый запуск) пересчитываются все дни.
+
+        Returns:
+            Количество пересчитанных дней или None, если пересчёт уже выполняет другой воркер
+        """
+        # Один пересчёт на все воркеры: блокировка снимается вместе с транзакцией
+        locked = db.scalar(select(func.pg_try_advisory_xact_lock(func.hashtext(ROLLUP_NAME))))
+        if not locked:
+            return None
+        started = db.scalar(select(func.now()))
+        watermark = db.scalar(select(RollupWatermark.watermark).where(RollupWatermark.name == ROLLUP_NAME))
+
+        day_column = cast(Product.created_at, Date)
+        deleted_days = set(db.scalars(delete(ProductDailyStatDirty).returning(ProductDailyStatDirty.day)))
+        if watermark is None:
+            condition = None
+            db.execute(delete(ProductDailyStat))
+            days = None
+        else:
+            since = watermark - timedelta(seconds=settings.STATS_ROLLUP_OVERLAP)
+            changed_days = set(db.scalars(select(day_column).where(Product.updated_at > since).distinct()))
+            days = sorted(changed_days | deleted_days)
+            if days:
+                condition = or_(*(
+                    and_(Product.created_at >= start, Product.created_at < end)
+                    for start, end in _day_ranges(days)
+                ))
+                db.execute(delete(ProductDailyStat).where(ProductDailyStat.day.in_(days)))
+
+        if days is None or days:
+            rollup = select(
+                day_column,
+                Product.category_id,
+                Product.status_id,
+                func.count(),
+                func.coalesce(func.sum(Product.price_rub), 0),
+            ).group_by(day_column, Product.category_id, Product.status_id)
+            if condition is not None:
+                rollup = rollup.where(condition)
+            result = db.execute(
+                insert(ProductDailyStat)
+                .from_select(["day", "category_id", "status_id", "products_count", "price_sum"], rollup)
+                .returning(ProductDailyStat.day)
+            )
+            if days is None:
+                days = set(result.scalars())
+
+        db.execute(
+            pg_insert(RollupWatermark)
+            .values(name=ROLLUP_NAME, watermark=started, refreshed_at=func.now())
+            .on_conflict_do_update(
+                index_elements=[RollupWatermark.name],
+                set_={"watermark": started, "refreshed_at": func.now()},
+            )
+        )
+        db.commit()
+        return len(days)
+
+    @staticmethod
+    async def get_watermark(db: AsyncSession) -> Optional[datetime]:
+        """Момент, по который учтены изменения заявок (None - итоги ещё не считались)"""
+        return await db.scalar(
+            select(RollupWatermark.watermark).where(RollupWatermark.name == ROLLUP_NAME)
+        )
+
+    @staticmethod
+    async def get_timeseries(
+        db: AsyncSession,
+        date_from: date,
+        date_to: date,
+        group_by: str = GROUP_BY_DAY,
+        category_id: Optional[int] = None,
+        status_id: Optional[int] = None,
+    ) -> list[Row]:
+        """
+        Ряд по дням из bo.product_daily_stats.
+
+        Args:
+            db: Асинхронная сессия БД
+            date_from: Первый день (включительно)
+            date_to: Последний день (включительно)
+            group_by: day - итог за день, category/status - отдельная точка на каждую категорию/статус
+            category_id: Фильтр по ID категории
+            status_id: Фильтр по ID статуса
+
+        Returns:
+            Строки (day, [category_id | status_id], count, avg_price) в порядке дней; дни без заявок пропускаются
+        """
+        if group_by not in GROUP_BY_COLUMNS:
+            raise ValueError(f"Недопустимая группировка: {group_by}")
+        keys = GROUP_BY_COLUMNS[group_by]
+        products_count = cast(func.sum(ProductDailyStat.products_count), BigInteger)
+        statement = (
+            select(
+                ProductDailyStat.day,
+                *keys,
+                products_count.label("count"),
+                func.round(func.sum(ProductDailyStat.price_sum) / products_count, 2).label("avg_price"),
+            )
+            .where(ProductDailyStat.day >= date_from, ProductDailyStat.day <= date_to)
+            .group_by(ProductDailyStat.day, *keys)
+            .having(products_count > 0)
+            .order_by(ProductDailyStat.day, *keys)
+        )
+        if category_id:
+            statement = statement.where(ProductDailyStat.category_id == category_id)
+        if status_id:
+            statement = statement.where(ProductDailyStat.status_id == status_id)
+        return (await db.execute(statement)).all()
+
+
+class ProductStatsRefresher:
+    """Фоновая задача: пересчёт итогов раз в STATS_ROLLUP_INTERVAL секунд"""
+
+    def __init__(self, interval: Optional[float] = None):
+        self._interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    @staticmethod
+    def refresh_once() -> Optional[int]:
+        """Один пересчёт в отдельной синхронной сессии (выполняется в потоке)"""
+        with SessionLocal() as db:
+            return ProductStatsService.refresh(db)
+
+    async def start(self) -> None:
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Ждёт окончания текущего пересчёта, новый не начинается"""
+        if self._task is not None:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+    async def _run(self) -> None:
+        interval = self._interval or settings.STATS_ROLLUP_INTERVAL
+        while not self._stopping.is_set():
+            try:
+                days = await asyncio.to_thread(self.refresh_once)
+                if days:
+                    logger.info(f"Суточные итоги по заявкам пересчитаны за {days} дн.")
+            except Exception as e:
+                logger.error(f"Ошибка пересчёта суточных итогов по заявкам: {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+product_stats_refresher = ProductStatsRefresher()
@@ -0,0 +1,122 @@
+"""
+Справочные данные в памяти воркера: категории, статусы и построенные из них
+граф переходов и правила проверки атрибутов.
+
+Значения живут долго (REFERENCE_CACHE_TTL): актуальность обеспечивает
+LISTEN/NOTIFY (app/services/reference_listener.py) - триггеры на справочных
+таблицах сообщают об изменениях, и каждый воркер сразу сбрасывает свою копию.
+Пока слушатель не подключён, действует короткий REFERENCE_CACHE_FALLBACK_TTL.
+"""
+import threading
+import time
+from typing import Any, Optional
+
+from loguru import logger
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.category import Category
+from app.models.status import Status
+from app.schemas.category import CategoryResponse
+
+
+class ReferenceValue:
+    """
+    Потокобезопасное значение с TTL и поколением.
+
+    Загрузка идёт вне блокировки, поэтому set принимает поколение, прочитанное
+    до загрузки: если за это время пришла инвалидация, устаревший результат не сохраняется.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float):
+        self.name = name
+        self.ttl = ttl_seconds
+        self._value: Any = None
+        self._valid = False
+        self._loaded_at = 0.0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self) -> Optional[Any]:
+        """Значение, если оно загружено и не устарело"""
+        with self._lock:
+            if not self._valid or time.monotonic() - self._loaded_at >= self.ttl:
+                return None
+            return self._value
+
+    def get_stale(self) -> Optional[Any]:
+        """Последнее загруженное значение, даже устаревшее (запасной вариант при ошибке БД)"""
+        with self._lock:
+            return self._value
+
+    def set(self, value: Any, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._value = value
+            self._valid = True
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._valid = False
+
+
+categories_cache = ReferenceValue("categories", settings.REFERENCE_CACHE_FALLBACK_TTL)
+statuses_cache = ReferenceValue("statuses", settings.REFERENCE_CACHE_FALLBACK_TTL)
+status_graph_cache = ReferenceValue("status_graph", settings.REFERENCE_CACHE_FALLBACK_TTL)
+category_validators_cache = ReferenceValue("category_validators", settings.REFERENCE_CACHE_FALLBACK_TTL)
+
+REFERENCE_VALUES = (categories_cache, statuses_cache, status_graph_cache, category_validators_cache)
+
+
+async def get_categories(db: AsyncSession) -> list[dict]:
+    """
+    Все категории (id, code, name, required_fields), отсортированы по id.
+    Строки проверяются по CategoryResponse: категория с некорректными данными
+    пропускается с ошибкой в логе, а не ломает весь справочник.
+    """
+    cached = categories_cache.get()
+    if cached is not None:
+        return cached
+    generation = categories_cache.generation
+    result = await db.execute(
+        select(Category.id, Category.code, Category.name, Category.required_fields).order_by(Category.id)
+    )
+    categories = []
+    for row in result:
+        try:
+            categories.append(CategoryResponse.model_validate(dict(row._mapping)).model_dump())
+        except ValidationError as e:
+            logger.error(f"Ошибка преобразования категории {row.id}: {e}, данные: {dict(row._mapping)}")
+    categories_cache.set(categories, generation)
+    return categories
+
+
+async def get_statuses(db: AsyncSession) -> list[dict]:
+    """Все статусы всех сущностей в порядке order_index, id"""
+    cached = statuses_cache.get()
+    if cached is not None:
+        return cached
+    generation = statuses_cache.generation
+    result = await db.execute(
+        select(
+            Status.id,
+            Status.entity_type,
+            Status.code,
+            Status.name,
+            Status.color,
+            Status.order_index,
+            Status.is_final,
+        ).order_by(Status.order_index.asc().nullslast(), Status.id)
+    )
+    statuses = [dict(row._mapping) for row in result]
+    statuses_cache.set(statuses, generation)
+    return statuses
@@ -0,0 +1,199 @@
+"""
+Слушатель уведомлений об изменении справочных данных (LISTEN/NOTIFY).
+
+Каждый воркер держит одно отдельное соединение asyncpg (не из пула) и слушает
+канал REFERENCE_CHANNEL, в который пишут триггеры из миграции
+004_reference_notify.sql. По уведомлению сбрасываются кэши категорий и их
+правил проверки, статусов и авторизации по токену. Через то же соединение приходят события заявок
+(PRODUCT_EVENTS_CHANNEL), они передаются в product_broadcaster. Пока соединение живо и
+триггеры 004 установлены, справочники работают с длинным TTL; кэш авторизации всегда
+живёт AUTH_CACHE_TTL (смена токена или роли не по ORM может не дойти уведомлением).
+При потере соединения все кэши сбрасываются (уведомления могли быть пропущены),
+TTL возвращается к короткому, а слушатель переподключается.
+"""
+import asyncio
+import json
+from typing import Optional
+
+import asyncpg
+from loguru import logger
+from sqlalchemy.engine import make_url
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.services.auth_cache import principal_cache
+from app.services.product_events import PRODUCT_EVENTS_CHANNEL, product_broadcaster
+from app.services.reference_cache import (
+    REFERENCE_VALUES,
+    categories_cache,
+    category_validators_cache,
+    get_categories,
+    get_statuses,
+    status_graph_cache,
+    statuses_cache,
+)
+from app.services.category_validation import get_category_validators
+from app.services.status_graph import get_status_graph
+
+REFERENCE_CHANNEL = "sliv_reference"
+KEEPALIVE_INTERVAL = 30  # Сек между проверками соединения
+RECONNECT_DELAY_MAX = 60  # Сек, максимальная пауза между попытками подключения
+STARTUP_TIMEOUT = 10  # Сек ожидания первого подключения и прогрева при старте
+# Триггеры 004_reference_notify.sql, без которых изменения справочников не уведомляются
+REFERENCE_TRIGGERS = ("trg_categories_notify_reference", "trg_statuses_notify_reference")
+
+
+def _listener_dsn() -> str:
+    """DSN для asyncpg из DATABASE_URL (без указания драйвера SQLAlchemy)"""
+    url = make_url(settings.DATABASE_URL).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+def _set_live(live: bool) -> None:
+    """Длинный TTL справочников, пока уведомления доходят, короткий - пока нет"""
+    ttl = settings.REFERENCE_CACHE_TTL if live else settings.REFERENCE_CACHE_FALLBACK_TTL
+    for value in REFERENCE_VALUES:
+        value.ttl = ttl
+
+
+async def notify_triggers_installed(connection: asyncpg.Connection) -> bool:
+    """Установлены ли триггеры уведомлений справочников (миграция 004)"""
+    found = await connection.fetchval(
+        """
+        SELECT count(*)
+        FROM pg_trigger t
+        JOIN pg_class c ON c.oid = t.tgrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'bo' AND t.tgname = ANY($1::text[]) AND t.tgenabled <> 'D'
+        """,
+        list(REFERENCE_TRIGGERS),
+    )
+    return found == len(REFERENCE_TRIGGERS)
+
+
+def invalidate_all() -> None:
+    """Сбрасывает все справочные кэши"""
+    for value in REFERENCE_VALUES:
+        value.invalidate()
+    principal_cache.clear()
+
+
+def handle_notification(payload: str) -> None:
+    """Сбрасывает кэши, затронутые изменением из уведомления"""
+    try:
+        change = json.loads(payload)
+        table = change["table"]
+    except (ValueError, KeyError, TypeError):
+        logger.warning(f"Некорректное уведомление справочника: {payload!r}, сбрасываю все кэши")
+        invalidate_all()
+        return
+
+    if table == "categories":
+        categories_cache.invalidate()
+        category_validators_cache.invalidate()
+    elif table == "statuses":
+        statuses_cache.invalidate()
+        status_graph_cache.invalidate()
+    elif table == "suppliers":
+        if change.get("id") is None:
+            principal_cache.clear()
+        else:
+            principal_cache.invalidate_supplier(change["id"])
+    elif table == "users":
+        for key in ("tg_user_id", "old_tg_user_id"):
+            if change.get(key) is not None:
+                principal_cache.invalidate_tg_user(change[key])
+    else:
+        invalidate_all()
+    logger.info(f"Справочник {table} изменён ({change.get('op')}), кэш сброшен")
+
+
+async def warm_reference_data() -> None:
+    """Загружает категории, статусы, граф переходов и правила категорий в кэш"""
+    async with AsyncSessionLocal() as db:
+        await get_categories(db)
+        await get_statuses(db)
+        await db.run_sync(get_status_graph)
+        await db.run_sync(get_category_validators)
+
+
+class ReferenceListener:
+    """Фоновая задача: LISTEN с переподключением и прогревом кэшей"""
+
+    def __init__(self, dsn: Optional[str] = None, channel: str = REFERENCE_CHANNEL):
+        self._dsn = dsn
+        self._channel = channel
+        self._task: Optional[asyncio.Task] = None
+        self._connection: Optional[asyncpg.Connection] = None
+        self._ready = asyncio.Event()
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        handle_notification(payload)
+
+    def _on_product_event(self, connection, pid, channel, payload) -> None:
+        product_broadcaster.publish_payload(payload)
+
+    async def start(self) -> None:
+        """Запускает слушателя и ждёт первого подключения (не дольше STARTUP_TIMEOUT)"""
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._ready.wait(), STARTUP_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Слушатель справочников не подключился при старте, кэши работают с коротким TTL")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        delay = 1
+        while True:
+            try:
+                self._connection = await asyncpg.connect(self._dsn or _listener_dsn())
+                await self._connection.add_listener(self._channel, self._on_notify)
+                await self._connection.add_listener(PRODUCT_EVENTS_CHANNEL, self._on_product_event)
+                # Уведомления до подключения могли быть пропущены
+                invalidate_all()
+                if await notify_triggers_installed(self._connection):
+                    _set_live(True)
+                else:
+                    logger.warning(
+                        "Триггеры уведомлений справочников не найдены (миграция 004_reference_notify), "
+                        "кэши справочников работают с коротким TTL"
+                    )
+                product_broadcaster.relayed = True
+                product_broadcaster.resync()
+                logger.info(f"Слушатель справочников подключён (канал {self._channel})")
+                try:
+                    await warm_reference_data()
+                except Exception as e:
+                    logger.error(f"Ошибка прогрева справочников: {e}")
+                self._ready.set()
+                delay = 1
+                while True:
+                    await asyncio.sleep(KEEPALIVE_INTERVAL)
+                    await self._connection.fetchval("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Слушатель справочников отключён: {e}. Повтор через {delay} с")
+            finally:
+                _set_live(False)
+                product_broadcaster.relayed = False
+                if self._connection is not None and not self._connection.is_closed():
+                    await self._connection.close()
+                self._connection = None
+            # Без уведомлений содержимое кэшей могло устареть
+            invalidate_all()
+            self._ready.set()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_DELAY_MAX)
+
+
+reference_listener = ReferenceListener()
@@ -0,0 +1,60 @@
+"""
+Поиск по заявкам: полнотекстовый (tsvector + GIN, конфигурация russian)
+и прежний ilike по подстроке.
+"""
+from sqlalchemy import func, or_
+
+from app.config import settings
+from app.models.product import Product
+
+SEARCH_CONFIG = "russian"
+HEADLINE_OPTIONS = "StartSel=<b>, StopSel=</b>, MaxWords=30, MinWords=10, MaxFragments=2"
+
+SEARCH_MODE_FTS = "fts"
+SEARCH_MODE_ILIKE = "ilike"
+
+
+def fts_query(term: str):
+    """tsquery из пользовательской строки (синтаксис как у поисковиков: "фраза", -слово, or)"""
+    return func.websearch_to_tsquery(SEARCH_CONFIG, term)
+
+
+def fts_filter(term: str):
+    """Условие совпадения, обслуживается GIN-индексом ix_products_search_vector"""
+    return Product.search_vector.op("@@")(fts_query(term))
+
+
+def fts_rank(term: str):
+    """Релевантность (ts_rank_cd) для сортировки sort=relevance"""
+    return func.ts_rank_cd(Product.search_vector, fts_query(term))
+
+
+def fts_headline(term: str, column=Product.description):
+    """Фрагмент описания с подсвеченными совпадениями"""
+    return func.ts_headline(
+        SEARCH_CONFIG,
+        func.coalesce(column, ""),
+        fts_query(term),
+        HEADLINE_OPTIONS,
+    )
+
+
+def ilike_filter(term: str):
+    """Поиск подстроки без индекса (последовательное сканирование)"""
+    search_pattern = f"%{term}%"
+    return or_(
+        Product.source_url.ilike(search_pattern),
+        Product.description.ilike(search_pattern),
+        Product.composition.ilike(search_pattern),
+    )
+
+
+def is_fts_enabled() -> bool:
+    return settings.PRODUCT_SEARCH_MODE == SEARCH_MODE_FTS
+
+
+def search_filter(term: str):
+    """Условие поиска в режиме из настроек PRODUCT_SEARCH_MODE"""
+    if is_fts_enabled():
+        return fts_filter(term)
+    return ilike_filter(term)
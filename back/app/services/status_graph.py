@@ -0,0 +1,103 @@
+"""
+Граф переходов между статусами заявок.
+
+Строится из bo.statuses (can_transition_to, is_final) и хранится в памяти воркера
+вместе с остальными справочными данными (reference_cache). Правила:
+- из финального статуса (is_final) переходов нет;
+- can_transition_to = NULL - переход в любой статус той же сущности;
+- can_transition_to = список id или кодов статусов - только в них.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.status import Status
+from app.services.reference_cache import status_graph_cache
+
+
+@dataclass(frozen=True)
+class StatusNode:
+    id: int
+    code: Optional[str]
+    name: Optional[str]
+    entity_type: Optional[str]
+    is_final: bool
+    targets: Optional[frozenset[int]]  # None - без ограничений
+
+
+class StatusGraph:
+    """Неизменяемый граф переходов, построенный из строк bo.statuses"""
+
+    def __init__(self, statuses: list[Status]):
+        ids_by_code = {(s.entity_type, s.code): s.id for s in statuses if s.code}
+        nodes = {}
+        for s in statuses:
+            targets = None
+            if s.can_transition_to is not None:
+                targets = frozenset(
+                    self._resolve_target(ref, s.entity_type, ids_by_code)
+                    for ref in _as_list(s.can_transition_to)
+                ) - {None}
+            nodes[s.id] = StatusNode(
+                id=s.id,
+                code=s.code,
+                name=s.name,
+                entity_type=s.entity_type,
+                is_final=bool(s.is_final),
+                targets=targets,
+            )
+        self.nodes: dict[int, StatusNode] = nodes
+
+    @staticmethod
+    def _resolve_target(ref, entity_type, ids_by_code) -> Optional[int]:
+        if isinstance(ref, bool):
+            return None
+        if isinstance(ref, int):
+            return ref
+        if isinstance(ref, str):
+            if ref.isdigit():
+                return int(ref)
+            return ids_by_code.get((entity_type, ref))
+        return None
+
+    def get(self, status_id: int) -> Optional[StatusNode]:
+        return self.nodes.get(status_id)
+
+    def can_transition(self, source_id: int, target_id: int) -> bool:
+        """Разрешён ли переход source -> target"""
+        source = self.nodes.get(source_id)
+        target = self.nodes.get(target_id)
+        if source is None or target is None or source.is_final:
+            return False
+        if source.entity_type != target.entity_type:
+            return False
+        return source.targets is None or target_id in source.targets
+
+    def sources_for(self, target_id: int) -> frozenset[int]:
+        """Статусы, из которых разрешён переход в target"""
+        return frozenset(
+            source_id for source_id in self.nodes
+            if source_id != target_id and self.can_transition(source_id, target_id)
+        )
+
+
+def _as_list(value) -> list:
+    """can_transition_to: список, одиночное значение или объект {"to": [...]}"""
+    if isinstance(value, dict):
+        value = value.get("to", value.get("targets", []))
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def get_status_graph(db: Session) -> StatusGraph:
+    """Граф переходов из кэша или из bo.statuses"""
+    graph = status_graph_cache.get()
+    if graph is not None:
+        return graph
+    generation = status_graph_cache.generation
+    graph = StatusGraph(list(db.scalars(select(Status))))
+    status_graph_cache.set(graph, generation)
+    return graph
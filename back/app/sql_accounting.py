@@ -0,0 +1,174 @@
+"""
+Учёт SQL в рамках HTTP-запроса: количество, время, медленные и повторяющиеся запросы.
+
+SQLAccountingMiddleware создаёт на каждый HTTP-запрос объект RequestSQLStats
+(ContextVar, виден и в run_sync/to_thread), события движка
+before/after_cursor_execute добавляют в него каждый SQL-запрос. Дальше:
+- запрос дольше SQL_SLOW_QUERY_MS пишется в лог с формой параметров
+  (имена и типы, без значений);
+- одинаковый текст SQL, выполненный за HTTP-запрос SQL_REPEAT_THRESHOLD раз и больше, -
+  предупреждение о вероятном N+1 (ленивая загрузка связи в цикле);
+- маршрут может объявить бюджет (dependencies=[query_budget(N)]); превышение пишется в лог,
+  а при SQL_QUERY_BUDGET_MODE=raise (тесты) - исключение QueryBudgetExceeded. Оно
+  проверяется до начала ответа, поэтому клиент получает 500, а не уже отправленный 200
+  (SQL после начала потокового ответа проверяется по его окончании).
+"""
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from fastapi import Depends
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+BUDGET_OFF = "off"
+BUDGET_LOG = "log"
+BUDGET_RAISE = "raise"
+
+# Длина текста SQL в сообщениях лога
+STATEMENT_LOG_LENGTH = 2000
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Маршрут выполнил больше SQL-запросов, чем объявил (SQL_QUERY_BUDGET_MODE=raise)"""
+
+
+class RequestSQLStats:
+    """SQL одного HTTP-запроса"""
+    __slots__ = ("scope", "queries", "duration", "statements", "budget")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.scope = scope
+        self.queries = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+        self.budget: Optional[int] = None
+
+    @property
+    def route(self) -> str:
+        """Шаблон маршрута (/api/v1/products/{product_id}); до роутинга - путь запроса"""
+        if not self.scope:
+            return "-"
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope.get("path", "-")
+
+
+request_sql_stats: ContextVar[Optional[RequestSQLStats]] = ContextVar("request_sql_stats", default=None)
+
+
+def parameter_shape(parameters: Any, executemany: bool = False) -> str:
+    """Форма bind-параметров без значений: {'product_id_1': int} / (int, str) / 100 x (...)"""
+    if executemany and isinstance(parameters, (list, tuple)) and parameters:
+        return f"{len(parameters)} x {parameter_shape(parameters[0])}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def _statement_for_log(statement: str) -> str:
+    statement = " ".join(statement.split())
+    if len(statement) > STATEMENT_LOG_LENGTH:
+        return statement[:STATEMENT_LOG_LENGTH] + "..."
+    return statement
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Подписывает учёт на события движка (для async - передать engine.sync_engine)"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("sql_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["sql_started"].pop()
+        stats = request_sql_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.duration += elapsed
+            stats.statements[statement] += 1
+        slow_ms = settings.SQL_SLOW_QUERY_MS
+        if slow_ms and elapsed * 1000 >= slow_ms:
+            route = stats.route if stats is not None else "фоновая задача"
+            logger.warning(
+                f"Медленный SQL ({elapsed * 1000:.0f} мс, {route}): {_statement_for_log(statement)} "
+                f"| параметры: {parameter_shape(parameters, executemany)}"
+            )
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # Упавший запрос не доходит до after_cursor_execute
+        started = context.connection.info.get("sql_started") if context.connection else None
+        if started:
+            started.pop()
+
+
+def query_budget(limit: int):
+    """Бюджет SQL-запросов маршрута: @router.get(..., dependencies=[query_budget(3)])"""
+
+    async def declare_budget() -> None:
+        stats = request_sql_stats.get()
+        if stats is not None:
+            stats.budget = limit
+
+    return Depends(declare_budget)
+
+
+def check_request(stats: RequestSQLStats) -> None:
+    """Проверки по окончании HTTP-запроса: повторяющийся SQL и бюджет маршрута"""
+    threshold = settings.SQL_REPEAT_THRESHOLD
+    if threshold:
+        for statement, count in stats.statements.items():
+            if count >= threshold:
+                logger.warning(
+                    f"Одинаковый SQL выполнен {count} раз за запрос {stats.route} (возможен N+1): "
+                    f"{_statement_for_log(statement)}"
+                )
+
+    check_budget(stats)
+
+
+def check_budget(stats: RequestSQLStats) -> None:
+    """Бюджет маршрута: превышение - в лог или QueryBudgetExceeded (SQL_QUERY_BUDGET_MODE)"""
+    mode = settings.SQL_QUERY_BUDGET_MODE
+    if stats.budget is None or stats.queries <= stats.budget or mode == BUDGET_OFF:
+        return
+    message = f"{stats.route}: {stats.queries} SQL-запросов при бюджете {stats.budget}"
+    if mode == BUDGET_RAISE:
+        details = "\n".join(
+            f"  {count} x {_statement_for_log(statement)[:200]}" for statement, count in stats.statements.most_common()
+        )
+        raise QueryBudgetExceeded(f"{message}\n{details}")
+    logger.warning(f"Превышен бюджет SQL-запросов {message}")
+
+
+class SQLAccountingMiddleware:
+    """ASGI-middleware: объект учёта SQL на каждый HTTP-запрос"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestSQLStats(scope)
+        token = request_sql_stats.set(stats)
+
+        async def send_checked(message):
+            if message["type"] == "http.response.start" and settings.SQL_QUERY_BUDGET_MODE == BUDGET_RAISE:
+                # Исключение до отправки заголовков ServerErrorMiddleware превращает в ответ 500
+                check_budget(stats)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_checked)
+        finally:
+            request_sql_stats.reset(token)
+        check_request(stats)
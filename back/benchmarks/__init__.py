@@ -0,0 +1,3 @@
+"""
+Бенчмарки backend (запускать против локальной БД, не против боевой)
+"""
@@ -0,0 +1,164 @@
+"""
+Фильтры по атрибутам заявок (attr.<ключ>=<значение> -> attributes @> ...) по мере роста таблицы.
+
+Для каждого размера из --sizes добивает bo.products синтетическими заявками
+с атрибутами, выполняет ANALYZE и замеряет запросы с фильтрами: страницу
+из 20 строк и подсчёт совпадений. Для селективных фильтров проверяется, что
+план использует GIN-индекс ix_products_attributes (jsonb_path_ops); если на
+каком-то размере план ушёл в последовательное сканирование, скрипт завершается
+с кодом 1.
+
+ВНИМАНИЕ: скрипт пишет в БД. Запускать только против локальной/тестовой базы
+с применёнными миграциями (006_products_attributes_gin.sql).
+
+Пример (из папки back):
+    python -m benchmarks.attribute_filter_benchmark --database-url postgresql://postgres@localhost/sliv_bench \
+        --sizes 100000 300000 1000000
+"""
+
+import argparse
+import statistics
+import sys
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.engine import Engine
+
+from app.database import Explain
+from app.models.product import Product
+from app.services.attribute_filter import attribute_filter, parse_attribute_filters
+from benchmarks.search_benchmark import ensure_schema, measure
+
+INDEX_NAME = "ix_products_attributes"
+
+MATERIALS = ["хлопок", "шёлк", "лён", "шерсть", "вискоза", "полиэстер", "кашемир", "кожа"]
+# Редкий материал (~0.1% строк) - селективный фильтр, который обязан идти по индексу
+RARE_MATERIAL = "альпака"
+
+SEED_BATCH = 100_000
+
+# (название, фильтры, обязателен ли индекс)
+CASES = [
+    ("редкое значение", [("attr.material", RARE_MATERIAL)], True),
+    ("два ключа", [("attr.material", RARE_MATERIAL), ("attr.size", "42")], True),
+    ("вложенный ключ", [("attr.dims.w", "7"), ("attr.material", RARE_MATERIAL)], True),
+    ("любое из значений", [("attr.material", RARE_MATERIAL), ("attr.material", "мохер")], True),
+    # Треть таблицы: планировщик вправе выбрать последовательное сканирование
+    ("частое значение", [("attr.material", MATERIALS[0])], False),
+]
+
+
+def seed_products(engine: Engine, rows: int) -> None:
+    """Добивает bo.products до rows строк заявками со случайными attributes"""
+    with engine.connect() as conn:
+        existing = conn.execute(text("SELECT count(*) FROM bo.products")).scalar()
+    materials = "ARRAY[" + ", ".join(f"'{m}'" for m in MATERIALS) + "]"
+    while existing < rows:
+        batch = min(SEED_BATCH, rows - existing)
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"""
+                INSERT INTO bo.products
+                    (supplier_user_id, category_id, status_id, source_url, price_rub,
+                     description, attributes, created_at, updated_at)
+                SELECT
+                    1 + (random() * 99)::int,
+                    1 + (random() * 19)::int,
+                    1 + (random() * 2)::int,
+                    'https://shop.example/attr/' || g,
+                    round((random() * 20000)::numeric, 2),
+                    'Заявка ' || g,
+                    jsonb_build_object(
+                        'material', CASE WHEN g % 1000 = 0 THEN '{RARE_MATERIAL}'
+                                         WHEN g % 3 = 0 THEN '{MATERIALS[0]}'
+                                         ELSE ({materials})[1 + (random() * {len(MATERIALS) - 1})::int] END,
+                        'size', 36 + (random() * 14)::int,
+                        'dims', jsonb_build_object('w', (random() * 50)::int, 'h', (random() * 50)::int)
+                    ),
+                    now() - random() * interval '365 days',
+                    now()
+                FROM generate_series(:start, :stop) g
+                """
+            ), {"start": existing + 1, "stop": existing + batch})
+        existing += batch
+        print(f"  засеяно {existing} / {rows}")
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE bo.products"))
+
+
+def plan_info(engine: Engine, statement) -> tuple[str, bool]:
+    """Узлы сканирования плана и признак использования INDEX_NAME"""
+    with engine.connect() as conn:
+        plan = conn.execute(Explain(statement)).scalar()
+    nodes = set()
+    uses_index = False
+
+    def walk(node):
+        nonlocal uses_index
+        if "Scan" in node["Node Type"]:
+            nodes.add(node["Node Type"])
+        if node.get("Index Name") == INDEX_NAME:
+            uses_index = True
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return ", ".join(sorted(nodes)), uses_index
+
+
+def build_statements(params: list[tuple[str, str]]) -> list:
+    condition = attribute_filter(parse_attribute_filters(params))
+    return [
+        # Как первая страница списка по умолчанию: total считается в том же запросе
+        (
+            "page",
+            select(Product.id, func.count().over())
+            .where(condition)
+            .order_by(Product.created_at.desc(), Product.id.desc())
+            .limit(20),
+        ),
+        ("count", select(func.count()).select_from(Product).where(condition)),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк фильтров по атрибутам (JSONB @> + GIN)")
+    parser.add_argument("--database-url", required=True, help="URL локальной тестовой БД")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100_000, 300_000, 1_000_000],
+        help="Размеры bo.products по возрастанию",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Повторов на каждый запрос")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    ensure_schema(engine)
+    failures = []
+    for size in sorted(args.sizes):
+        print(f"\nПодготовка данных ({size} строк)...")
+        seed_products(engine, size)
+        print(f"{'строк':>9} {'фильтр':<20} {'запрос':<6} {'median, мс':>11} {'p95, мс':>9}  план")
+        print("-" * 100)
+        for name, params, index_required in CASES:
+            for kind, statement in build_statements(params):
+                timings = sorted(measure(engine, statement, args.repeat))
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                nodes, uses_index = plan_info(engine, statement)
+                mark = ""
+                if index_required and not uses_index:
+                    mark = "  <- без индекса"
+                    failures.append(f"{size}: {name} ({kind})")
+                print(
+                    f"{size:>9} {name:<20} {kind:<6} {statistics.median(timings):>11.1f} "
+                    f"{p95:>9.1f}  {nodes}{mark}"
+                )
+
+    if failures:
+        print("\nСелективные фильтры выполнены без индекса " + INDEX_NAME + ":")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"\nВсе селективные фильтры используют {INDEX_NAME}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Синхронная сессия внутри async-роутов vs AsyncSession (asyncpg) под конкурентной нагрузкой.
+
+Моделирует один воркер uvicorn: запросы приходят с постоянной частотой (--rate)
+независимо от того, свободен ли воркер, и в одном event loop параллельно
+выполняются быстрые (заявка по ID) и медленные (список с поиском + искусственная
+задержка pg_sleep). Задержка считается от момента прихода запроса, т.е. включает
+ожидание в очереди. В режиме sync запросы выполняются так, как это делали роуты
+до перехода на AsyncSession: синхронный Session прямо в корутине, event loop
+стоит на время каждого запроса к БД.
+
+Скрипт только читает данные. Пример (из папки back):
+    python -m benchmarks.concurrency_benchmark --database-url postgresql://postgres@localhost/sliv_bench
+"""
+
+import argparse
+import asyncio
+import statistics
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import _async_database_url
+from app.models.product import Product
+from app.services.async_product_service import AsyncProductService
+from app.services.product_service import ProductService
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_sync_mode(session_factory, product_ids, args) -> dict:
+    def fast_request(product_id):
+        db = session_factory()
+        try:
+            ProductService.get_product_by_id(db, product_id=product_id)
+        finally:
+            db.close()
+
+    def slow_request():
+        db = session_factory()
+        try:
+            db.execute(text("SELECT pg_sleep(:s)"), {"s": args.slow_ms / 1000})
+            ProductService.get_products(db, search=args.search, page_size=20)
+        finally:
+            db.close()
+
+    async def handle(n, product_id):
+        # Как в прежних роутах: синхронный вызов прямо в async def
+        if n % args.slow_every == 0:
+            slow_request()
+        else:
+            fast_request(product_id)
+
+    return await drive(handle, product_ids, args)
+
+
+async def run_async_mode(session_factory, product_ids, args) -> dict:
+    async def handle(n, product_id):
+        async with session_factory() as db:
+            if n % args.slow_every == 0:
+                await db.execute(text("SELECT pg_sleep(:s)"), {"s": args.slow_ms / 1000})
+                await AsyncProductService.get_products(db, search=args.search, page_size=20)
+            else:
+                await AsyncProductService.get_product_by_id(db, product_id=product_id)
+
+    return await drive(handle, product_ids, args)
+
+
+async def drive(handle, product_ids, args) -> dict:
+    """Открытая модель нагрузки: requests запросов с частотой rate, не больше concurrency одновременно"""
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    fast, slow = [], []
+
+    async def one(n, arrival):
+        async with semaphore:
+            await handle(n, product_ids[n % len(product_ids)])
+        latency = (loop.time() - arrival) * 1000
+        (slow if n % args.slow_every == 0 else fast).append(latency)
+
+    started = loop.time()
+    tasks = []
+    for n in range(args.requests):
+        arrival = started + n / args.rate
+        delay = arrival - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(n, arrival)))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - started
+    return {
+        "rps": args.requests / elapsed,
+        "fast_p50": statistics.median(fast),
+        "fast_p95": percentile(fast, 0.95),
+        "fast_p99": percentile(fast, 0.99),
+        "slow_p50": statistics.median(slow) if slow else 0.0,
+    }
+
+
+async def main_async(args) -> None:
+    sync_engine = create_engine(args.database_url, pool_size=args.concurrency, max_overflow=0)
+    async_engine = create_async_engine(
+        _async_database_url(args.database_url), pool_size=args.concurrency, max_overflow=0
+    )
+    sync_factory = sessionmaker(bind=sync_engine, autoflush=False)
+    async_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+
+    with sync_engine.connect() as conn:
+        product_ids = list(conn.execute(select(Product.id).limit(1000)).scalars())
+    if not product_ids:
+        raise SystemExit("В bo.products нет данных")
+
+    results = {
+        "sync Session": await run_sync_mode(sync_factory, product_ids, args),
+        "AsyncSession": await run_async_mode(async_factory, product_ids, args),
+    }
+
+    print(
+        f"\nrate={args.rate} запр/с, запросов={args.requests}, concurrency={args.concurrency}, "
+        f"медленный каждый {args.slow_every}-й (+{args.slow_ms} мс)\n"
+    )
+    print(f"{'режим':<14} {'RPS':>8} {'fast p50':>9} {'fast p95':>9} {'fast p99':>9} {'slow p50':>9}")
+    print("-" * 64)
+    for name, r in results.items():
+        print(
+            f"{name:<14} {r['rps']:>8.1f} {r['fast_p50']:>9.1f} {r['fast_p95']:>9.1f} "
+            f"{r['fast_p99']:>9.1f} {r['slow_p50']:>9.1f}"
+        )
+    print("(время в мс)")
+
+    sync_engine.dispose()
+    await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк sync vs async доступа к БД")
+    parser.add_argument("--database-url", required=True, help="URL локальной тестовой БД")
+    parser.add_argument("--rate", type=float, default=30, help="Частота прихода запросов, запр/с")
+    parser.add_argument("--requests", type=int, default=500, help="Всего запросов")
+    parser.add_argument("--concurrency", type=int, default=10, help="Максимум одновременных запросов (размер пула)")
+    parser.add_argument("--slow-every", type=int, default=10, help="Каждый N-й запрос медленный")
+    parser.add_argument("--slow-ms", type=int, default=200, help="Задержка медленного запроса, мс")
+    parser.add_argument("--search", default="платье", help="Поисковый запрос медленного списка")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
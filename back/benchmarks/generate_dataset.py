@@ -0,0 +1,506 @@
+"""
+Генератор синтетических данных схемы bo для нагрузочных тестов и проверки индексов.
+
+Заполняет bo.users, bo.suppliers, bo.statuses, bo.categories и bo.products:
+- пользователи и поставщики с русскими именами, у поставщиков есть токены;
+- статусы заявок с графом переходов, категории одежды/обуви/аксессуаров;
+- заявки: распределение по поставщикам с тяжёлым хвостом (Zipf: несколько крупных
+  поставщиков дают большую часть заявок), русские описания, JSONB attributes,
+  created_at за --days дней с ростом потока к концу периода (created_at растёт
+  вместе с id, как в рабочей базе - на это рассчитан BRIN-индекс), статус
+  зависит от возраста заявки.
+
+Заявки грузятся через COPY блоками по CHUNK_SIZE строк в --workers процессов.
+Каждый блок генерируется своим ГСЧ от (seed, номер блока), id заявок задаются явно,
+поэтому при одинаковых --seed и --until данные совпадают строка в строку независимо
+от числа процессов. На время загрузки вторичные индексы bo.products удаляются и
+затем строятся заново параллельно (отключается флагом --keep-indexes). Триггеры
+остаются включёнными, поэтому счётчики bo.product_counters согласованы; суточные
+итоги пересчитываются целиком после загрузки.
+
+ВНИМАНИЕ: --truncate очищает bo.products, bo.users, bo.suppliers, bo.statuses и
+bo.categories. Запускать только против локальной/тестовой базы с применёнными миграциями.
+
+Пример (из папки back):
+    python -m benchmarks.generate_dataset --database-url postgresql://postgres@localhost/sliv_bench --products 10000000 --truncate
+"""
+
+import argparse
+import math
+import multiprocessing
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from io import StringIO
+from itertools import accumulate
+from typing import Optional
+
+import orjson
+from loguru import logger
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.services.product_stats import ProductStatsService
+import app.models  # noqa: F401  (регистрация всех моделей в metadata)
+
+CHUNK_SIZE = 100_000
+
+# Показатель Zipf для распределения заявок по поставщикам
+SUPPLIER_SKEW = 1.1
+
+# (id, code, name, color, is_final, can_transition_to)
+STATUSES = [
+    (1, "new", "Новая", "#1677ff", False, ["moderation", "rejected"]),
+    (2, "moderation", "На модерации", "#faad14", False, ["approved", "rejected"]),
+    (3, "approved", "Одобрена", "#52c41a", False, ["archived"]),
+    (4, "rejected", "Отклонена", "#ff4d4f", False, ["moderation"]),
+    (5, "archived", "В архиве", "#8c8c8c", True, []),
+]
+STATUS_IDS = {code: status_id for status_id, code, *_ in STATUSES}
+
+CLOTHES_SIZES = ["XS-XL", "S-XXL", "42-48", "44-52", "46-56", "One size"]
+SHOE_SIZES = ["35-40", "36-41", "39-45", "40-46"]
+
+# (код, название, вес в потоке заявок, товары, размеры, диапазон цен)
+CATEGORIES = [
+    ("dresses", "Платья", 14, ["платье", "сарафан"], CLOTHES_SIZES, (1500, 15000)),
+    ("blouses", "Блузки и рубашки", 10, ["блузка", "рубашка", "туника"], CLOTHES_SIZES, (900, 8000)),
+    ("tshirts", "Футболки и топы", 12, ["футболка", "топ", "лонгслив", "майка"], CLOTHES_SIZES, (400, 3500)),
+    ("knitwear", "Трикотаж", 7, ["свитер", "джемпер", "кардиган", "водолазка"], CLOTHES_SIZES, (1200, 12000)),
+    ("trousers", "Брюки", 8, ["брюки", "джинсы", "леггинсы", "шорты"], CLOTHES_SIZES, (1000, 9000)),
+    ("skirts", "Юбки", 5, ["юбка", "юбка-плиссе", "мини-юбка"], CLOTHES_SIZES, (800, 7000)),
+    ("outerwear", "Верхняя одежда", 7, ["куртка", "пальто", "пуховик", "плащ", "жилет"], CLOTHES_SIZES, (3000, 45000)),
+    ("suits", "Костюмы", 4, ["костюм", "пиджак", "жакет"], CLOTHES_SIZES, (3500, 30000)),
+    ("homewear", "Домашняя одежда", 4, ["пижама", "халат", "комплект"], CLOTHES_SIZES, (900, 6000)),
+    ("underwear", "Бельё", 5, ["бюстгальтер", "трусы", "боди", "комплект белья"], CLOTHES_SIZES, (300, 5000)),
+    ("sport", "Спортивная одежда", 6, ["костюм спортивный", "худи", "тайтсы", "олимпийка"], CLOTHES_SIZES, (1200, 14000)),
+    ("kids", "Детская одежда", 6, ["комбинезон", "платье детское", "футболка детская"], CLOTHES_SIZES, (500, 8000)),
+    ("shoes", "Обувь", 7, ["кроссовки", "ботинки", "туфли", "сапоги", "кеды", "босоножки"], SHOE_SIZES, (1500, 25000)),
+    ("bags", "Сумки", 3, ["сумка", "рюкзак", "клатч", "шоппер"], None, (900, 30000)),
+    ("accessories", "Аксессуары", 2, ["ремень", "шарф", "платок", "перчатки", "шапка"], None, (200, 5000)),
+]
+
+FITS = [
+    "классический", "оверсайз", "приталенный", "укороченный", "удлинённый", "базовый", "прямой",
+    "свободный", "облегающий", "винтажный", "спортивный", "офисный", "вечерний", "повседневный",
+]
+FEATURES = [
+    "с карманами", "на молнии", "на пуговицах", "с капюшоном", "с поясом", "с принтом",
+    "с вышивкой", "с кружевом", "с разрезом", "с воротником", "без рукавов", "с длинным рукавом",
+    "с коротким рукавом", "с высокой посадкой", "на запах", "со складками", "с начёсом",
+]
+MATERIALS = [
+    ("хлопок", 30), ("полиэстер", 20), ("вискоза", 12), ("лён", 6), ("шерсть", 6), ("шёлк", 3),
+    ("кашемир", 1), ("экокожа", 5), ("натуральная кожа", 3), ("трикотаж", 8), ("деним", 6),
+]
+COLORS = [
+    ("чёрный", 22), ("белый", 16), ("бежевый", 10), ("серый", 9), ("синий", 8), ("красный", 6),
+    ("зелёный", 5), ("розовый", 5), ("коричневый", 5), ("голубой", 4), ("хаки", 3), ("бордовый", 3),
+    ("молочный", 2), ("жёлтый", 1), ("фиолетовый", 1),
+]
+COUNTRIES = [
+    ("Китай", 45), ("Россия", 18), ("Турция", 14), ("Киргизия", 7), ("Узбекистан", 5),
+    ("Бангладеш", 4), ("Вьетнам", 3), ("Индия", 2), ("Италия", 1), ("Беларусь", 1),
+]
+SEASONS = ["лето", "зима", "демисезон", "всесезон"]
+BRANDS = [
+    "Zara", "Mango", "H&M", "Befree", "Love Republic", "Gloria Jeans", "Ostin", "Lime", "Sela",
+    "Incity", "Zarina", "Baon", "Concept Club", "Tom Tailor", "Finn Flare", "no name",
+]
+SHOPS = ["www.wildberries.ru", "www.ozon.ru", "www.lamoda.ru", "sadovod.market", "trendyol.com"]
+
+FIRST_NAMES = [
+    "Александр", "Алексей", "Анна", "Андрей", "Дмитрий", "Екатерина", "Елена", "Иван", "Ирина",
+    "Мария", "Наталья", "Никита", "Ольга", "Павел", "Сергей", "Светлана", "Татьяна", "Юлия",
+    "Зарина", "Рустам", "Гульнара", "Тимур", "Ахмед", "Динара", "Карина", "Максим",
+]
+LAST_NAMES = [
+    "Иванов", "Смирнов", "Кузнецов", "Попов", "Васильев", "Петров", "Соколов", "Михайлов",
+    "Новиков", "Фёдоров", "Морозов", "Волков", "Алексеев", "Лебедев", "Семёнов", "Егоров",
+    "Каримов", "Алиев", "Юсупов", "Абдуллаев", "Исмаилов", "Ким",
+]
+
+PRODUCT_COLUMNS = (
+    "id", "supplier_user_id", "category_id", "source_url", "price_rub", "country_of_origin",
+    "composition", "size_range", "color", "description", "attributes", "status_id",
+    "approved_by", "approved_at", "is_active", "created_at", "updated_at",
+)
+NULL = "\\N"
+
+# Контекст генерации в процессе-загрузчике (задаётся init_worker)
+_context: dict = {}
+
+
+def _weighted(pairs: list[tuple[str, int]]) -> tuple[list[str], list[int]]:
+    values = [value for value, _ in pairs]
+    return values, list(accumulate(weight for _, weight in pairs))
+
+
+def _copy_value(value) -> str:
+    """Значение для COPY в текстовом формате (генерируемые строки не содержат \\t, \\n и \\)"""
+    if value is None:
+        return NULL
+    return str(value)
+
+
+def _composition(rng: random.Random, material: str) -> str:
+    main = rng.choice((100, 95, 92, 80, 70, 60))
+    if main == 100:
+        return f"{material} 100%"
+    second = rng.choice(("эластан", "полиэстер", "вискоза", "полиамид"))
+    return f"{material} {main}%, {second} {100 - main}%"
+
+
+def product_rows(chunk: int) -> StringIO:
+    """Блок заявок chunk в формате COPY; содержимое зависит только от seed и номера блока"""
+    ctx = _context
+    rng = random.Random(f"{ctx['seed']}:products:{chunk}")
+    total = ctx["products"]
+    first_id = chunk * CHUNK_SIZE + 1
+    last_id = min(total, first_id + CHUNK_SIZE - 1)
+    supplier_ids, supplier_weights = ctx["supplier_ids"], ctx["supplier_weights"]
+    category_weights = ctx["category_weights"]
+    material_values, material_weights = _weighted(MATERIALS)
+    color_values, color_weights = _weighted(COLORS)
+    country_values, country_weights = _weighted(COUNTRIES)
+    until, span = ctx["until"], ctx["span"]
+    moderator_ids = ctx["moderator_ids"]
+
+    buffer = StringIO()
+    for product_id in range(first_id, last_id + 1):
+        # Плотность потока растёт линейно к концу периода: доля периода = sqrt(доли id)
+        position = math.sqrt((product_id - rng.random()) / total)
+        created_at = until - span * (1 - position)
+        age_days = (until - created_at).total_seconds() / 86400
+
+        category_index = rng.choices(range(len(CATEGORIES)), cum_weights=category_weights)[0]
+        code, _, _, items, sizes, (price_min, price_max) = CATEGORIES[category_index]
+        item = rng.choice(items)
+        material = rng.choices(material_values, cum_weights=material_weights)[0]
+        color = rng.choices(color_values, cum_weights=color_weights)[0]
+        brand = rng.choice(BRANDS)
+        size_range = rng.choice(sizes) if sizes else None
+        season = rng.choice(SEASONS)
+        # Логнормальная цена внутри диапазона категории: 1490, 2999, ...
+        price = math.exp(rng.uniform(math.log(price_min), math.log(price_max)))
+        price = max(price_min, round(price / 10) * 10 - (1 if rng.random() < 0.4 else 0))
+
+        description = (
+            f"{item.capitalize()} {rng.choice(FEATURES)}, цвет {color}, {material}. "
+            f"Фасон {rng.choice(FITS)}, {rng.choice(FEATURES)}, сезон {season}. "
+            f"Бренд {brand}, артикул {rng.randint(100000, 999999)}"
+        )
+        attributes = {"material": material, "season": season, "brand": brand}
+        if size_range:
+            attributes["size"] = rng.choice(size_range.split("-"))
+        if code == "bags":
+            attributes["dims"] = {"w": rng.randint(15, 50), "h": rng.randint(10, 40), "d": rng.randint(5, 20)}
+        if rng.random() < 0.001:
+            attributes["limited"] = True
+
+        # Старые заявки чаще в финальных статусах, свежие - на модерации
+        roll = rng.random()
+        if age_days < 1:
+            status = "new" if roll < 0.6 else "moderation" if roll < 0.95 else "approved"
+        elif age_days < 7:
+            status = "new" if roll < 0.1 else "moderation" if roll < 0.3 else "approved" if roll < 0.85 else "rejected"
+        else:
+            archived = min(0.6, age_days / 365 * 0.3)
+            status = "archived" if roll < archived else "rejected" if roll < archived + 0.12 else (
+                "moderation" if roll < archived + 0.14 else "approved"
+            )
+        approved_by = approved_at = None
+        updated_at = created_at
+        if status in ("approved", "archived", "rejected"):
+            reviewed_at = min(until, created_at + timedelta(minutes=rng.randint(5, 72 * 60)))
+            updated_at = reviewed_at
+            if status != "rejected":
+                approved_by = rng.choice(moderator_ids)
+                approved_at = reviewed_at
+            if status == "archived":
+                updated_at = min(until, reviewed_at + timedelta(days=rng.uniform(1, max(1.0, age_days))))
+        is_active = status != "archived" and rng.random() < 0.97
+
+        row = (
+            product_id,
+            rng.choices(supplier_ids, cum_weights=supplier_weights)[0],
+            category_index + 1,
+            f"https://{rng.choice(SHOPS)}/catalog/{rng.randint(10_000_000, 299_999_999)}",
+            price,
+            rng.choices(country_values, cum_weights=country_weights)[0],
+            _composition(rng, material),
+            size_range,
+            color,
+            description,
+            orjson.dumps(attributes).decode(),
+            STATUS_IDS[status],
+            approved_by,
+            approved_at,
+            "t" if is_active else "f",
+            created_at,
+            updated_at,
+        )
+        buffer.write("\t".join(_copy_value(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    return buffer
+
+
+def init_worker(context: dict) -> None:
+    _context.update(context)
+    _context["engine"] = create_engine(context["database_url"], poolclass=NullPool)
+
+
+def load_chunk(chunk: int) -> int:
+    """Генерирует и загружает один блок заявок, возвращает число строк"""
+    buffer = product_rows(chunk)
+    rows = min(_context["products"], (chunk + 1) * CHUNK_SIZE) - chunk * CHUNK_SIZE
+    connection = _context["engine"].raw_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY bo.products ({', '.join(PRODUCT_COLUMNS)}) FROM STDIN",
+                buffer,
+            )
+        connection.commit()
+    finally:
+        connection.close()
+    return rows
+
+
+def create_reference_data(engine: Engine, args: argparse.Namespace, until: datetime) -> dict:
+    """Статусы, категории, пользователи и поставщики; возвращает контекст генерации заявок"""
+    rng = random.Random(f"{args.seed}:users")
+    users = []
+    suppliers = []
+    for user_id in range(1, args.users + 1):
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        if first_name.endswith("а") and not last_name.endswith("а") and last_name != "Ким":
+            last_name += "а"
+        if user_id <= args.suppliers:
+            role = "supplier"
+        elif user_id <= args.suppliers + args.moderators:
+            role = "admin"
+        else:
+            role = "client"
+        registered_at = until - timedelta(days=args.days + 30) * (1 - rng.random() ** 0.5)
+        user = {
+            "id": user_id,
+            "tg_user_id": 100_000_000 + user_id * 7919 % 900_000_000,
+            "phone": f"+79{rng.randint(0, 999_999_999):09d}",
+            "email": f"user{user_id}@example.ru" if rng.random() < 0.3 else None,
+            "username": f"user_{user_id}" if rng.random() < 0.8 else None,
+            "first_name": first_name,
+            "last_name": last_name,
+            "is_client": role == "client",
+            "role": role,
+            "registered_at": registered_at,
+            "created_at": registered_at,
+        }
+        users.append(user)
+        if role == "supplier":
+            suppliers.append({
+                "id": user_id,
+                "tg_user_id": user["tg_user_id"],
+                "phone": user["phone"],
+                "username": user["username"],
+                "first_name": first_name,
+                "last_name": last_name,
+                "custom_name": f"ИП {last_name} {first_name[0]}." if rng.random() < 0.6 else None,
+                "is_supplier": True,
+                "role": "supplier",
+                "token": f"{rng.getrandbits(128):032x}",
+                "registered_at": registered_at,
+            })
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                INSERT INTO bo.statuses (id, entity_type, code, name, color, order_index, is_final, can_transition_to)
+                VALUES (:id, 'product', :code, :name, :color, :id, :is_final, CAST(:can_transition_to AS jsonb))
+                """
+            ),
+            [
+                {
+                    "id": status_id, "code": code, "name": name, "color": color,
+                    "is_final": is_final, "can_transition_to": orjson.dumps(transitions).decode(),
+                }
+                for status_id, code, name, color, is_final, transitions in STATUSES
+            ],
+        )
+        conn.execute(
+            text("INSERT INTO bo.categories (id, code, name) VALUES (:id, :code, :name)"),
+            [{"id": index, "code": code, "name": name} for index, (code, name, *_) in enumerate(CATEGORIES, 1)],
+        )
+        conn.execute(
+            text(
+                """
+                INSERT INTO bo.users
+                    (id, tg_user_id, phone, email, username, first_name, last_name,
+                     is_client, role, registered_at, created_at)
+                VALUES (:id, :tg_user_id, :phone, :email, :username, :first_name, :last_name,
+                        :is_client, :role, :registered_at, :created_at)
+                """
+            ),
+            users,
+        )
+        conn.execute(
+            text(
+                """
+                INSERT INTO bo.suppliers
+                    (id, tg_user_id, phone, username, first_name, last_name, custom_name,
+                     is_supplier, role, token, registered_at)
+                VALUES (:id, :tg_user_id, :phone, :username, :first_name, :last_name, :custom_name,
+                        :is_supplier, :role, :token, :registered_at)
+                """
+            ),
+            suppliers,
+        )
+
+    # Порядок поставщиков по объёму перемешан, вес ранга r - 1 / r^SUPPLIER_SKEW
+    supplier_ids = [supplier["id"] for supplier in suppliers]
+    rng.shuffle(supplier_ids)
+    return {
+        "supplier_ids": supplier_ids,
+        "supplier_weights": list(accumulate(1 / rank ** SUPPLIER_SKEW for rank in range(1, len(supplier_ids) + 1))),
+        "category_weights": list(accumulate(weight for _, _, weight, *_ in CATEGORIES)),
+        "moderator_ids": [user["id"] for user in users if user["role"] == "admin"] or [None],
+    }
+
+
+def truncate(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            """
+            TRUNCATE bo.products, bo.suppliers, bo.users, bo.statuses, bo.categories,
+                     bo.product_daily_stats, bo.product_daily_stats_dirty, bo.rollup_watermarks
+            CASCADE
+            """
+        ))
+
+
+def drop_secondary_indexes(engine: Engine) -> list[tuple[str, str]]:
+    """Удаляет индексы bo.products, кроме индексов ограничений; возвращает их определения"""
+    with engine.begin() as conn:
+        indexes = conn.execute(text(
+            """
+            SELECT i.relname, pg_get_indexdef(i.oid)
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE x.indrelid = 'bo.products'::regclass
+              AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)
+            ORDER BY i.relname
+            """
+        )).all()
+        for name, _ in indexes:
+            conn.execute(text(f'DROP INDEX bo."{name}"'))
+    return [tuple(row) for row in indexes]
+
+
+def create_indexes(engine: Engine, indexes: list[tuple[str, str]], workers: int, maintenance_work_mem: str) -> None:
+    """Строит индексы параллельно, каждый в своём соединении"""
+    def build(definition: str) -> None:
+        with engine.begin() as conn:
+            conn.execute(text("SELECT set_config('maintenance_work_mem', :value, true)"), {"value": maintenance_work_mem})
+            conn.execute(text("SELECT set_config('max_parallel_maintenance_workers', '0', true)"))
+            conn.execute(text(definition))
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        started = time.monotonic()
+        futures = {name: executor.submit(build, definition) for name, definition in indexes}
+        for name, future in futures.items():
+            future.result()
+            print(f"  индекс {name} ({time.monotonic() - started:.0f} с)")
+
+
+def reset_sequences(engine: Engine) -> None:
+    """Последовательности id после вставки с явными id"""
+    with engine.begin() as conn:
+        for table in ("users", "suppliers", "statuses", "categories", "products"):
+            conn.execute(text(
+                f"""
+                SELECT setval(sequence, (SELECT coalesce(max(id), 0) + 1 FROM bo.{table}), false)
+                FROM pg_get_serial_sequence('bo.{table}', 'id') AS sequence
+                WHERE sequence IS NOT NULL
+                """
+            ))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Генератор синтетических данных схемы bo")
+    parser.add_argument("--database-url", required=True, help="URL локальной тестовой БД")
+    parser.add_argument("--products", type=int, default=1_000_000, help="Количество заявок")
+    parser.add_argument("--users", type=int, default=20_000, help="Количество пользователей (включая поставщиков)")
+    parser.add_argument("--suppliers", type=int, default=2_000, help="Из них поставщиков")
+    parser.add_argument("--moderators", type=int, default=10, help="Из них модераторов (approved_by)")
+    parser.add_argument("--days", type=int, default=730, help="Период created_at заявок, дней")
+    parser.add_argument("--until", type=date.fromisoformat, default=date.today(), help="Конец периода (YYYY-MM-DD)")
+    parser.add_argument("--seed", type=int, default=42, help="Seed генерации")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="Процессов загрузки")
+    parser.add_argument("--truncate", action="store_true", help="Очистить таблицы перед загрузкой")
+    parser.add_argument("--keep-indexes", action="store_true", help="Не удалять индексы bo.products на время загрузки")
+    parser.add_argument("--maintenance-work-mem", default="512MB", help="maintenance_work_mem для построения индексов")
+    args = parser.parse_args()
+    if args.suppliers + args.moderators > args.users:
+        parser.error("--suppliers + --moderators больше --users")
+
+    logger.disable("app")
+    engine = create_engine(args.database_url, pool_size=args.workers, max_overflow=0)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE SCHEMA IF NOT EXISTS bo"))
+    Base.metadata.create_all(engine)
+    if args.truncate:
+        truncate(engine)
+    with engine.connect() as conn:
+        filled = [
+            table for table in ("products", "users", "suppliers", "statuses", "categories")
+            if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM bo.{table})")).scalar()
+        ]
+    if filled:
+        raise SystemExit(f"Таблицы не пусты ({', '.join(filled)}): запустите с --truncate")
+
+    until = datetime.combine(args.until, datetime.min.time())
+    started = time.monotonic()
+    print(f"Справочники, {args.users} пользователей, {args.suppliers} поставщиков...")
+    context = create_reference_data(engine, args, until)
+    context.update(
+        database_url=args.database_url,
+        seed=args.seed,
+        products=args.products,
+        until=until,
+        span=timedelta(days=args.days),
+    )
+
+    indexes: Optional[list[tuple[str, str]]] = None if args.keep_indexes else drop_secondary_indexes(engine)
+    chunks = math.ceil(args.products / CHUNK_SIZE)
+    print(f"Заявки: {args.products} строк, {chunks} блоков, процессов: {args.workers}")
+    try:
+        loaded = 0
+        load_started = time.monotonic()
+        with multiprocessing.Pool(args.workers, initializer=init_worker, initargs=(context,)) as pool:
+            for rows in pool.imap_unordered(load_chunk, range(chunks)):
+                loaded += rows
+                elapsed = time.monotonic() - load_started
+                print(f"  загружено {loaded} / {args.products} ({loaded / elapsed:,.0f} строк/с)")
+    finally:
+        if indexes:
+            print(f"Построение индексов ({len(indexes)})...")
+            create_indexes(engine, indexes, args.workers, args.maintenance_work_mem)
+
+    reset_sequences(engine)
+    print("ANALYZE и суточные итоги...")
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE bo.users, bo.suppliers, bo.statuses, bo.categories, bo.products"))
+    with Session(engine) as db:
+        ProductStatsService.refresh(db)
+    print(f"Готово за {time.monotonic() - started:.0f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,446 @@
+"""
+Нагрузочный бенчмарк HTTP API v1 с базовой линией (защита от регрессий).
+
+Поднимает приложение (uvicorn в отдельном процессе) против локальной БД, засеянной
+синтетическими заявками, и гоняет смесь запросов, похожую на реальную: список,
+список с фильтрами, поиск, карточка заявки, создание и изменение заявки поставщиком.
+Нагрузка замкнутая: на каждом уровне --concurrency столько клиентов, каждый шлёт
+следующий запрос сразу после ответа на предыдущий. Замер идёт --duration секунд
+после прогрева --warmup; для каждого уровня и эндпоинта считаются p50/p95/p99 и RPS,
+а из заголовка Server-Timing - среднее время на авторизацию, SQL и сериализацию.
+Выбор запросов детерминирован (--seed), поэтому прогоны сравнимы между собой.
+
+Результат сравнивается с базовой линией (--baseline): регрессия - p95 эндпоинта
+хуже базового больше чем на --tolerance (и больше чем на --min-delta-ms), RPS уровня
+ниже базового больше чем на --tolerance или ответы с ошибкой. При регрессии скрипт
+завершается с кодом 1. Базовая линия зависит от машины: её записывают флагом
+--save-baseline на той же машине и с теми же параметрами, с которыми потом сравнивают.
+
+ВНИМАНИЕ: скрипт пишет в БД (засев, создание и изменение заявок). Запускать только
+против локальной/тестовой базы с применёнными миграциями. Нужен httpx (pip install httpx).
+
+Пример (из папки back):
+    python -m benchmarks.http_load_benchmark --database-url postgresql://postgres@localhost/sliv_bench --save-baseline
+    python -m benchmarks.http_load_benchmark --database-url postgresql://postgres@localhost/sliv_bench
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+import httpx
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+
+from benchmarks.concurrency_benchmark import percentile
+from benchmarks.search_benchmark import DEFAULT_TERMS, ensure_schema, seed_products
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "http_load.json"
+API = "/api/v1/products"
+
+# Поставщик, от имени которого создаются и меняются заявки (привязан к bo.users.id = 1 из ensure_schema)
+BENCH_TOKEN = "bench-load-supplier"
+BENCH_USER_ID = 1
+
+# Эндпоинт -> вес в смеси запросов
+MIX = {
+    "list": 30,
+    "list_filtered": 25,
+    "search": 15,
+    "detail": 20,
+    "create": 5,
+    "update": 5,
+}
+
+# Параметры прогона, от которых зависят цифры: сравнение с базовой линией только при совпадении
+COMPARABLE_PARAMS = ("rows", "workers", "page_size", "mix")
+
+
+def prepare_database(engine: Engine, rows: int) -> None:
+    """
+    Заявки и поставщик с токеном для записи. База, заполненная generate_dataset,
+    используется как есть; иначе схема и заявки досеваются из search_benchmark.
+    """
+    with engine.connect() as conn:
+        populated = conn.execute(text("SELECT to_regclass('bo.products') IS NOT NULL")).scalar() and (
+            conn.execute(text("SELECT count(*) FROM bo.products")).scalar() >= rows
+        )
+    if not populated:
+        ensure_schema(engine)
+        seed_products(engine, rows)
+    with engine.begin() as conn:
+        conn.execute(text(
+            """
+            INSERT INTO bo.suppliers (tg_user_id, is_supplier, role, token, username)
+            SELECT tg_user_id, true, 'supplier', :token, 'bench_load' FROM bo.users
+            WHERE id = :user_id AND NOT EXISTS (SELECT 1 FROM bo.suppliers WHERE token = :token)
+            """
+        ), {"user_id": BENCH_USER_ID, "token": BENCH_TOKEN})
+
+
+def load_fixtures(engine: Engine, seed: int) -> dict:
+    """ID заявок, справочников и заявок бенч-поставщика, к которым обращается смесь"""
+    with engine.connect() as conn:
+        fixtures = {
+            "product_ids": list(conn.execute(text(
+                "SELECT id FROM bo.products TABLESAMPLE SYSTEM (1) REPEATABLE (:seed) ORDER BY id LIMIT 2000"
+            ), {"seed": seed}).scalars()),
+            "own_ids": list(conn.execute(text(
+                "SELECT id FROM bo.products WHERE supplier_user_id = :user_id ORDER BY id LIMIT 1000"
+            ), {"user_id": BENCH_USER_ID}).scalars()),
+            "status_ids": list(conn.execute(text(
+                "SELECT id FROM bo.statuses WHERE entity_type = 'product' ORDER BY id"
+            )).scalars()),
+            "category_ids": list(conn.execute(text(
+                "SELECT id FROM bo.categories WHERE required_fields IS NULL AND attributes_schema IS NULL ORDER BY id"
+            )).scalars()),
+        }
+    empty = [name for name, values in fixtures.items() if not values]
+    if empty:
+        raise SystemExit(f"Нет данных для смеси запросов: {', '.join(empty)}")
+    return fixtures
+
+
+def build_request(name: str, rng: random.Random, fixtures: dict, page_size: int) -> dict:
+    """Аргументы httpx.AsyncClient.request для одного запроса эндпоинта name"""
+    if name == "list":
+        return {"method": "GET", "url": API, "params": {"page": rng.randint(1, 5), "page_size": page_size}}
+    if name == "list_filtered":
+        params = {"page_size": page_size, "order": rng.choice(("desc", "asc"))}
+        if rng.random() < 0.7:
+            params["status_id"] = rng.choice(fixtures["status_ids"])
+        if rng.random() < 0.7:
+            params["category_id"] = rng.choice(fixtures["category_ids"])
+        if rng.random() < 0.5:
+            params["is_active"] = "true"
+        return {"method": "GET", "url": API, "params": params}
+    if name == "search":
+        return {
+            "method": "GET",
+            "url": API,
+            "params": {"search": rng.choice(DEFAULT_TERMS), "page_size": page_size, "include_total": "none"},
+        }
+    if name == "detail":
+        return {"method": "GET", "url": f"{API}/{rng.choice(fixtures['product_ids'])}"}
+    if name == "create":
+        return {
+            "method": "POST",
+            "url": API,
+            "params": {"token": BENCH_TOKEN},
+            "json": {
+                "source_url": f"https://shop.example/load/{rng.getrandbits(48)}",
+                "price_rub": str(rng.randint(100, 20000)),
+                "category_id": rng.choice(fixtures["category_ids"]),
+                "description": " ".join(rng.choices(DEFAULT_TERMS, k=3)),
+            },
+        }
+    if name == "update":
+        return {
+            "method": "PUT",
+            "url": f"{API}/{rng.choice(fixtures['own_ids'])}",
+            "params": {"token": BENCH_TOKEN},
+            "json": {"price_rub": str(rng.randint(100, 20000))},
+        }
+    raise ValueError(f"Неизвестный эндпоинт: {name}")
+
+
+# Столбцы разбивки Server-Timing в выводе: метрика заголовка и заголовок столбца
+SERVER_TIMING_COLUMNS = [
+    ("total", "total"),
+    ("auth", "auth"),
+    ("db", "db"),
+    ("db-queries", "SQL"),
+    ("serialize", "serialize"),
+]
+
+
+def parse_server_timing(value: str) -> dict[str, float]:
+    """'db;dur=1.5, db-queries;count=2' -> {'db': 1.5, 'db-queries': 2.0}"""
+    metrics = {}
+    for part in value.split(","):
+        name, *params = part.strip().split(";")
+        for param in params:
+            key, _, number = param.partition("=")
+            if key in ("dur", "count"):
+                metrics[name] = float(number)
+    return metrics
+
+
+async def run_level(
+    base_url: str,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    fixtures: dict,
+    page_size: int,
+    seed: int,
+) -> dict:
+    """Замкнутая нагрузка с concurrency клиентами; результаты по эндпоинтам"""
+    names = list(MIX)
+    weights = list(MIX.values())
+    latencies: dict[str, list[float]] = {name: [] for name in names}
+    errors: dict[str, int] = {name: 0 for name in names}
+    samples: dict[str, str] = {}
+    timing_sums: dict[str, dict[str, float]] = {name: {} for name in names}
+    timing_counts: dict[str, int] = {name: 0 for name in names}
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + warmup
+    deadline = measure_from + duration
+
+    async def client_loop(client: httpx.AsyncClient, worker: int) -> None:
+        rng = random.Random(seed * 1000 + worker)
+        while True:
+            started = loop.time()
+            if started >= deadline:
+                return
+            name = rng.choices(names, weights)[0]
+            request = build_request(name, rng, fixtures, page_size)
+            server_timing = None
+            try:
+                response = await client.request(**request)
+                failed = response.status_code >= 400
+                error = f"{response.status_code} {response.text[:200]}"
+                server_timing = response.headers.get("server-timing")
+            except httpx.HTTPError as e:
+                failed = True
+                error = repr(e)
+            finished = loop.time()
+            if started < measure_from:
+                continue
+            latencies[name].append((finished - started) * 1000)
+            if server_timing:
+                sums = timing_sums[name]
+                for metric, value in parse_server_timing(server_timing).items():
+                    sums[metric] = sums.get(metric, 0.0) + value
+                timing_counts[name] += 1
+            if failed:
+                errors[name] += 1
+                samples.setdefault(name, error)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        await asyncio.gather(*(client_loop(client, worker) for worker in range(concurrency)))
+
+    endpoints = {}
+    for name in names:
+        values = latencies[name]
+        if not values:
+            continue
+        endpoints[name] = {
+            "requests": len(values),
+            "rps": round(len(values) / duration, 1),
+            "p50": round(percentile(values, 0.50), 2),
+            "p95": round(percentile(values, 0.95), 2),
+            "p99": round(percentile(values, 0.99), 2),
+            "errors": errors[name],
+            "server_timing": {
+                metric: round(total / timing_counts[name], 2) for metric, total in timing_sums[name].items()
+            },
+        }
+    return {
+        "rps": round(sum(len(values) for values in latencies.values()) / duration, 1),
+        "endpoints": endpoints,
+        "error_samples": samples,
+    }
+
+
+def wait_until_healthy(base_url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Приложение завершилось с кодом {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Приложение не ответило на /health за {timeout:.0f} с")
+
+
+@contextmanager
+def run_server(database_url: str, port: int, workers: int) -> Iterator[str]:
+    """uvicorn с приложением против database_url; лог пишется во временный файл"""
+    base_url = f"http://127.0.0.1:{port}"
+    log = tempfile.NamedTemporaryFile(prefix="http_load_", suffix=".log", delete=False)
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ],
+        env={**os.environ, "DATABASE_URL": database_url},
+        stdout=log,
+        stderr=subprocess.STDOUT,
+    )
+    try:
+        try:
+            wait_until_healthy(base_url, process, timeout=60)
+        except RuntimeError as e:
+            raise SystemExit(f"{e}. Лог приложения: {log.name}")
+        print(f"Приложение запущено: {base_url} (воркеров: {workers}, лог: {log.name})")
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+
+
+@contextmanager
+def _external(url: str) -> Iterator[str]:
+    yield url.rstrip("/")
+
+
+def compare(baseline: dict, current: dict, tolerance: float, min_delta_ms: float) -> list[str]:
+    """Регрессии текущего прогона относительно базовой линии"""
+    regressions = []
+    for level, result in current["levels"].items():
+        for name, stats in result["endpoints"].items():
+            if stats["errors"]:
+                regressions.append(f"c={level} {name}: ошибок {stats['errors']} из {stats['requests']}")
+        base = baseline["levels"].get(level)
+        if base is None:
+            continue
+        if result["rps"] < base["rps"] * (1 - tolerance):
+            regressions.append(f"c={level} RPS {result['rps']} < {base['rps']} (базовая линия)")
+        for name, stats in result["endpoints"].items():
+            base_stats = base["endpoints"].get(name)
+            if base_stats is None:
+                continue
+            limit = max(base_stats["p95"] * (1 + tolerance), base_stats["p95"] + min_delta_ms)
+            if stats["p95"] > limit:
+                regressions.append(
+                    f"c={level} {name}: p95 {stats['p95']:.1f} мс > {base_stats['p95']:.1f} мс (базовая линия)"
+                )
+    return regressions
+
+
+def _delta(value: float, base: Optional[float]) -> str:
+    if not base:
+        return ""
+    return f"{(value - base) / base * 100:+.0f}%"
+
+
+def print_level(level: str, result: dict, base: Optional[dict]) -> None:
+    base_endpoints = (base or {}).get("endpoints", {})
+    print(f"\nconcurrency={level}: {result['rps']} запр/с {_delta(result['rps'], (base or {}).get('rps'))}")
+    print(f"{'эндпоинт':<14} {'запросов':>9} {'RPS':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'ошибок':>7}  p95 к базе")
+    print("-" * 82)
+    for name, stats in result["endpoints"].items():
+        base_p95 = base_endpoints.get(name, {}).get("p95")
+        print(
+            f"{name:<14} {stats['requests']:>9} {stats['rps']:>7.1f} {stats['p50']:>8.1f} {stats['p95']:>8.1f} "
+            f"{stats['p99']:>8.1f} {stats['errors']:>7}  {_delta(stats['p95'], base_p95)}"
+        )
+    for name, sample in result["error_samples"].items():
+        print(f"  {name}: {sample}")
+    if not any(stats.get("server_timing") for stats in result["endpoints"].values()):
+        return
+    print("Server-Timing, среднее (SQL - запросов на ответ):")
+    print(f"{'эндпоинт':<14}" + "".join(f" {title:>10}" for _, title in SERVER_TIMING_COLUMNS))
+    for name, stats in result["endpoints"].items():
+        timing = stats.get("server_timing", {})
+        print(f"{name:<14}" + "".join(
+            f" {timing[metric]:>10.2f}" if metric in timing else f" {'-':>10}" for metric, _ in SERVER_TIMING_COLUMNS
+        ))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный бенчмарк HTTP API v1")
+    parser.add_argument("--database-url", required=True, help="URL локальной тестовой БД")
+    parser.add_argument("--rows", type=int, default=200_000, help="Минимальный размер bo.products")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Уровни конкурентности")
+    parser.add_argument("--duration", type=float, default=20, help="Длительность замера на уровень, с")
+    parser.add_argument("--warmup", type=float, default=3, help="Прогрев перед замером на уровень, с")
+    parser.add_argument("--workers", type=int, default=1, help="Воркеров uvicorn")
+    parser.add_argument("--port", type=int, default=8765, help="Порт запускаемого приложения")
+    parser.add_argument("--url", help="Не запускать приложение, нагружать уже запущенное (например http://127.0.0.1:8000)")
+    parser.add_argument("--page-size", type=int, default=20, help="Размер страницы списка")
+    parser.add_argument("--seed", type=int, default=42, help="Seed выбора запросов")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Файл базовой линии")
+    parser.add_argument("--save-baseline", action="store_true", help="Записать результат как базовую линию")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Допустимое ухудшение p95 и RPS (доля)")
+    parser.add_argument("--min-delta-ms", type=float, default=5, help="Рост p95 меньше этого не считается регрессией")
+    parser.add_argument("--output", type=Path, help="Сохранить результат прогона в JSON")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    print(f"Подготовка данных ({args.rows} строк)...")
+    prepare_database(engine, args.rows)
+    fixtures = load_fixtures(engine, args.seed)
+    engine.dispose()
+
+    params = {
+        "rows": args.rows,
+        "workers": args.workers,
+        "page_size": args.page_size,
+        "mix": MIX,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "seed": args.seed,
+    }
+    baseline = None
+    if not args.save_baseline:
+        if args.baseline.exists():
+            baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+            mismatched = [name for name in COMPARABLE_PARAMS if baseline["params"].get(name) != params[name]]
+            if mismatched:
+                raise SystemExit(
+                    f"Параметры прогона отличаются от базовой линии ({', '.join(mismatched)}): "
+                    f"сравнение бессмысленно, запишите новую базовую линию (--save-baseline)"
+                )
+        else:
+            raise SystemExit(f"Базовая линия {args.baseline} не найдена: запишите её флагом --save-baseline")
+
+    server = _external(args.url) if args.url else run_server(args.database_url, args.port, args.workers)
+    with server as base_url:
+        levels = {}
+        for concurrency in args.concurrency:
+            print(f"concurrency={concurrency}: прогрев {args.warmup:.0f} с, замер {args.duration:.0f} с...")
+            levels[str(concurrency)] = asyncio.run(run_level(
+                base_url, concurrency, args.duration, args.warmup, fixtures, args.page_size, args.seed
+            ))
+
+    current = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "host": {"platform": sys.platform, "cpus": os.cpu_count()},
+        "params": params,
+        "levels": levels,
+    }
+    for level, result in levels.items():
+        print_level(level, result, (baseline or {}).get("levels", {}).get(level))
+    print("(время в мс)")
+
+    if args.output:
+        args.output.write_text(json.dumps(current, ensure_ascii=False, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(current, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"\nБазовая линия записана: {args.baseline}")
+
+    regressions = compare(baseline or {"levels": {}}, current, args.tolerance, args.min_delta_ms)
+    if regressions:
+        print(f"\nРЕГРЕССИЯ ({len(regressions)}):")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    if baseline:
+        print(f"\nРегрессий нет (допуск {args.tolerance:.0%}, от {args.min_delta_ms:.0f} мс)")
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+Проверка планов списка заявок (защита от регрессий планов).
+
+Наполняет bo.products синтетическими данными, перебирает все комбинации фильтров
+ProductService.get_products (поставщик, статус, категория, is_active), режимы
+страницы (без total, с count(*) OVER(), keyset-страница по курсору) и направления
+сортировки, перехватывает фактический SQL страницы и проверяет EXPLAIN:
+- выборка из bo.products - Index Scan без узла Sort внутри страницы;
+- каждый фильтр-равенство входит в Index Cond (индекс подобран под фильтры,
+  а не обход индекса сортировки с отбрасыванием строк);
+- is_active=true в сочетаниях из ACTIVE_INDEXED_FILTERS обслуживается частичным
+  индексом (WHERE is_active) или входит в Index Cond. В остальных сочетаниях
+  он остаётся фильтром строк (план выводится, но не считается нарушением).
+Поиск и attr-фильтры с редкими совпадениями должны идти через GIN-индексы.
+При нарушении скрипт завершается с кодом 1.
+
+ВНИМАНИЕ: скрипт пишет в БД. Запускать только против локальной/тестовой базы
+с применёнными миграциями.
+
+Пример (из папки back):
+    python -m benchmarks.list_plan_check --database-url postgresql://postgres@localhost/sliv_bench --rows 200000
+"""
+
+import argparse
+import itertools
+import sys
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.services.attribute_filter import parse_attribute_filters
+from app.services.count_cache import product_count_cache
+from app.services.product_service import ProductService
+from benchmarks.search_benchmark import ensure_schema, seed_products
+
+FILTER_VALUES = {
+    "supplier_user_id": 7,
+    "status_id": 2,
+    "category_id": 5,
+    "is_active": True,
+}
+EQUALITY_FILTERS = ("supplier_user_id", "status_id", "category_id")
+# Фильтры-равенства, для которых вместе с is_active есть частичные индексы (миграции 009, 011)
+ACTIVE_INDEXED_FILTERS = {
+    frozenset(),
+    frozenset({"supplier_user_id"}),
+    frozenset({"status_id"}),
+    frozenset({"category_id"}),
+    frozenset({"supplier_user_id", "status_id"}),
+}
+ACTIVE_INDEX_PREFIX = "ix_products_active_"
+SORT_NODES = {"Sort", "Incremental Sort"}
+INDEX_SCANS = {"Index Scan", "Index Only Scan"}
+
+SEARCH_INDEX = "ix_products_search_vector"
+ATTRIBUTES_INDEX = "ix_products_attributes"
+RARE_TERM = "m777"
+COMMON_TERM = "хлопок"
+
+# (название, параметры get_products, обязательный GIN-индекс или None - только вывод плана)
+GIN_CASES = [
+    ("поиск, редкое слово", {"search": RARE_TERM, "include_total": "none"}, SEARCH_INDEX),
+    ("поиск, редкое слово, total", {"search": RARE_TERM, "include_total": "exact"}, SEARCH_INDEX),
+    ("поиск, частое слово, total", {"search": COMMON_TERM, "include_total": "exact"}, SEARCH_INDEX),
+    ("поиск, частое слово", {"search": COMMON_TERM, "include_total": "none"}, None),
+    ("attr, редкое значение", {"attr": "редкое", "include_total": "none"}, ATTRIBUTES_INDEX),
+    ("attr, редкое значение, total", {"attr": "редкое", "include_total": "exact"}, ATTRIBUTES_INDEX),
+]
+
+
+def prepare_dataset(engine: Engine) -> None:
+    """Неактивные заявки (~10%) и атрибуты (редкое значение у ~0.1%) для проверок фильтров"""
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT NOT is_active FROM bo.products WHERE id % 10 = 0 LIMIT 1")).scalar():
+            return
+        print("  разметка is_active и attributes...")
+        conn.execute(text(
+            """
+            UPDATE bo.products
+            SET is_active = id % 10 <> 0,
+                attributes = jsonb_build_object(
+                    'material', CASE WHEN id % 1000 = 0 THEN 'редкое' ELSE 'обычное' END
+                )
+            """
+        ))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE bo.products"))
+
+
+class PageCapture:
+    """Перехват SQL страницы списка (запрос с row_number() ... AS page_pos)"""
+
+    def __init__(self, engine: Engine):
+        self.statement: Optional[tuple[str, dict]] = None
+        event.listen(engine, "before_cursor_execute", self._capture)
+
+    def _capture(self, conn, cursor, statement, parameters, context, executemany):
+        if "page_pos" in statement:
+            self.statement = (statement, parameters)
+
+
+def page_plan(engine: Engine, capture: PageCapture, analyze: bool, **params) -> tuple[dict, Optional[str]]:
+    """План SQL страницы, который строит get_products с данными параметрами, и курсор следующей страницы"""
+    attr = params.pop("attr", None)
+    if attr:
+        params["attributes"] = parse_attribute_filters([("attr.material", attr)])
+    product_count_cache.clear()
+    capture.statement = None
+    with Session(engine) as db:
+        result = ProductService.get_products(db, page_size=20, **params)
+    statement, parameters = capture.statement
+    options = "ANALYZE, FORMAT JSON" if analyze else "FORMAT JSON"
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(f"EXPLAIN ({options}) {statement}", parameters).scalar()
+    return plan[0], result.next_cursor
+
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+def _page_root(plan: dict) -> dict:
+    """Узел Limit страницы (внутри - выборка из bo.products, снаружи - JOIN справочников)"""
+    for node in _walk(plan["Plan"]):
+        if node["Node Type"] == "Limit" and any(
+            child.get("Relation Name") == "products" for child in _walk(node)
+        ):
+            return node
+    return plan["Plan"]
+
+
+def describe(plan: dict) -> str:
+    root = _page_root(plan)
+    scans = [
+        f"{node['Node Type']} {node.get('Index Name', '')}".strip()
+        for node in _walk(root)
+        if node.get("Relation Name") == "products" or node["Node Type"] == "Bitmap Index Scan"
+    ]
+    sort = " + Sort" if any(node["Node Type"] in SORT_NODES for node in _walk(root)) else ""
+    timing = f", {plan['Execution Time']:.1f} мс" if "Execution Time" in plan else ""
+    return ", ".join(scans) + sort + timing
+
+
+def check_indexed_page(plan: dict, filters: dict) -> list[str]:
+    """Нарушения для страницы без поиска: сортировка, не индексное чтение, фильтр вне Index Cond"""
+    problems = []
+    root = _page_root(plan)
+    if any(node["Node Type"] in SORT_NODES for node in _walk(root)):
+        problems.append("сортировка страницы")
+    scans = [node for node in _walk(root) if node.get("Relation Name") == "products"]
+    if not scans or any(node["Node Type"] not in INDEX_SCANS for node in scans):
+        problems.append("выборка не через Index Scan")
+    index_cond = " ".join(node.get("Index Cond", "") for node in scans)
+    for name in EQUALITY_FILTERS:
+        if filters.get(name) is not None and name not in index_cond:
+            problems.append(f"{name} не в Index Cond")
+    equality = frozenset(name for name in EQUALITY_FILTERS if filters.get(name) is not None)
+    if filters.get("is_active") and equality in ACTIVE_INDEXED_FILTERS:
+        partial = any(node.get("Index Name", "").startswith(ACTIVE_INDEX_PREFIX) for node in scans)
+        if not partial and "is_active" not in index_cond:
+            problems.append("is_active не обслуживается индексом")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Проверка планов списка заявок")
+    parser.add_argument("--database-url", required=True, help="URL локальной тестовой БД")
+    parser.add_argument("--rows", type=int, default=200_000, help="Минимальный размер bo.products")
+    parser.add_argument("--analyze", action="store_true", help="EXPLAIN ANALYZE: выполнить запросы и показать время")
+    args = parser.parse_args()
+
+    logger.disable("app")
+    engine = create_engine(args.database_url)
+    ensure_schema(engine)
+    print(f"Подготовка данных ({args.rows} строк)...")
+    seed_products(engine, args.rows)
+    prepare_dataset(engine)
+    capture = PageCapture(engine)
+
+    failures = []
+    checked = 0
+    for mask in itertools.product((False, True), repeat=len(FILTER_VALUES)):
+        filters = {name: value for (name, value), used in zip(FILTER_VALUES.items(), mask) if used}
+        label = ", ".join(filters) or "без фильтров"
+        for order in ("desc", "asc"):
+            modes = [("страница", {"include_total": "none"}), ("total", {"include_total": "exact"})]
+            cursor = None
+            for mode, params in modes + [("курсор", {"include_total": "none"})]:
+                if mode == "курсор":
+                    if cursor is None:
+                        continue
+                    params = {**params, "cursor": cursor}
+                plan, next_cursor = page_plan(engine, capture, args.analyze, order=order, **filters, **params)
+                if mode == "страница":
+                    cursor = next_cursor
+                problems = check_indexed_page(plan, filters)
+                checked += 1
+                mark = ""
+                if problems:
+                    mark = "  <- " + "; ".join(problems)
+                    failures.append(f"{label} ({order}, {mode}): {'; '.join(problems)}")
+                print(f"{label:<55} {order:<4} {mode:<8} {describe(plan)}{mark}")
+
+    print()
+    for name, params, index_name in GIN_CASES:
+        plan, _ = page_plan(engine, capture, args.analyze, **params)
+        indexes = {node.get("Index Name") for node in _walk(plan["Plan"])}
+        checked += 1
+        mark = ""
+        if index_name and index_name not in indexes:
+            mark = f"  <- без {index_name}"
+            failures.append(f"{name}: без {index_name}")
+        print(f"{name:<55} {describe(plan)}{mark}")
+
+    if failures:
+        print(f"\nНарушений: {len(failures)} из {checked}")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print(f"\nВсе {checked} планов в порядке")
+
+
+if __name__ == "__main__":
+    main()
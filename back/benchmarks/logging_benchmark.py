@@ -0,0 +1,133 @@
+"""
+Микробенчмарк логирования: сколько стоит лог одного HTTP-запроса в потоке запроса.
+
+Запрос - события горячего пути (авторизация без токена, список, карточка, категории)
+с теми же сообщениями, что в коде. Конфигурации:
+- legacy: синхронные sink'и (файл в тексте + stderr), f-строки, без выборки
+  (так было до app/logging_config.py);
+- background: setup_logging() - JSON-файл и stderr в фоновом потоке, ленивое форматирование,
+  без выборки (LOG_SAMPLE_RATE_INFO=1);
+- sampled: то же с выборкой частых INFO (--sample-rate, по умолчанию из настроек).
+
+Время в потоке запроса - то, что добавляется к ответу; "дозапись" - сколько фоновому потоку
+ещё писать после последнего запроса (stop_logging()). stderr пишется во временный файл,
+как при перенаправлении вывода сервиса.
+
+БД не нужна. Пример (из папки back):
+    python -m benchmarks.logging_benchmark --requests 20000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from loguru import logger
+
+from app.config import settings
+from app.logging_config import SampledLogger, setup_logging, stop_logging
+
+WARMUP_REQUESTS = 100
+# Формат файла до app/logging_config.py
+LEGACY_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level} | {message}"
+
+# События одного запроса: уровень до перехода на sampled_logger, шаблон, аргументы
+REQUEST_EVENTS = [
+    ("WARNING", "Токен не передан в запросе", ()),
+    ("INFO", "Получено {} заявок из {} (страница {})", (20, 1048576, 1)),
+    ("INFO", "Заявка {} найдена", (524288,)),
+    ("INFO", "Возвращено категорий: {}", (15,)),
+]
+
+
+def legacy_request() -> None:
+    # f-строка форматируется в месте вызова при любом уровне
+    for level, template, args in REQUEST_EVENTS:
+        logger.log(level, template.format(*args))
+
+
+def make_current_request(sampled: SampledLogger):
+    def current_request() -> None:
+        for _, template, args in REQUEST_EVENTS:
+            sampled.info(template, *args)
+
+    return current_request
+
+
+def setup_legacy(log_file: str, stderr) -> None:
+    logger.remove()
+    logger.add(stderr, level="DEBUG")
+    logger.add(log_file, rotation="10 MB", retention="10 days", level="INFO", format=LEGACY_FORMAT)
+
+
+def run(name: str, setup, request, requests: int, workdir: str) -> dict:
+    log_file = os.path.join(workdir, f"{name}.log")
+    stderr_path = os.path.join(workdir, f"{name}.stderr")
+    with open(stderr_path, "w", encoding="utf-8") as stderr:
+        setup(log_file, stderr)
+        # Прогрев: открытие файлов, первые пачки фонового потока
+        for _ in range(WARMUP_REQUESTS):
+            request()
+
+        started = time.perf_counter()
+        for _ in range(requests):
+            request()
+        elapsed = time.perf_counter() - started
+        stop_logging()
+        drained = time.perf_counter() - started - elapsed
+        logger.remove()
+
+    return {
+        "name": name,
+        "per_request_us": elapsed / requests * 1_000_000,
+        "drain_ms": drained * 1000,
+        "file_bytes_per_request": os.path.getsize(log_file) / (requests + WARMUP_REQUESTS),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Микробенчмарк логирования горячего пути")
+    parser.add_argument("--requests", type=int, default=20000, help="Запросов на конфигурацию")
+    parser.add_argument(
+        "--sample-rate",
+        type=float,
+        default=settings.LOG_SAMPLE_RATE_INFO,
+        help="Доля INFO-событий для конфигурации sampled",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = [
+            run("legacy", setup_legacy, legacy_request, args.requests, workdir),
+            run(
+                "background",
+                lambda log_file, stderr: setup_logging(log_file, stderr),
+                make_current_request(SampledLogger({"INFO": 1.0})),
+                args.requests,
+                workdir,
+            ),
+            run(
+                "sampled",
+                lambda log_file, stderr: setup_logging(log_file, stderr),
+                make_current_request(SampledLogger({"INFO": args.sample_rate})),
+                args.requests,
+                workdir,
+            ),
+        ]
+
+    # Возвращаем стандартный обработчик для вывода результатов
+    logger.remove()
+    logger.add(sys.stderr)
+
+    print(f"Событий на запрос: {len(REQUEST_EVENTS)}, запросов: {args.requests}, выборка: {args.sample_rate}")
+    print(f"{'конфигурация':<12} {'мкс/запрос':>11} {'дозапись, мс':>13} {'файл, байт/запрос':>18}")
+    for result in results:
+        print(
+            f"{result['name']:<12} {result['per_request_us']:>11.1f} {result['drain_ms']:>13.1f} "
+            f"{result['file_bytes_per_request']:>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Сравнение поиска по заявкам: ilike по подстроке vs полнотекстовый (tsvector + GIN).
+
+Наполняет bo.products синтетическими данными до нужного количества строк
+и замеряет оба варианта поиска (страница из 20 строк и подсчёт совпадений).
+
+ВНИМАНИЕ: скрипт пишет в БД. Запускать только против локальной/тестовой базы.
+
+Пример (из папки back):
+    python -m benchmarks.search_benchmark --database-url postgresql://postgres@localhost/sliv_bench --rows 1000000
+"""
+
+import argparse
+import statistics
+import time
+from typing import List
+
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.engine import Engine
+
+from app.database import Base, Explain
+from app.models.product import Product
+from app.services import search as search_module
+import app.models  # noqa: F401  (регистрация всех моделей в metadata)
+
+
+# Частые слова словаря + редкий артикул модели (селективный запрос)
+DEFAULT_TERMS = ["хлопок", "красное платье", "шёлковая блузка", "zara", "m777"]
+
+WORDS = [
+    "платье", "блузка", "юбка", "куртка", "пальто", "джинсы", "рубашка", "свитер",
+    "красное", "синее", "чёрное", "белое", "зелёное", "шёлковая", "шерстяной",
+    "хлопок", "лён", "кожа", "вискоза", "полиэстер", "кашемир", "трикотаж",
+    "летний", "зимний", "классический", "оверсайз", "приталенный", "zara", "mango",
+]
+
+SEED_BATCH = 100_000
+
+
+def ensure_schema(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("CREATE SCHEMA IF NOT EXISTS bo"))
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            """
+            INSERT INTO bo.users (id, tg_user_id, role, username)
+            SELECT g, 1000 + g, 'supplier', 'bench_' || g FROM generate_series(1, 100) g
+            ON CONFLICT DO NOTHING
+            """
+        ))
+        conn.execute(text(
+            """
+            INSERT INTO bo.statuses (id, entity_type, code, name, order_index)
+            VALUES (1, 'product', 'new', 'Новый', 1),
+                   (2, 'product', 'approved', 'Одобрен', 2),
+                   (3, 'product', 'rejected', 'Отклонён', 3)
+            ON CONFLICT DO NOTHING
+            """
+        ))
+        conn.execute(text(
+            """
+            INSERT INTO bo.categories (id, code, name)
+            SELECT g, 'cat_' || g, 'Категория ' || g FROM generate_series(1, 20) g
+            ON CONFLICT DO NOTHING
+            """
+        ))
+
+
+def seed_products(engine: Engine, rows: int) -> None:
+    """Добивает bo.products до rows строк случайными описаниями из словаря WORDS"""
+    with engine.connect() as conn:
+        existing = conn.execute(text("SELECT count(*) FROM bo.products")).scalar()
+    words = "ARRAY[" + ", ".join(f"'{w}'" for w in WORDS) + "]"
+    while existing < rows:
+        batch = min(SEED_BATCH, rows - existing)
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"""
+                INSERT INTO bo.products
+                    (supplier_user_id, category_id, status_id, source_url, price_rub,
+                     description, composition, created_at, updated_at)
+                SELECT
+                    1 + (random() * 99)::int,
+                    1 + (random() * 19)::int,
+                    1 + (random() * 2)::int,
+                    'https://shop.example/item/' || g,
+                    round((random() * 20000)::numeric, 2),
+                    array_to_string(ARRAY(
+                        SELECT ({words})[1 + (random() * {len(WORDS) - 1})::int + g * 0]
+                        FROM generate_series(1, 12)
+                    ), ' ') || ' модель m' || (g % 20000),
+                    ({words})[1 + (random() * {len(WORDS) - 1})::int],
+                    now() - random() * interval '365 days',
+                    now()
+                FROM generate_series(:start, :stop) g
+                """
+            ), {"start": existing + 1, "stop": existing + batch})
+        existing += batch
+        print(f"  засеяно {existing} / {rows}")
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE bo.products"))
+
+
+def measure(engine: Engine, statement, repeat: int) -> List[float]:
+    timings = []
+    with engine.connect() as conn:
+        conn.execute(statement).all()  # прогрев
+        for _ in range(repeat):
+            started = time.perf_counter()
+            conn.execute(statement).all()
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def scan_nodes(engine: Engine, statement) -> str:
+    """Типы узлов сканирования из плана запроса"""
+    with engine.connect() as conn:
+        plan = conn.execute(Explain(statement)).scalar()
+    nodes = []
+
+    def walk(node):
+        if "Scan" in node["Node Type"]:
+            nodes.append(node["Node Type"])
+        for child in node.get("Plans", []):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return ", ".join(sorted(set(nodes)))
+
+
+def build_cases(term: str) -> list:
+    return [
+        (
+            "ilike page",
+            select(Product.id)
+            .where(search_module.ilike_filter(term))
+            .order_by(Product.created_at.desc())
+            .limit(20),
+        ),
+        (
+            "fts page (relevance)",
+            select(Product.id)
+            .where(search_module.fts_filter(term))
+            .order_by(search_module.fts_rank(term).desc(), Product.id.desc())
+            .limit(20),
+        ),
+        (
+            "ilike count",
+            select(func.count()).select_from(Product).where(search_module.ilike_filter(term)),
+        ),
+        (
+            "fts count",
+            select(func.count()).select_from(Product).where(search_module.fts_filter(term)),
+        ),
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска ilike vs FTS")
+    parser.add_argument("--database-url", required=True, help="URL локальной тестовой БД")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Количество строк в bo.products")
+    parser.add_argument("--repeat", type=int, default=5, help="Повторов на каждый запрос")
+    parser.add_argument("--terms", nargs="*", default=DEFAULT_TERMS, help="Поисковые запросы")
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    print("Подготовка данных...")
+    ensure_schema(engine)
+    seed_products(engine, args.rows)
+
+    print(f"\n{'запрос':<20} {'вариант':<22} {'median, мс':>11} {'p95, мс':>9}  план")
+    print("-" * 90)
+    for term in args.terms:
+        for name, statement in build_cases(term):
+            timings = sorted(measure(engine, statement, args.repeat))
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(
+                f"{term:<20} {name:<22} {statistics.median(timings):>11.1f} {p95:>9.1f}  "
+                f"{scan_nodes(engine, statement)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Микробенчмарк сериализации списка заявок: стоимость на одну строку.
+
+Сравнивает:
+- pydantic: построение ProductResponse/ProductListResponse, повторная валидация
+  через response_model и json.dumps (так отвечал роут до перехода на FastJSONResponse);
+- orjson: product_to_dict + dumps (текущий путь).
+
+БД не нужна. Пример (из папки back):
+    python -m benchmarks.serialization_benchmark
+"""
+
+import argparse
+import json
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from pydantic import TypeAdapter
+
+from app.schemas.product import (
+    CategoryInfo,
+    ProductListResponse,
+    ProductResponse,
+    StatusInfo,
+    SupplierInfo,
+)
+from app.serialization import dumps, product_to_dict
+from app.services.product_service import DISPLAY_FIELDS, PRODUCT_FIELDS
+
+
+ProductRow = namedtuple(
+    "ProductRow",
+    [column.key for column in PRODUCT_FIELDS] + [column.key for column in DISPLAY_FIELDS],
+)
+
+
+def make_rows(count: int) -> list:
+    now = datetime(2025, 1, 1, 12, 0, 0, 123456)
+    return [
+        ProductRow(
+            id=i,
+            supplier_user_id=10 + i % 5,
+            category_id=1 + i % 7,
+            source_url=f"https://shop.example/item/{i}",
+            price_rub=Decimal("1999.90") + i,
+            country_of_origin="Турция",
+            composition="хлопок 95%, эластан 5%",
+            size_range="42-50",
+            color="чёрный",
+            description="Платье миди из плотного хлопка, приталенный силуэт. " * 4,
+            attributes={"material": "cotton", "season": "summer", "sizes": [42, 44, 46]},
+            status_id=1 + i % 3,
+            approved_by=None,
+            approved_at=None,
+            is_active=True,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+            status_ref_id=1 + i % 3,
+            status_name="Новый",
+            status_code="new",
+            category_ref_id=1 + i % 7,
+            category_name="Платья",
+            category_code="dress",
+            user_id=10 + i % 5,
+            user_first_name="Анна",
+            user_username="anna_shop",
+            user_email=None,
+            user_role="supplier",
+            supplier_id=100 + i % 5,
+            supplier_custom_name="Anna Shop",
+            supplier_first_name="Анна",
+            supplier_username="anna_shop",
+            supplier_role="supplier",
+        )
+        for i in range(count)
+    ]
+
+
+def pydantic_path(rows: list, adapter: TypeAdapter) -> bytes:
+    """Прежний путь: модели -> валидация response_model -> json.dumps"""
+    data = []
+    for row in rows:
+        supplier = SupplierInfo(
+            id=row.supplier_id,
+            custom_name=row.supplier_custom_name,
+            first_name=row.supplier_first_name,
+            username=row.supplier_username,
+            email=None,
+            role=row.supplier_role,
+        )
+        data.append(ProductResponse(
+            id=row.id,
+            source_url=row.source_url,
+            price_rub=row.price_rub,
+            category_id=row.category_id,
+            status_id=row.status_id,
+            supplier_user_id=row.supplier_user_id,
+            country_of_origin=row.country_of_origin,
+            composition=row.composition,
+            size_range=row.size_range,
+            color=row.color,
+            description=row.description,
+            attributes=row.attributes,
+            is_active=row.is_active,
+            approved_by=row.approved_by,
+            approved_at=row.approved_at.isoformat() if row.approved_at else None,
+            created_at=row.created_at.isoformat(),
+            updated_at=row.updated_at.isoformat(),
+            status=StatusInfo(id=row.status_ref_id, name=row.status_name, code=row.status_code),
+            category=CategoryInfo(id=row.category_ref_id, name=row.category_name, code=row.category_code),
+            supplier=supplier,
+        ))
+    response = ProductListResponse(data=data, total=1000, page=1, page_size=len(rows))
+    # Что делает FastAPI с возвращённой моделью при response_model:
+    # model_dump -> валидация -> сериализация в JSON-режиме -> JSONResponse (json.dumps)
+    validated = adapter.validate_python(response.model_dump())
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def orjson_path(rows: list) -> bytes:
+    """Текущий путь: dict -> orjson"""
+    return dumps({
+        "data": [product_to_dict(row) for row in rows],
+        "total": 1000,
+        "total_estimated": False,
+        "page": 1,
+        "page_size": len(rows),
+        "next_cursor": None,
+        "prev_cursor": None,
+    })
+
+
+def per_row_us(func, rows: list, iterations: int) -> float:
+    func(rows)  # прогрев
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func(rows)
+    elapsed = time.perf_counter() - started
+    return elapsed / iterations / len(rows) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Микробенчмарк сериализации заявок")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10, 20, 50, 100], help="Размеры страниц")
+    parser.add_argument("--iterations", type=int, default=300, help="Повторов на размер страницы")
+    args = parser.parse_args()
+
+    adapter = TypeAdapter(ProductListResponse)
+    print(f"{'page_size':>9} {'pydantic, мкс/строка':>22} {'orjson, мкс/строка':>20} {'ускорение':>10} {'байт':>8}")
+    print("-" * 74)
+    for size in args.sizes:
+        rows = make_rows(size)
+        slow = per_row_us(lambda r: pydantic_path(r, adapter), rows, args.iterations)
+        fast = per_row_us(orjson_path, rows, args.iterations)
+        size_bytes = len(orjson_path(rows))
+        print(f"{size:>9} {slow:>22.1f} {fast:>20.1f} {slow / fast:>9.1f}x {size_bytes:>8}")
+
+
+if __name__ == "__main__":
+    main()
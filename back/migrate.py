@@ -0,0 +1,110 @@
+"""
+Применение версионированных SQL-миграций из папки migrations/.
+
+Каждый файл NNN_название.sql применяется один раз, применённые версии
+записываются в bo.schema_migrations. Команды выполняются по одной в режиме
+autocommit, чтобы работали CREATE INDEX CONCURRENTLY.
+
+Пример:
+    python migrate.py            # применить новые миграции
+    python migrate.py --list     # показать статус миграций
+"""
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List
+
+from loguru import logger
+from sqlalchemy import text
+
+from app.database import engine
+
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+
+def split_statements(sql: str) -> List[str]:
+    """
+    Делит файл на отдельные команды по ';' в конце строки.
+    Тела функций в $$ ... $$ не разрезаются.
+    """
+    statements = []
+    current: List[str] = []
+    in_dollar = False
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if not current and (not stripped or stripped.startswith("--")):
+            continue
+        current.append(line)
+        if line.count("$$") % 2 == 1:
+            in_dollar = not in_dollar
+        if not in_dollar and stripped.endswith(";"):
+            statements.append("\n".join(current))
+            current = []
+    if "\n".join(current).strip():
+        statements.append("\n".join(current))
+    return statements
+
+
+def migration_files() -> List[Path]:
+    return sorted(MIGRATIONS_DIR.glob("[0-9][0-9][0-9]_*.sql"))
+
+
+def applied_versions(conn) -> set:
+    conn.execute(text(
+        """
+        CREATE TABLE IF NOT EXISTS bo.schema_migrations (
+            version TEXT PRIMARY KEY,
+            applied_at TIMESTAMP NOT NULL DEFAULT now()
+        )
+        """
+    ))
+    rows = conn.execute(text("SELECT version FROM bo.schema_migrations"))
+    return {row[0] for row in rows}
+
+
+def migrate(dry_run: bool = False) -> int:
+    """Применяет все неприменённые миграции. Возвращает их количество."""
+    count = 0
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        done = applied_versions(conn)
+        for path in migration_files():
+            version = path.stem
+            if version in done:
+                continue
+            logger.info(f"Применяю миграцию {version}")
+            if dry_run:
+                count += 1
+                continue
+            for statement in split_statements(path.read_text(encoding="utf-8")):
+                conn.exec_driver_sql(statement)
+            conn.execute(
+                text("INSERT INTO bo.schema_migrations (version) VALUES (:v)"),
+                {"v": version},
+            )
+            count += 1
+    return count
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Применение SQL-миграций")
+    parser.add_argument("--list", action="store_true", help="Показать статус миграций")
+    parser.add_argument("--dry-run", action="store_true", help="Только показать, что будет применено")
+    args = parser.parse_args()
+
+    if args.list:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            done = applied_versions(conn)
+        for path in migration_files():
+            mark = "x" if path.stem in done else " "
+            print(f"[{mark}] {path.stem}")
+        return 0
+
+    count = migrate(dry_run=args.dry_run)
+    logger.info(f"Применено миграций: {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+-- Составные индексы (ключ сортировки, id) для keyset-пагинации GET /api/v1/products.
+-- B-tree индекс читается в обе стороны, поэтому один индекс обслуживает и asc, и desc.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_created_at_id
+    ON bo.products (created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_updated_at_id
+    ON bo.products (updated_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_price_rub_id
+    ON bo.products (price_rub, id);
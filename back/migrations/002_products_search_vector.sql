@@ -0,0 +1,13 @@
+-- Полнотекстовый поиск по заявкам (конфигурация russian).
+-- Столбец вычисляется самим PostgreSQL при INSERT/UPDATE, поэтому всегда актуален.
+-- ВНИМАНИЕ: добавление STORED-столбца переписывает таблицу, запускать в окно низкой нагрузки.
+ALTER TABLE bo.products
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('russian', coalesce(description, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(composition, '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(source_url, '')), 'C')
+    ) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_search_vector
+    ON bo.products USING gin (search_vector);
@@ -0,0 +1,8 @@
+-- Индексы для связи bo.users <-> bo.suppliers по tg_user_id:
+-- LATERAL-подзапрос профиля поставщика в проекции списка заявок
+-- и поиск пользователя поставщика при авторизации.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bo_suppliers_tg_user_id
+    ON bo.suppliers (tg_user_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_bo_users_tg_user_id
+    ON bo.users (tg_user_id);
@@ -0,0 +1,44 @@
+-- Уведомления об изменении справочных данных для сброса кэшей во всех воркерах
+-- (app/services/reference_listener.py слушает канал sliv_reference).
+-- Полезная нагрузка: {"table": ..., "op": ..., "id": ..., "tg_user_id": ..., "old_tg_user_id": ...}
+CREATE OR REPLACE FUNCTION bo.notify_reference_change() RETURNS trigger AS $$
+DECLARE
+    new_row jsonb := CASE WHEN TG_OP <> 'DELETE' THEN to_jsonb(NEW) END;
+    old_row jsonb := CASE WHEN TG_OP <> 'INSERT' THEN to_jsonb(OLD) END;
+BEGIN
+    PERFORM pg_notify('sliv_reference', json_build_object(
+        'table', TG_TABLE_NAME,
+        'op', TG_OP,
+        'id', coalesce(new_row, old_row) -> 'id',
+        'tg_user_id', coalesce(new_row, old_row) -> 'tg_user_id',
+        'old_tg_user_id', old_row -> 'tg_user_id'
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_categories_notify_reference ON bo.categories;
+
+CREATE TRIGGER trg_categories_notify_reference
+    AFTER INSERT OR UPDATE OR DELETE ON bo.categories
+    FOR EACH ROW EXECUTE FUNCTION bo.notify_reference_change();
+
+DROP TRIGGER IF EXISTS trg_statuses_notify_reference ON bo.statuses;
+
+CREATE TRIGGER trg_statuses_notify_reference
+    AFTER INSERT OR UPDATE OR DELETE ON bo.statuses
+    FOR EACH ROW EXECUTE FUNCTION bo.notify_reference_change();
+
+-- Только поля, от которых зависит кэш авторизации по токену
+DROP TRIGGER IF EXISTS trg_suppliers_notify_reference ON bo.suppliers;
+
+CREATE TRIGGER trg_suppliers_notify_reference
+    AFTER UPDATE OF token, role, tg_user_id, custom_name, first_name, username OR DELETE ON bo.suppliers
+    FOR EACH ROW EXECUTE FUNCTION bo.notify_reference_change();
+
+-- Сопоставление поставщик -> bo.users по tg_user_id
+DROP TRIGGER IF EXISTS trg_users_notify_reference ON bo.users;
+
+CREATE TRIGGER trg_users_notify_reference
+    AFTER INSERT OR UPDATE OF tg_user_id OR DELETE ON bo.users
+    FOR EACH ROW EXECUTE FUNCTION bo.notify_reference_change();
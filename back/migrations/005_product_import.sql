@@ -0,0 +1,28 @@
+-- Задачи импорта заявок из CSV/XLSX (app/services/product_import.py)
+-- и построчные ошибки для отчёта GET /products/import/{id}/errors.
+CREATE TABLE IF NOT EXISTS bo.product_import_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    supplier_user_id BIGINT NOT NULL REFERENCES bo.users (id) ON DELETE CASCADE,
+    file_name TEXT,
+    file_format TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    rows_processed INTEGER NOT NULL DEFAULT 0,
+    rows_created INTEGER NOT NULL DEFAULT 0,
+    rows_failed INTEGER NOT NULL DEFAULT 0,
+    progress NUMERIC(5, 4) NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT now(),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS ix_bo_product_import_jobs_supplier_user_id
+    ON bo.product_import_jobs (supplier_user_id);
+
+CREATE TABLE IF NOT EXISTS bo.product_import_errors (
+    job_id BIGINT NOT NULL REFERENCES bo.product_import_jobs (id) ON DELETE CASCADE,
+    row_number INTEGER NOT NULL,
+    errors TEXT[] NOT NULL,
+    PRIMARY KEY (job_id, row_number)
+);
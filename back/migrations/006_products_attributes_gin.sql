@@ -0,0 +1,5 @@
+-- Фильтры по атрибутам заявок attr.<ключ>=<значение> компилируются в
+-- attributes @> '{...}'. Класс операторов jsonb_path_ops поддерживает только @>
+-- (и jsonpath), зато индекс компактнее и быстрее стандартного jsonb_ops.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_attributes
+    ON bo.products USING gin (attributes jsonb_path_ops);
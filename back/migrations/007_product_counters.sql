@@ -0,0 +1,108 @@
+-- Счётчики заявок по статусам и категориям для GET /products/facets.
+-- Строки с supplier_user_id = 0 - итоги по всем поставщикам.
+-- Поддерживаются триггерами уровня оператора на bo.products: один пакетный
+-- INSERT/UPDATE/DELETE даёт одно обновление на каждый затронутый счётчик.
+CREATE TABLE IF NOT EXISTS bo.product_counters (
+    supplier_user_id BIGINT NOT NULL,
+    facet TEXT NOT NULL CHECK (facet IN ('status', 'category')),
+    value_id BIGINT NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (supplier_user_id, facet, value_id)
+);
+
+CREATE OR REPLACE FUNCTION bo.product_counters_apply() RETURNS trigger AS $$
+DECLARE
+    changes text;
+BEGIN
+    changes := CASE TG_OP
+        WHEN 'INSERT' THEN
+            'SELECT supplier_user_id, status_id, category_id, 1 AS delta FROM new_rows'
+        WHEN 'DELETE' THEN
+            'SELECT supplier_user_id, status_id, category_id, -1 AS delta FROM old_rows'
+        ELSE
+            'SELECT supplier_user_id, status_id, category_id, 1 AS delta FROM new_rows
+             UNION ALL
+             SELECT supplier_user_id, status_id, category_id, -1 AS delta FROM old_rows'
+    END;
+    -- Счётчики обновляются в порядке первичного ключа: параллельные операторы
+    -- блокируют строки в одном порядке и не попадают во взаимоблокировку
+    EXECUTE
+        $sql$
+        INSERT INTO bo.product_counters AS c (supplier_user_id, facet, value_id, count)
+        SELECT key.supplier_user_id, key.facet, key.value_id, sum(changes.delta)
+        FROM ($sql$ || changes || $sql$) changes
+        CROSS JOIN LATERAL (VALUES
+            (changes.supplier_user_id, 'status', changes.status_id),
+            (changes.supplier_user_id, 'category', changes.category_id),
+            (0::bigint, 'status', changes.status_id),
+            (0::bigint, 'category', changes.category_id)
+        ) AS key (supplier_user_id, facet, value_id)
+        GROUP BY key.supplier_user_id, key.facet, key.value_id
+        HAVING sum(changes.delta) <> 0
+        ORDER BY key.supplier_user_id, key.facet, key.value_id
+        ON CONFLICT (supplier_user_id, facet, value_id)
+        DO UPDATE SET count = c.count + EXCLUDED.count
+        $sql$;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bo.product_counters_reset() RETURNS trigger AS $$
+BEGIN
+    DELETE FROM bo.product_counters;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Полный пересчёт (миграция и ручная сверка: SELECT bo.product_counters_rebuild())
+CREATE OR REPLACE FUNCTION bo.product_counters_rebuild() RETURNS void AS $$
+BEGIN
+    LOCK TABLE bo.products IN SHARE ROW EXCLUSIVE MODE;
+    DELETE FROM bo.product_counters;
+    INSERT INTO bo.product_counters (supplier_user_id, facet, value_id, count)
+    SELECT supplier_user_id, 'status', status_id, count(*)
+    FROM bo.products GROUP BY supplier_user_id, status_id
+    UNION ALL
+    SELECT supplier_user_id, 'category', category_id, count(*)
+    FROM bo.products GROUP BY supplier_user_id, category_id
+    UNION ALL
+    SELECT 0, 'status', status_id, count(*)
+    FROM bo.products GROUP BY status_id
+    UNION ALL
+    SELECT 0, 'category', category_id, count(*)
+    FROM bo.products GROUP BY category_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Триггеры и начальное заполнение в одной транзакции: между ними не теряются
+-- и не учитываются дважды параллельные изменения заявок
+DO $$
+BEGIN
+    LOCK TABLE bo.products IN SHARE ROW EXCLUSIVE MODE;
+
+    DROP TRIGGER IF EXISTS trg_products_counters_insert ON bo.products;
+    CREATE TRIGGER trg_products_counters_insert
+        AFTER INSERT ON bo.products
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION bo.product_counters_apply();
+
+    DROP TRIGGER IF EXISTS trg_products_counters_update ON bo.products;
+    CREATE TRIGGER trg_products_counters_update
+        AFTER UPDATE ON bo.products
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION bo.product_counters_apply();
+
+    DROP TRIGGER IF EXISTS trg_products_counters_delete ON bo.products;
+    CREATE TRIGGER trg_products_counters_delete
+        AFTER DELETE ON bo.products
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION bo.product_counters_apply();
+
+    DROP TRIGGER IF EXISTS trg_products_counters_truncate ON bo.products;
+    CREATE TRIGGER trg_products_counters_truncate
+        AFTER TRUNCATE ON bo.products
+        FOR EACH STATEMENT EXECUTE FUNCTION bo.product_counters_reset();
+
+    PERFORM bo.product_counters_rebuild();
+END;
+$$;
@@ -0,0 +1,44 @@
+-- Суточные итоги по заявкам для GET /stats/timeseries (app/services/product_stats.py).
+-- Пересчитываются фоновой задачей только за дни, в которых менялись заявки.
+CREATE TABLE IF NOT EXISTS bo.product_daily_stats (
+    day DATE NOT NULL,
+    category_id BIGINT NOT NULL,
+    status_id BIGINT NOT NULL,
+    products_count BIGINT NOT NULL,
+    price_sum NUMERIC NOT NULL,
+    PRIMARY KEY (day, category_id, status_id)
+);
+
+-- Водяной знак пересчёта: заявки с updated_at не старше него уже учтены
+CREATE TABLE IF NOT EXISTS bo.rollup_watermarks (
+    name TEXT PRIMARY KEY,
+    watermark TIMESTAMP NOT NULL,
+    refreshed_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- Удалённые заявки не видны по updated_at: их дни помечаются триггером
+CREATE TABLE IF NOT EXISTS bo.product_daily_stats_dirty (
+    day DATE PRIMARY KEY
+);
+
+CREATE OR REPLACE FUNCTION bo.product_daily_stats_mark_deleted() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO bo.product_daily_stats_dirty (day)
+    SELECT DISTINCT created_at::date FROM old_rows
+    ORDER BY 1
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_products_daily_stats_delete ON bo.products;
+
+CREATE TRIGGER trg_products_daily_stats_delete
+    AFTER DELETE ON bo.products
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bo.product_daily_stats_mark_deleted();
+
+-- Выборка заявок за пересчитываемые дни (created_at растёт вместе с физическим
+-- порядком строк, поэтому BRIN занимает килобайты вместо мегабайт btree)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_created_at_brin
+    ON bo.products USING brin (created_at);
@@ -0,0 +1,39 @@
+-- Индексы под фактические запросы списка GET /api/v1/products: равенство по фильтрам
+-- (поставщик, статус, категория) + сортировка created_at, id (по умолчанию desc, индекс
+-- читается в обратную сторону). Первую страницу и keyset-страницы читает Index Scan
+-- без сортировки. Проверка планов: python -m benchmarks.list_plan_check.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_supplier_created_at
+    ON bo.products (supplier_user_id, created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_status_created_at
+    ON bo.products (status_id, created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_category_created_at
+    ON bo.products (category_id, created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_supplier_status_created_at
+    ON bo.products (supplier_user_id, status_id, created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_supplier_category_created_at
+    ON bo.products (supplier_user_id, category_id, created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_status_category_created_at
+    ON bo.products (status_id, category_id, created_at, id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_supplier_status_category_created_at
+    ON bo.products (supplier_user_id, status_id, category_id, created_at, id);
+
+-- Список только активных заявок (is_active=true) без других фильтров
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_active_created_at
+    ON bo.products (created_at, id)
+    WHERE is_active;
+
+-- Одноколоночные индексы стали префиксами составных (в том числе для каскадного
+-- удаления по внешним ключам), индекс по id дублирует первичный ключ
+DROP INDEX CONCURRENTLY IF EXISTS bo.ix_bo_products_supplier_user_id;
+
+DROP INDEX CONCURRENTLY IF EXISTS bo.ix_bo_products_status_id;
+
+DROP INDEX CONCURRENTLY IF EXISTS bo.ix_bo_products_category_id;
+
+DROP INDEX CONCURRENTLY IF EXISTS bo.ix_bo_products_id;
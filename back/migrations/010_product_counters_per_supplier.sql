@@ -0,0 +1,60 @@
+-- Счётчики заявок только по поставщикам: итоги по всем поставщикам (строки с
+-- supplier_user_id = 0) обновлялись каждым изменением bo.products и блокировали
+-- параллельные записи разных поставщиков до commit. Общие значения для
+-- GET /products/facets теперь считаются суммой строк поставщиков (ProductService.get_facets).
+CREATE OR REPLACE FUNCTION bo.product_counters_apply() RETURNS trigger AS $$
+DECLARE
+    changes text;
+BEGIN
+    changes := CASE TG_OP
+        WHEN 'INSERT' THEN
+            'SELECT supplier_user_id, status_id, category_id, 1 AS delta FROM new_rows'
+        WHEN 'DELETE' THEN
+            'SELECT supplier_user_id, status_id, category_id, -1 AS delta FROM old_rows'
+        ELSE
+            'SELECT supplier_user_id, status_id, category_id, 1 AS delta FROM new_rows
+             UNION ALL
+             SELECT supplier_user_id, status_id, category_id, -1 AS delta FROM old_rows'
+    END;
+    -- Счётчики обновляются в порядке первичного ключа: параллельные операторы
+    -- блокируют строки в одном порядке и не попадают во взаимоблокировку
+    EXECUTE
+        $sql$
+        INSERT INTO bo.product_counters AS c (supplier_user_id, facet, value_id, count)
+        SELECT key.supplier_user_id, key.facet, key.value_id, sum(changes.delta)
+        FROM ($sql$ || changes || $sql$) changes
+        CROSS JOIN LATERAL (VALUES
+            (changes.supplier_user_id, 'status', changes.status_id),
+            (changes.supplier_user_id, 'category', changes.category_id)
+        ) AS key (supplier_user_id, facet, value_id)
+        GROUP BY key.supplier_user_id, key.facet, key.value_id
+        HAVING sum(changes.delta) <> 0
+        ORDER BY key.supplier_user_id, key.facet, key.value_id
+        ON CONFLICT (supplier_user_id, facet, value_id)
+        DO UPDATE SET count = c.count + EXCLUDED.count
+        $sql$;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bo.product_counters_rebuild() RETURNS void AS $$
+BEGIN
+    LOCK TABLE bo.products IN SHARE ROW EXCLUSIVE MODE;
+    DELETE FROM bo.product_counters;
+    INSERT INTO bo.product_counters (supplier_user_id, facet, value_id, count)
+    SELECT supplier_user_id, 'status', status_id, count(*)
+    FROM bo.products GROUP BY supplier_user_id, status_id
+    UNION ALL
+    SELECT supplier_user_id, 'category', category_id, count(*)
+    FROM bo.products GROUP BY supplier_user_id, category_id;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Блокировка дожидается записей, начатых со старой версией триггера: после неё
+-- общие строки больше не появляются. Строки поставщиков уже верны, пересчёт не нужен
+DO $$
+BEGIN
+    LOCK TABLE bo.products IN SHARE ROW EXCLUSIVE MODE;
+    DELETE FROM bo.product_counters WHERE supplier_user_id = 0;
+END;
+$$;
@@ -0,0 +1,20 @@
+-- Частичные индексы списка активных заявок (is_active = true) для фильтров, с которыми
+-- его открывают: поставщик (кабинет поставщика), статус и категория (админка) и
+-- поставщик + статус. Как и в 009, равенство по фильтрам + сортировка created_at, id;
+-- условие is_active покрывается предикатом индекса, а не отбрасыванием строк.
+-- Проверка планов: python -m benchmarks.list_plan_check.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_active_supplier_created_at
+    ON bo.products (supplier_user_id, created_at, id)
+    WHERE is_active;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_active_status_created_at
+    ON bo.products (status_id, created_at, id)
+    WHERE is_active;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_active_category_created_at
+    ON bo.products (category_id, created_at, id)
+    WHERE is_active;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_active_supplier_status_created_at
+    ON bo.products (supplier_user_id, status_id, created_at, id)
+    WHERE is_active;
@@ -0,0 +1,8 @@
+-- Восстановление задач импорта после перезапуска (ProductImportService.fail_stale_jobs):
+-- путь к сохранённому файлу, чтобы удалить его у прерванной задачи, и индекс
+-- незавершённых задач по времени последнего обновления.
+ALTER TABLE bo.product_import_jobs ADD COLUMN IF NOT EXISTS file_path TEXT;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_product_import_jobs_unfinished_updated_at
+    ON bo.product_import_jobs (updated_at)
+    WHERE status IN ('queued', 'running');
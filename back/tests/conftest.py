@@ -0,0 +1,65 @@
+"""
+Общие фикстуры тестов.
+
+Тесты с БД работают с PostgreSQL из DATABASE_URL (с применёнными миграциями,
+python migrate.py) и пропускаются, если база недоступна.
+"""
+import pytest
+from sqlalchemy import text
+
+from app.database import SessionLocal
+
+
+@pytest.fixture
+def db():
+    """Сессия БД (синхронная)"""
+    session = SessionLocal()
+    try:
+        session.execute(text("SELECT 1"))
+    except Exception as e:
+        session.close()
+        pytest.skip(f"База данных недоступна: {e}")
+    try:
+        yield session
+    finally:
+        session.rollback()
+        session.close()
+
+
+@pytest.fixture
+def plain_category_id(db) -> int:
+    """Категория без обязательных полей и схемы атрибутов"""
+    category_id = db.execute(text(
+        """
+        SELECT id FROM bo.categories
+        WHERE coalesce(jsonb_array_length(required_fields), 0) = 0 AND attributes_schema IS NULL
+        ORDER BY id LIMIT 1
+        """
+    )).scalar()
+    if category_id is None:
+        pytest.skip("Нет категории без правил проверки")
+    return category_id
+
+
+@pytest.fixture
+def user_id(db) -> int:
+    """Любой пользователь bo.users"""
+    found = db.execute(text("SELECT id FROM bo.users ORDER BY id LIMIT 1")).scalar()
+    if found is None:
+        pytest.skip("В bo.users нет пользователей")
+    return found
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    """TestClient приложения без слушателя уведомлений и фоновых задач"""
+    from fastapi.testclient import TestClient
+
+    from app.config import settings
+    from app.main import app
+
+    monkeypatch.setattr(settings, "REFERENCE_LISTEN_ENABLED", False)
+    monkeypatch.setattr(settings, "STATS_ROLLUP_ENABLED", False)
+    with TestClient(app) as test_client:
+        yield test_client
+    app.dependency_overrides.clear()
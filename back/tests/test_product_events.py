@@ -0,0 +1,61 @@
+"""
+Тесты ленты событий заявок (app/services/product_events.py)
+"""
+from sqlalchemy import delete, event
+
+from app.config import settings
+from app.database import engine
+from app.models.product import Product
+from app.services import product_events
+from app.services.product_service import ProductService
+
+
+def test_notification_round_trip():
+    events = [
+        product_events.product_event(product_events.EVENT_CREATED, 1, 1, 2, 3),
+        product_events.product_event(product_events.EVENT_UPDATED, 4, 2, 2, 3, previous_status_id=1),
+    ]
+    payload = product_events.encode_notification(events)
+    assert product_events.decode_notification(payload) == events
+
+
+def test_oversized_notification_becomes_resync():
+    events = [
+        product_events.product_event(product_events.EVENT_CREATED, 10**9 + index, 1, 1, 1)
+        for index in range(1000)
+    ]
+    payload = product_events.encode_notification(events)
+    assert len(payload.encode()) <= product_events.NOTIFY_PAYLOAD_MAX
+    assert product_events.decode_notification(payload) == [{"type": product_events.EVENT_RESYNC}]
+
+
+def test_bulk_create_sends_one_notify_per_transaction(db, plain_category_id, user_id, monkeypatch):
+    monkeypatch.setattr(settings, "REFERENCE_LISTEN_ENABLED", True)
+    notifies = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "pg_notify" in statement:
+            notifies.append(parameters)
+
+    items = [
+        {"source_url": f"https://example.com/{index}", "price_rub": "10", "category_id": plain_category_id}
+        for index in range(3)
+    ]
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        results = ProductService.create_products_bulk(db, items=items, supplier_user_id=user_id)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    ids = [result.id for result in results]
+    try:
+        assert all(ids)
+        assert len(notifies) == 1
+        payload = next(
+            value for value in notifies[0].values() if value != product_events.PRODUCT_EVENTS_CHANNEL
+        )
+        delivered = product_events.decode_notification(payload)
+        assert [item["id"] for item in delivered] == ids
+        assert {item["type"] for item in delivered} == {product_events.EVENT_CREATED}
+    finally:
+        db.execute(delete(Product).where(Product.id.in_([i for i in ids if i])))
+        db.commit()
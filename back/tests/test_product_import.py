@@ -0,0 +1,88 @@
+"""
+Тесты задач импорта заявок (app/services/product_import.py)
+"""
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import delete, func, insert, select
+
+from app.models.product_import import ProductImportJob
+from app.services.product_import import (
+    IMPORT_FAILED,
+    IMPORT_QUEUED,
+    IMPORT_RUNNING,
+    STALE_JOB_ERROR,
+    ProductImportService,
+)
+
+
+def _saved_file() -> str:
+    with tempfile.NamedTemporaryFile(prefix="product_import_", suffix=".csv", delete=False) as target:
+        target.write(b"source_url,price_rub,category_id\n")
+    return target.name
+
+
+@pytest.fixture
+def jobs(db, user_id):
+    """Задачи импорта: прерванные (queued/running давно) и выполняемая сейчас"""
+    created = {}
+    for name, status, age_minutes in (
+        ("stale_queued", IMPORT_QUEUED, 120),
+        ("stale_running", IMPORT_RUNNING, 120),
+        ("live_running", IMPORT_RUNNING, 0),
+    ):
+        path = _saved_file()
+        job_id = db.scalar(
+            insert(ProductImportJob)
+            .values(
+                supplier_user_id=user_id,
+                file_name=f"{name}.csv",
+                file_format="csv",
+                file_path=path,
+                status=status,
+                updated_at=func.now() - func.make_interval(0, 0, 0, 0, 0, age_minutes),
+            )
+            .returning(ProductImportJob.id)
+        )
+        created[name] = (job_id, path)
+    db.commit()
+    yield created
+    db.execute(delete(ProductImportJob).where(ProductImportJob.id.in_([job_id for job_id, _ in created.values()])))
+    db.commit()
+    for _, path in created.values():
+        if os.path.exists(path):
+            os.unlink(path)
+
+
+def _job(db, job_id: int) -> ProductImportJob:
+    db.expire_all()
+    return db.scalar(select(ProductImportJob).where(ProductImportJob.id == job_id))
+
+
+def test_stale_jobs_are_failed_and_files_removed(db, jobs):
+    failed = ProductImportService.fail_stale_jobs(db, stale_minutes=30)
+
+    assert failed >= 2
+    for name in ("stale_queued", "stale_running"):
+        job_id, path = jobs[name]
+        job = _job(db, job_id)
+        assert job.status == IMPORT_FAILED
+        assert job.error == STALE_JOB_ERROR
+        assert job.finished_at is not None
+        assert not os.path.exists(path)
+
+    job_id, path = jobs["live_running"]
+    assert _job(db, job_id).status == IMPORT_RUNNING
+    assert os.path.exists(path)
+
+
+def test_failed_job_is_not_started_again(db, jobs):
+    ProductImportService.fail_stale_jobs(db, stale_minutes=30)
+    job_id, path = jobs["stale_queued"]
+
+    ProductImportService.run_job(job_id, path, "csv", supplier_user_id=0, category_ids={})
+
+    job = _job(db, job_id)
+    assert job.status == IMPORT_FAILED
+    assert job.started_at is None
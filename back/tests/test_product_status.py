@@ -0,0 +1,66 @@
+"""
+Тесты массовой смены статуса (POST /api/v1/products/bulk/status)
+"""
+import pytest
+from sqlalchemy import delete, select, text
+
+from app.dependencies import get_supplier_by_token
+from app.main import app
+from app.models.product import Product
+from app.models.status import Status
+from app.schemas.product import ProductCreate
+from app.services.auth_cache import SupplierPrincipal
+from app.services.product_service import STATUS_APPROVED, ProductService
+
+
+@pytest.fixture
+def new_product_id(db, plain_category_id, user_id):
+    product = ProductService.create_product(
+        db,
+        ProductCreate(
+            source_url="https://example.com/status",
+            price_rub="10",
+            category_id=plain_category_id,
+            supplier_user_id=user_id,
+        ),
+    )
+    yield product.id
+    db.execute(delete(Product).where(Product.id == product.id))
+    db.commit()
+
+
+@pytest.fixture
+def approved_status_id(db) -> int:
+    found = db.scalar(select(Status.id).where(Status.code == STATUS_APPROVED))
+    if found is None:
+        pytest.skip("Нет статуса approved")
+    return found
+
+
+def test_moderator_without_user_id_can_approve(client, db, new_product_id, approved_status_id, user_id):
+    tg_user_id = db.execute(text("SELECT tg_user_id FROM bo.users WHERE id = :id"), {"id": user_id}).scalar()
+    if tg_user_id is None:
+        pytest.skip("У пользователя нет tg_user_id")
+    moderator = SupplierPrincipal(id=0, role="moderator", tg_user_id=tg_user_id, user_id=None, name="moderator")
+    app.dependency_overrides[get_supplier_by_token] = lambda: moderator
+
+    response = client.post(
+        "/api/v1/products/bulk/status",
+        json={"product_ids": [new_product_id], "status_id": approved_status_id},
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["results"][0]["outcome"] == "updated"
+    db.expire_all()
+    product = db.get(Product, new_product_id)
+    assert product.status_id == approved_status_id
+    assert product.approved_by == user_id
+
+
+def test_approve_without_token_is_forbidden(client, new_product_id, approved_status_id):
+    response = client.post(
+        "/api/v1/products/bulk/status",
+        json={"product_ids": [new_product_id], "status_id": approved_status_id},
+    )
+
+    assert response.status_code == 403
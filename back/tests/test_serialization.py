@@ -0,0 +1,31 @@
+"""
+Тесты сериализации ответов (app/serialization.py)
+"""
+from decimal import Decimal
+
+import pytest
+from loguru import logger
+
+from app.serialization import SERIALIZATION_ERROR, dumps
+
+
+class InternalModel:
+    pass
+
+
+def test_decimal_is_serialized_as_string():
+    assert dumps({"price_rub": Decimal("12.50")}) == b'{"price_rub":"12.50"}'
+
+
+def test_unsupported_type_error_hides_type_name():
+    messages = []
+    sink = logger.add(messages.append, level="ERROR", format="{message}")
+    try:
+        with pytest.raises(TypeError) as error:
+            dumps({"value": InternalModel()})
+    finally:
+        logger.remove(sink)
+
+    assert str(error.value) == SERIALIZATION_ERROR
+    assert "InternalModel" not in str(error.value)
+    assert any("InternalModel" in message for message in messages)
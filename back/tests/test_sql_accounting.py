@@ -0,0 +1,48 @@
+"""
+Тесты учёта SQL на HTTP-запрос (app/sql_accounting.py)
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.config import settings
+from app.database import engine
+from app.sql_accounting import BUDGET_RAISE, QueryBudgetExceeded, SQLAccountingMiddleware, query_budget
+
+
+@pytest.fixture
+def budget_app(db, monkeypatch):
+    """Приложение с маршрутом, выполняющим queries SQL-запросов при бюджете 2"""
+    monkeypatch.setattr(settings, "SQL_QUERY_BUDGET_MODE", BUDGET_RAISE)
+    app = FastAPI()
+    app.add_middleware(SQLAccountingMiddleware)
+
+    @app.get("/queries/{queries}", dependencies=[query_budget(2)])
+    def run_queries(queries: int):
+        with engine.connect() as connection:
+            for _ in range(queries):
+                connection.execute(text("SELECT 1"))
+        return {"queries": queries}
+
+    return app
+
+
+def test_within_budget_returns_response(budget_app):
+    with TestClient(budget_app) as client:
+        response = client.get("/queries/2")
+
+    assert response.status_code == 200
+
+
+def test_exceeded_budget_returns_500(budget_app):
+    with TestClient(budget_app, raise_server_exceptions=False) as client:
+        response = client.get("/queries/3")
+
+    assert response.status_code == 500
+
+
+def test_exceeded_budget_raises(budget_app):
+    with TestClient(budget_app) as client:
+        with pytest.raises(QueryBudgetExceeded, match="3 SQL-запросов при бюджете 2"):
+            client.get("/queries/3")
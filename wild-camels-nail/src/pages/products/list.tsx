@@ -203,6 +203,10 @@ export const ProductList = () => {
     refineCoreProps: {
       resource: "products",
       syncWithLocation: true,
+      meta: {
+        // Только поля, которые показывает таблица (без composition/attributes и т.п.)
+        fields: "list",
+      },
     },
   });
   